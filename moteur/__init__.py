@@ -0,0 +1,4 @@
+"""
+Moteur de calcul du dashboard — fonctions NumPy sans dépendance à Streamlit,
+réutilisables depuis l'app, les traitements batch et les simulations.
+"""
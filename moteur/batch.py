@@ -0,0 +1,169 @@
+"""
+Évaluation en lot d'un fichier d'annonces avec les règles du dashboard.
+
+    python -m moteur.batch annonces.csv scores.csv --processus 8
+
+L'entrée (CSV, ou Parquet si pyarrow est installé) est lue par blocs ;
+chaque bloc est évalué de façon vectorisée dans un pool de processus
+(rendements, cash-flow et rendement net-net par régime, taux
+d'endettement). Les blocs sont écrits dans l'ordre au fil de l'eau et un
+fichier de reprise (`<sortie>.reprise`) permet de relancer une exécution
+interrompue là où elle s'était arrêtée.
+
+Colonnes reconnues : les paramètres de `evaluer_indicateurs` (seuls
+`prix_achat` et `loyer_mensuel_cc` sont obligatoires), et pour
+l'abattement Cosse `zone_abc` ou `code_insee` (zonage officiel, voir
+`moteur.zonage`) avec `convention_cosse` ; les autres colonnes sont
+ignorées, sauf l'identifiant choisi avec `--id`. Les colonnes absentes et
+les cellules vides prennent les valeurs par défaut du dashboard
+(`moteur.scenario.DEFAUTS`).
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from moteur.indicateurs import evaluer_indicateurs
+from moteur.scenario import DEFAUTS
+from moteur.zonage import CHEMIN_ZONAGE, abattement_cosse, abattements_annonces, charger_zonage
+
+REGIMES = ("micro_foncier", "deficit_foncier", "cosse", "micro_bic", "lmnp_reel")
+PARAMETRES = [nom for nom in inspect.signature(evaluer_indicateurs).parameters if nom != "regime"]
+OBLIGATOIRES = ("prix_achat", "loyer_mensuel_cc")
+# Valeurs du dashboard pour les colonnes absentes ou les cellules vides
+DEFAUTS_BATCH = {**{nom: DEFAUTS[nom] for nom in PARAMETRES if nom in DEFAUTS and nom not in OBLIGATOIRES},
+                 "abattement_cosse": abattement_cosse(DEFAUTS["zone_abc"], DEFAUTS["convention_cosse"])}
+
+
+def evaluer_bloc(bloc, colonne_id=None, zonage=None):
+    """
+    Indicateurs d'un bloc d'annonces (DataFrame) : une ligne par annonce.
+    `zonage` : chemin du CSV de zonage pour la colonne `code_insee`.
+    """
+    manquantes = [nom for nom in OBLIGATOIRES if nom not in bloc]
+    if manquantes:
+        raise ValueError(f"Colonnes obligatoires absentes : {', '.join(manquantes)}")
+    parametres = {nom: bloc[nom].to_numpy() for nom in PARAMETRES if nom in bloc}
+    for nom, defaut in DEFAUTS_BATCH.items():
+        parametres[nom] = bloc[nom].fillna(defaut).to_numpy() if nom in bloc else defaut
+    abattements = abattements_annonces(bloc, charger_zonage(str(zonage)) if zonage else None,
+                                       parametres["abattement_cosse"])
+    if abattements is not None:
+        parametres["abattement_cosse"] = abattements
+
+    sortie = {colonne_id: bloc[colonne_id].to_numpy()} if colonne_id else {}
+    for regime in REGIMES:
+        resultats = evaluer_indicateurs(regime, **parametres)
+        if regime == REGIMES[0]:
+            for cle in ("rendement_brut", "rendement_net_charges", "mensualite", "endettement_nc",
+                        "endettement_comp"):
+                sortie[cle] = resultats[cle]
+        sortie[f"rendement_net_net_{regime}"] = resultats["rendement_net_net"]
+        sortie[f"cashflow_mensuel_{regime}"] = resultats["cashflow_mensuel"]
+    return pd.DataFrame(sortie, index=bloc.index).round(4)
+
+
+def lire_blocs(chemin, taille_bloc):
+    """Blocs successifs (DataFrames) du fichier d'entrée, sans le charger en entier."""
+    chemin = Path(chemin)
+    if chemin.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("La lecture Parquet nécessite pyarrow (pip install pyarrow)") from None
+        for lot in pq.ParquetFile(chemin).iter_batches(batch_size=taille_bloc):
+            yield lot.to_pandas()
+    else:
+        yield from pd.read_csv(chemin, chunksize=taille_bloc)
+
+
+def _lire_reprise(chemin_reprise, entree, taille_bloc):
+    if not chemin_reprise.exists():
+        return 0, 0
+    reprise = json.loads(chemin_reprise.read_text())
+    if reprise["entree"] != str(entree) or reprise["taille_bloc"] != taille_bloc:
+        raise SystemExit(f"{chemin_reprise} correspond à une autre exécution — supprimez-le pour repartir de zéro")
+    return reprise["blocs"], reprise["octets"]
+
+
+def _ecrire_reprise(chemin_reprise, entree, taille_bloc, blocs, octets):
+    temporaire = chemin_reprise.with_suffix(".tmp")
+    temporaire.write_text(json.dumps({"entree": str(entree), "taille_bloc": taille_bloc,
+                                      "blocs": blocs, "octets": octets}))
+    os.replace(temporaire, chemin_reprise)  # atomique : jamais de reprise à moitié écrite
+
+
+def executer(entree, sortie, taille_bloc=50_000, processus=None, colonne_id=None, zonage=None,
+             journal=sys.stderr):
+    """
+    Évalue `entree` vers `sortie` (CSV) et renvoie le nombre d'annonces
+    traitées lors de cet appel. Au plus deux blocs par processus sont en
+    vol, pour que la mémoire reste bornée quelle que soit la taille du
+    fichier.
+    """
+    sortie = Path(sortie)
+    chemin_reprise = sortie.with_name(sortie.name + ".reprise")
+    deja_faits, octets = _lire_reprise(chemin_reprise, entree, taille_bloc)
+    processus = processus or os.cpu_count() or 1
+
+    mode = "r+b" if deja_faits else "wb"
+    if deja_faits:
+        print(f"Reprise après {deja_faits} blocs", file=journal)
+    n_lignes, debut = 0, time.perf_counter()
+    with open(sortie, mode) as fichier, ProcessPoolExecutor(processus) as pool:
+        # Tronque ce qui a pu être écrit après le dernier point de reprise
+        fichier.truncate(octets)
+        fichier.seek(octets)
+        en_vol = deque()
+        numero = deja_faits
+
+        def ecrire_premier():
+            nonlocal numero, n_lignes
+            resultat = en_vol.popleft().result()
+            resultat.to_csv(fichier, header=numero == 0, index=colonne_id is None, lineterminator="\n")
+            fichier.flush()
+            numero += 1
+            n_lignes += len(resultat)
+            _ecrire_reprise(chemin_reprise, entree, taille_bloc, numero, fichier.tell())
+            debit = n_lignes / max(time.perf_counter() - debut, 1e-9)
+            print(f"Bloc {numero} — {n_lignes:,} annonces ({debit:,.0f} / s)", file=journal)
+
+        for i, bloc in enumerate(lire_blocs(entree, taille_bloc)):
+            if i < deja_faits:
+                continue
+            en_vol.append(pool.submit(evaluer_bloc, bloc, colonne_id, zonage))
+            if len(en_vol) >= 2 * processus:
+                ecrire_premier()
+        while en_vol:
+            ecrire_premier()
+
+    chemin_reprise.unlink(missing_ok=True)
+    return n_lignes
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m moteur.batch", description=__doc__.split("\n\n")[1])
+    parser.add_argument("entree", help="Fichier d'annonces (.csv ou .parquet)")
+    parser.add_argument("sortie", help="Fichier CSV de résultats")
+    parser.add_argument("--taille-bloc", type=int, default=50_000, help="Annonces par bloc (défaut : 50 000)")
+    parser.add_argument("--processus", type=int, default=None, help="Processus de calcul (défaut : nb de cœurs)")
+    parser.add_argument("--id", dest="colonne_id", default=None, help="Colonne identifiant recopiée en sortie")
+    parser.add_argument("--zonage", default=None,
+                        help=f"CSV du zonage A bis–C pour la colonne code_insee (défaut : {CHEMIN_ZONAGE} s'il existe)")
+    args = parser.parse_args(arguments)
+    zonage = args.zonage or (str(CHEMIN_ZONAGE) if CHEMIN_ZONAGE.is_file() else None)
+
+    n_lignes = executer(args.entree, args.sortie, args.taille_bloc, args.processus, args.colonne_id, zonage)
+    print(f"{n_lignes:,} annonces évaluées → {args.sortie}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
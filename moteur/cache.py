@@ -0,0 +1,166 @@
+"""
+Caches de résultats par session, avec budgets mémoire et télémétrie.
+
+Chaque session a un `CacheSession` (LRU + durée de vie) borné par un budget
+d'octets ; un budget global, commun au processus, évince en priorité chez
+la session la plus gourmande pour qu'un utilisateur lourd ne fasse pas
+swapper le serveur. `etat_caches()` alimente la vue d'administration.
+"""
+
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_VERROU = threading.RLock()
+_CACHES = weakref.WeakValueDictionary()  # identifiant de session -> CacheSession
+_ABSENT = object()
+
+
+def taille_objet(valeur):
+    """Estimation de l'empreinte mémoire (octets) d'un résultat mis en cache."""
+    if isinstance(valeur, pd.DataFrame):
+        return int(valeur.memory_usage(deep=True).sum())
+    if isinstance(valeur, pd.Series):
+        return int(valeur.memory_usage(deep=True))
+    if hasattr(valeur, "nbytes"):  # ndarray, ResultatAnnuel, Tache, EtatGraphe
+        return int(valeur.nbytes)
+    if isinstance(valeur, dict):
+        return sys.getsizeof(valeur) + sum(taille_objet(v) for v in valeur.values())
+    if isinstance(valeur, (list, tuple)):
+        return sys.getsizeof(valeur) + sum(taille_objet(v) for v in valeur)
+    return sys.getsizeof(valeur)
+
+
+class CacheSession:
+    """Cache LRU à durée de vie, interface de dict (utilisable comme registre de tâches)."""
+
+    def __init__(self, identifiant, budget_octets, duree_vie_s=None):
+        self.identifiant = identifiant
+        self.budget_octets = budget_octets
+        self.duree_vie_s = duree_vie_s
+        self.entrees = OrderedDict()  # clé -> [valeur, dernier accès]
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.dernier_acces = time.time()
+
+    # ── Interface dict ──────────────────────────────────────────────
+    def get(self, cle, defaut=None):
+        with _VERROU:
+            self._expirer()
+            if cle not in self.entrees:
+                self.echecs += 1
+                return defaut
+            self.succes += 1
+            self._toucher(cle)
+            return self.entrees[cle][0]
+
+    def __contains__(self, cle):
+        return cle in self.entrees
+
+    def __getitem__(self, cle):
+        valeur = self.get(cle, _ABSENT)
+        if valeur is _ABSENT:
+            raise KeyError(cle)
+        return valeur
+
+    def __setitem__(self, cle, valeur):
+        with _VERROU:
+            self.entrees[cle] = [valeur, time.time()]
+            self.entrees.move_to_end(cle)
+            self.dernier_acces = time.time()
+            self.purger()
+
+    def obtenir(self, cle, calcul):
+        """Valeur en cache pour `cle`, sinon `calcul()` (mis en cache)."""
+        valeur = self.get(cle, _ABSENT)
+        if valeur is _ABSENT:
+            valeur = calcul()
+            self[cle] = valeur
+        return valeur
+
+    # ── Éviction ────────────────────────────────────────────────────
+    @property
+    def octets(self):
+        return sum(taille_objet(valeur) for valeur, _ in list(self.entrees.values()))
+
+    def _toucher(self, cle):
+        self.entrees[cle][1] = self.dernier_acces = time.time()
+        self.entrees.move_to_end(cle)
+
+    def _evincer(self, cle):
+        valeur, _ = self.entrees.pop(cle)
+        if hasattr(valeur, "annuler"):  # tâche en arrière-plan
+            valeur.annuler()
+        self.evictions += 1
+
+    def _expirer(self):
+        if self.duree_vie_s is None:
+            return
+        limite = time.time() - self.duree_vie_s
+        for cle in [cle for cle, (_, acces) in self.entrees.items() if acces < limite]:
+            self._evincer(cle)
+
+    def evincer_plus_ancien(self):
+        """Évince l'entrée la moins récemment utilisée ; faux si le cache est vide."""
+        with _VERROU:
+            if not self.entrees:
+                return False
+            self._evincer(next(iter(self.entrees)))
+            return True
+
+    def purger(self):
+        """Applique la durée de vie puis le budget de la session (la dernière entrée est gardée)."""
+        with _VERROU:
+            self._expirer()
+            while len(self.entrees) > 1 and self.octets > self.budget_octets:
+                self.evincer_plus_ancien()
+
+
+def cache_session(identifiant, budget_octets, duree_vie_s=None):
+    """Cache de la session `identifiant` (créé et enregistré au besoin)."""
+    with _VERROU:
+        cache = _CACHES.get(identifiant)
+        if cache is None:
+            cache = _CACHES[identifiant] = CacheSession(identifiant, budget_octets, duree_vie_s)
+        cache.budget_octets, cache.duree_vie_s = budget_octets, duree_vie_s
+        return cache
+
+
+def purger_global(budget_octets):
+    """Évince chez la session la plus lourde tant que le total dépasse `budget_octets`."""
+    with _VERROU:
+        caches = list(_CACHES.values())
+        for cache in caches:
+            cache.purger()
+        tailles = {cache.identifiant: cache.octets for cache in caches}
+        while sum(tailles.values()) > budget_octets:
+            cache = max(caches, key=lambda c: tailles[c.identifiant])
+            if not cache.evincer_plus_ancien():
+                break
+            tailles[cache.identifiant] = cache.octets
+
+
+def etat_caches():
+    """Une ligne par session : mémoire, entrées, succès/échecs, évictions."""
+    with _VERROU:
+        lignes = []
+        for cache in _CACHES.values():
+            appels = cache.succes + cache.echecs
+            lignes.append({
+                "Session": cache.identifiant[:8],
+                "Mémoire (Mo)": cache.octets / 1e6,
+                "Budget (Mo)": cache.budget_octets / 1e6,
+                "Entrées": len(cache.entrees),
+                "Succès": cache.succes,
+                "Échecs": cache.echecs,
+                "Taux de succès (%)": cache.succes / appels * 100 if appels else np.nan,
+                "Évictions": cache.evictions,
+                "Inactive depuis (s)": time.time() - cache.dernier_acces,
+            })
+    return pd.DataFrame(lignes)
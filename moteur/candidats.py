@@ -0,0 +1,100 @@
+"""
+Biens candidats : une liste de biens évaluée d'un bloc avec les règles du
+dashboard (voir `moteur.indicateurs`), notée sur le modèle de sérénité, et
+ses choix efficaces (frontière de Pareto rendement net-net / sérénité).
+
+Colonnes reconnues : celles de `moteur.batch` (seuls `prix_achat` et
+`loyer_mensuel_cc` sont obligatoires), plus `nom` et `type_bien` (un type
+de `moteur.serenite.TYPES_BIENS`), et `zone_abc` ou `code_insee` avec
+`convention_cosse` pour l'abattement Cosse (voir `moteur.zonage`). Les
+paramètres absents prennent les valeurs du scénario courant.
+"""
+
+import numpy as np
+import pandas as pd
+
+from moteur.batch import OBLIGATOIRES, PARAMETRES
+from moteur.credit import capital_apres, mensualite_constante
+from moteur.indicateurs import evaluer_indicateurs
+from moteur.serenite import energie, serenite_bien
+from moteur.zonage import abattements_annonces, zonage_officiel
+
+HORIZON_PATRIMOINE = 10  # années
+
+
+def evaluer_candidats(candidats, regime, indexation_valeur=0.0, **defauts):
+    """
+    Indicateurs de chaque candidat (DataFrame, une ligne par bien) pour un
+    code de régime ; `defauts` complète les paramètres absents du tableau.
+
+    « Mise de Fonds » : apport et frais de notaire, payés comptant.
+    « Patrimoine Net 10 ans » : valeur du bien indexée, moins le capital
+    restant dû après 10 ans.
+    """
+    manquantes = [nom for nom in OBLIGATOIRES if nom not in candidats]
+    if manquantes:
+        raise ValueError(f"Colonnes obligatoires absentes : {', '.join(manquantes)}")
+    parametres = {nom: candidats[nom].fillna(defauts.get(nom, np.nan)).to_numpy(dtype=float)
+                  if nom in candidats else defauts[nom]
+                  for nom in PARAMETRES if nom in candidats or nom in defauts}
+    abattements = abattements_annonces(candidats, zonage_officiel(), parametres.get("abattement_cosse"))
+    if abattements is not None:
+        parametres["abattement_cosse"] = abattements
+    resultats = evaluer_indicateurs(regime, **parametres)
+
+    def parametre(nom, defaut=0.0):
+        return np.asarray(parametres.get(nom, defaut), dtype=float)
+
+    prix = parametre("prix_achat")
+    emprunt = prix + parametre("travaux") - parametre("apport")
+    mois = parametre("duree_credit", 20) * 12
+    restant = capital_apres(emprunt, parametre("taux_emprunt", 1.8),
+                            mensualite_constante(emprunt, parametre("taux_emprunt", 1.8), mois),
+                            np.minimum(HORIZON_PATRIMOINE * 12, mois))
+    type_bien = candidats["type_bien"].to_numpy(dtype=object) if "type_bien" in candidats else None
+
+    sortie = pd.DataFrame({
+        "Bien": (candidats["nom"].astype(str) if "nom" in candidats
+                 else [f"Bien {i + 1}" for i in range(len(candidats))]),
+        "Type": pd.Series(type_bien, index=candidats.index).fillna("—") if type_bien is not None else "—",
+        "Prix": candidats["prix_achat"].to_numpy(dtype=float),
+        "Loyer CC": candidats["loyer_mensuel_cc"].to_numpy(dtype=float),
+        "Rendement Brut (%)": resultats["rendement_brut"],
+        "Rendement Net-Net (%)": resultats["rendement_net_net"],
+        "Cash-flow Mensuel": resultats["cashflow_mensuel"],
+        "Mensualité": resultats["mensualite"],
+        "Mise de Fonds": np.broadcast_to(parametre("apport") + prix * parametre("frais_notaire_pct", 7.5) / 100,
+                                         prix.shape),
+        "Patrimoine Net 10 ans": (prix * (1 + indexation_valeur / 100) ** HORIZON_PATRIMOINE
+                                  - np.maximum(restant, 0.0)),
+        "Endettement NC (%)": resultats["endettement_nc"],
+        "Endettement Comp. (%)": resultats["endettement_comp"],
+        "Sérénité": serenite_bien(resultats["rendement_brut"], type_bien),
+        "Énergie": energie(resultats["rendement_brut"]),
+    }, index=candidats.index)
+    sortie["Pareto"] = frontiere_pareto(sortie["Rendement Net-Net (%)"].to_numpy(), sortie["Sérénité"].to_numpy())
+    return sortie
+
+
+def frontiere_pareto(x, y):
+    """
+    Masque des points non dominés quand on maximise `x` et `y` (skyline en
+    O(n log n)) : tri par x décroissant (y décroissant à x égal), puis un
+    point est sur la frontière si son y dépasse strictement le meilleur y
+    des points déjà vus. Les doublons d'un point de la frontière y sont aussi.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if not len(x):
+        return np.zeros(0, dtype=bool)
+    ordre = np.lexsort((-y, -x))
+    xs, ys = x[ordre], y[ordre]
+    meilleur_avant = np.concatenate([[-np.inf], np.maximum.accumulate(ys)[:-1]])
+    retenu = ys > meilleur_avant
+    # Doublons consécutifs après tri : même sort que le premier de leur groupe
+    nouveau = np.concatenate([[True], (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])])
+    groupe = np.cumsum(nouveau) - 1
+    retenu = retenu[np.flatnonzero(nouveau)][groupe]
+
+    masque = np.empty(len(x), dtype=bool)
+    masque[ordre] = retenu
+    return masque
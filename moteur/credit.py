@@ -0,0 +1,257 @@
+"""
+Crédits immobiliers : mensualité constante, financements composites
+(plusieurs lignes amortissables, in fine, à paliers, avec différé) et prêts
+à taux variable capés évalués sur de nombreux chemins de taux à la fois.
+
+Les taux sont exprimés en % annuels, comme dans l'interface.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def mensualite_constante(capital, taux_annuel, nb_mois):
+    """Mensualité d'un prêt amortissable à échéances constantes (broadcast)."""
+    capital = np.asarray(capital, dtype=float)
+    i = np.asarray(taux_annuel, dtype=float) / 100 / 12
+    nb_mois = np.asarray(nb_mois, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuite = capital * i / (1 - (1 + i) ** -nb_mois)
+    return np.where(i != 0, annuite, capital / np.maximum(nb_mois, 1))
+
+
+def capital_apres(capital, taux_annuel, mensualite, nb_mois):
+    """Capital restant dû après `nb_mois` échéances de `mensualite` (forme fermée)."""
+    capital = np.asarray(capital, dtype=float)
+    i = np.asarray(taux_annuel, dtype=float) / 100 / 12
+    croissance = (1 + i) ** nb_mois
+    with np.errstate(divide="ignore", invalid="ignore"):
+        restant = capital * croissance - mensualite * (croissance - 1) / i
+    return np.where(i != 0, restant, capital - mensualite * nb_mois)
+
+
+def simuler_chemins_indice(n_chemins, n_periodes, indice_initial, niveau_long_terme=None,
+                           vitesse_retour=0.15, volatilite=0.6, graine=None):
+    """
+    Chemins d'indice simulés (Vasicek discret, un pas par période de révision).
+
+    Renvoie un tableau `(n_chemins, n_periodes)` dont la première colonne vaut
+    `indice_initial` (taux appliqué à la première période).
+    """
+    rng = np.random.default_rng(graine)
+    niveau = indice_initial if niveau_long_terme is None else niveau_long_terme
+    chocs = rng.standard_normal((n_chemins, n_periodes - 1)) * volatilite
+    chemins = np.empty((n_chemins, n_periodes))
+    chemins[:, 0] = indice_initial
+    for p in range(1, n_periodes):
+        precedent = chemins[:, p - 1]
+        chemins[:, p] = precedent + vitesse_retour * (niveau - precedent) + chocs[:, p - 1]
+    return chemins
+
+
+def chemins_historiques(serie, n_periodes):
+    """Toutes les fenêtres glissantes de `n_periodes` d'une série historique d'indice."""
+    serie = np.asarray(serie, dtype=float)
+    if len(serie) < n_periodes:
+        raise ValueError(f"Série trop courte : {len(serie)} valeurs pour {n_periodes} périodes")
+    return np.lib.stride_tricks.sliding_window_view(serie, n_periodes)
+
+
+def echeancier_variable(montant, nb_mois, chemins_indice, marge, plancher=-np.inf, plafond=np.inf,
+                        periode_revision=12):
+    """
+    Amortissement d'un prêt à taux variable capé pour chaque chemin d'indice.
+
+    À chaque révision, le taux devient `indice + marge` borné à
+    [`plancher`, `plafond`] et la mensualité est recalculée sur le capital
+    restant et la durée résiduelle. `chemins_indice` est `(n_chemins,
+    n_periodes)` avec au moins une valeur par période de révision.
+
+    Renvoie un dict de tableaux `(n_chemins, n_periodes)` : "taux",
+    "mensualite", "interets", "capital_rembourse" et "capital_restant"
+    (fin de période).
+    """
+    chemins_indice = np.atleast_2d(np.asarray(chemins_indice, dtype=float))
+    n_periodes = -(-nb_mois // periode_revision)
+    if chemins_indice.shape[1] < n_periodes:
+        raise ValueError(f"{chemins_indice.shape[1]} valeurs d'indice pour {n_periodes} périodes de révision")
+
+    taux = np.clip(chemins_indice[:, :n_periodes] + marge, plancher, plafond)
+    forme = taux.shape
+    mensualites = np.empty(forme)
+    interets = np.empty(forme)
+    restant = np.empty(forme)
+
+    capital = np.full(forme[0], float(montant))
+    for p in range(n_periodes):
+        mois_restants = nb_mois - p * periode_revision
+        mois_periode = min(periode_revision, mois_restants)
+        mensualite = mensualite_constante(capital, taux[:, p], mois_restants)
+        capital_fin = np.maximum(0, capital_apres(capital, taux[:, p], mensualite, mois_periode))
+        mensualites[:, p] = mensualite
+        interets[:, p] = mensualite * mois_periode - (capital - capital_fin)
+        restant[:, p] = capital_fin
+        capital = capital_fin
+
+    capital_debut = np.column_stack([np.full(forme[0], float(montant)), restant[:, :-1]])
+    return {
+        "taux": taux,
+        "mensualite": mensualites,
+        "interets": interets,
+        "capital_rembourse": capital_debut - restant,
+        "capital_restant": restant,
+    }
+
+
+@dataclass
+class LigneCredit:
+    """
+    Une ligne d'un plan de financement.
+
+    `nature` vaut "amortissable" (échéances constantes), "in_fine" (intérêts
+    seuls, capital au terme) ou "paliers" (échéances proportionnelles aux
+    poids de `paliers`, suite de `(nb_mois, poids)` ; le dernier palier
+    s'étend jusqu'au terme). Pendant `differe_mois`, seuls les intérêts sont
+    payés (différé partiel) ou rien du tout si `differe_total` (intérêts
+    capitalisés).
+    """
+    montant: float
+    taux: float
+    duree_mois: int
+    nature: str = "amortissable"
+    differe_mois: int = 0
+    differe_total: bool = False
+    paliers: tuple = ()
+
+
+def versements_ligne(ligne):
+    """Vecteur des échéances mensuelles (hors assurance) d'une ligne de crédit."""
+    i = ligne.taux / 100 / 12
+    d = min(ligne.differe_mois, ligne.duree_mois - 1)
+    n = ligne.duree_mois - d
+    versements = np.zeros(ligne.duree_mois)
+
+    if ligne.differe_total:
+        capital = ligne.montant * (1 + i) ** d
+    else:
+        capital = ligne.montant
+        versements[:d] = ligne.montant * i
+
+    if ligne.nature == "in_fine":
+        versements[d:] = capital * i
+        versements[-1] += capital
+    elif ligne.nature == "paliers" and ligne.paliers:
+        longueurs = [nb for nb, _ in ligne.paliers]
+        poids = np.repeat([p for _, p in ligne.paliers], longueurs)[:n]
+        poids = np.pad(poids, (0, n - len(poids)), mode="edge")
+        actualisation = (1 + i) ** -np.arange(1, n + 1)
+        versements[d:] = poids * capital / (poids * actualisation).sum()
+    elif ligne.nature in ("amortissable", "paliers"):
+        versements[d:] = mensualite_constante(capital, ligne.taux, n)
+    else:
+        raise ValueError(f"Nature de crédit inconnue : {ligne.nature!r}")
+    return versements
+
+
+def echeancier_composite(lignes):
+    """
+    Échéancier mensuel agrégé de plusieurs lignes de crédit.
+
+    Les échéances de chaque ligne sont empilées dans une matrice
+    `(n_lignes, horizon)` ; capital restant, intérêts et amortissement sont
+    obtenus par cumul actualisé sur toute la matrice, sans boucle mensuelle.
+    Renvoie un dict de vecteurs mensuels agrégés ("mensualite", "interets",
+    "capital_rembourse", "capital_restant") et la matrice "par_ligne" des
+    échéances.
+    """
+    horizon = max(ligne.duree_mois for ligne in lignes)
+    montants = np.array([ligne.montant for ligne in lignes], dtype=float)[:, None]
+    i = np.array([ligne.taux for ligne in lignes], dtype=float)[:, None] / 100 / 12
+    duree = np.array([ligne.duree_mois for ligne in lignes])[:, None]
+    versements = np.zeros((len(lignes), horizon))
+    for k, ligne in enumerate(lignes):
+        versements[k, :ligne.duree_mois] = versements_ligne(ligne)
+
+    mois = np.arange(1, horizon + 1)
+    croissance = (1 + i) ** mois
+    restant = croissance * (montants - np.cumsum(versements / croissance, axis=1))
+    restant = np.where(mois >= duree, 0.0, restant)
+    restant_debut = np.column_stack([montants[:, 0], restant[:, :-1]])
+    interets = np.where(mois <= duree, restant_debut * i, 0.0)
+
+    return {
+        "mensualite": versements.sum(axis=0),
+        "interets": interets.sum(axis=0),
+        "capital_rembourse": (versements - interets).sum(axis=0),
+        "capital_restant": restant.sum(axis=0),
+        "par_ligne": versements,
+    }
+
+
+def cumul_annuel(mensuel):
+    """Somme par année (blocs de 12 mois) d'une série mensuelle."""
+    mensuel = np.asarray(mensuel, dtype=float)
+    mois = -(-mensuel.shape[-1] // 12) * 12
+    complet = np.pad(mensuel, [(0, 0)] * (mensuel.ndim - 1) + [(0, mois - mensuel.shape[-1])])
+    return complet.reshape(*mensuel.shape[:-1], -1, 12).sum(axis=-1)
+
+
+def indemnites_remboursement_anticipe(capital_rembourse, taux_annuel, capital_restant_du,
+                                      mois_interets=6, plafond_pct=3.0):
+    """IRA légales : min(6 mois d'intérêts sur le capital remboursé, 3 % du capital restant dû)."""
+    interets = np.asarray(capital_rembourse, dtype=float) * np.asarray(taux_annuel, dtype=float) / 100 / 12 * mois_interets
+    return np.minimum(interets, np.asarray(capital_restant_du, dtype=float) * plafond_pct / 100)
+
+
+def grille_remboursement_anticipe(montant, taux_annuel, nb_mois, mois, montants_rembourses, nouveaux_taux,
+                                  frais_renegociation=0.0):
+    """
+    Remboursement partiel et/ou renégociation d'un prêt à taux fixe, pour
+    chaque combinaison (mois × montant remboursé × nouveau taux).
+
+    Au mois `mois`, `montants_rembourses` (borné au capital restant dû) est
+    remboursé et le solde est ré-amorti au nouveau taux sur la durée
+    résiduelle, à mensualité réduite. Un nouveau taux différent de
+    `taux_annuel` vaut rachat : les IRA portent alors sur tout le capital
+    restant dû et `frais_renegociation` (dossier, garantie) s'ajoute.
+
+    Renvoie un dict de tableaux `(n_mois, n_montants, n_taux)` :
+    "interets_economises", "ira", "frais", "gain_net", "variation_mensualite"
+    (baisse de l'échéance, €/mois) et "mois_equilibre" (mois après
+    l'opération où les économies d'échéance couvrent apport et frais ; NaN
+    si jamais avant le terme).
+    """
+    mois = np.asarray(mois, dtype=float)[:, None, None]
+    apport = np.asarray(montants_rembourses, dtype=float)[None, :, None]
+    nouveau_taux = np.asarray(nouveaux_taux, dtype=float)[None, None, :]
+
+    mensualite = mensualite_constante(montant, taux_annuel, nb_mois)
+    restant = np.maximum(0, capital_apres(montant, taux_annuel, mensualite, mois))
+    duree_residuelle = nb_mois - mois
+    apport = np.minimum(apport, restant)
+    nouveau_capital = restant - apport
+    nouvelle_mensualite = mensualite_constante(nouveau_capital, nouveau_taux, duree_residuelle)
+
+    rachat = ~np.isclose(nouveau_taux, taux_annuel) & (nouveau_capital > 0)
+    ira = indemnites_remboursement_anticipe(np.where(rachat, restant, apport), taux_annuel, restant)
+    frais = np.where(rachat, frais_renegociation, 0.0)
+
+    interets_avant = mensualite * duree_residuelle - restant
+    interets_apres = nouvelle_mensualite * duree_residuelle - nouveau_capital
+    economies = interets_avant - interets_apres
+    variation = mensualite - nouvelle_mensualite
+    cout = apport + ira + frais
+    with np.errstate(divide="ignore", invalid="ignore"):
+        equilibre = np.ceil(cout / variation)
+    equilibre = np.where((variation > 0) & (equilibre <= duree_residuelle), np.maximum(equilibre, 0), np.nan)
+
+    forme = np.broadcast_shapes(mois.shape, apport.shape, nouveau_taux.shape)
+    return {
+        "interets_economises": np.broadcast_to(economies, forme),
+        "ira": np.broadcast_to(ira, forme),
+        "frais": np.broadcast_to(frais, forme),
+        "gain_net": np.broadcast_to(economies - ira - frais, forme),
+        "variation_mensualite": np.broadcast_to(variation, forme),
+        "mois_equilibre": np.broadcast_to(equilibre, forme),
+    }
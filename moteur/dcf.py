@@ -0,0 +1,49 @@
+"""
+DCF à horizon fini : actualisation d'une série de flux annuels avec
+croissance et valeur terminale, vectorisée sur les taux d'actualisation et
+de croissance (surface de valorisation en un seul calcul).
+
+Les taux sont exprimés en %, comme dans l'interface.
+"""
+
+import numpy as np
+
+
+def valeur_terminale_gordon(dernier_flux, taux_actualisation, croissance_terminale):
+    """Valeur, en fin d'horizon, d'une rente croissante (Gordon-Shapiro) ; NaN si r <= g."""
+    r = np.asarray(taux_actualisation, dtype=float) / 100
+    g = np.asarray(croissance_terminale, dtype=float) / 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(r > g, dernier_flux * (1 + g) / (r - g), np.nan)
+
+
+def valeur_dcf(flux, taux_actualisation, taux_croissance=0.0, croissance_terminale=None,
+               valeur_terminale=0.0):
+    """
+    Valeur actuelle des `flux` (années 1..T) majorés de `taux_croissance` par an.
+
+    `taux_actualisation` et `taux_croissance` sont broadcastés entre eux ; le
+    résultat a leur forme commune. La valeur terminale est soit une rente de
+    Gordon au taux `croissance_terminale`, soit un montant explicite
+    `valeur_terminale` (ex. produit net de revente) perçu en année T.
+    """
+    flux = np.asarray(flux, dtype=float)
+    r, g = np.broadcast_arrays(np.asarray(taux_actualisation, dtype=float),
+                               np.asarray(taux_croissance, dtype=float))
+    t = np.arange(1, len(flux) + 1)
+
+    flux_croissants = flux * (1 + g[..., None] / 100) ** (t - 1)
+    actualisation = (1 + r[..., None] / 100) ** -t
+    valeur = (flux_croissants * actualisation).sum(axis=-1)
+
+    terminal = np.asarray(valeur_terminale, dtype=float)
+    if croissance_terminale is not None:
+        terminal = terminal + valeur_terminale_gordon(flux_croissants[..., -1], r, croissance_terminale)
+    return valeur + terminal * actualisation[..., -1]
+
+
+def surface_dcf(flux, taux_actualisation, taux_croissance, **kwargs):
+    """Grille de valeurs (taux d'actualisation × taux de croissance)."""
+    taux_actualisation = np.atleast_1d(np.asarray(taux_actualisation, dtype=float))
+    taux_croissance = np.atleast_1d(np.asarray(taux_croissance, dtype=float))
+    return valeur_dcf(flux, taux_actualisation[:, None], taux_croissance[None, :], **kwargs)
@@ -0,0 +1,151 @@
+"""
+Catalogue d'équipements et d'améliorations : temps de retour, VAN et TRI
+après impôts de chaque objet, tous ensemble, puis meilleure sélection sous
+un budget.
+
+Le catalogue (une ligne par objet : coût, loyer supplémentaire, durée de
+vie, durée d'amortissement) se dépose en CSV dans `donnees/equipements.csv`
+(ou le chemin de `DASH_IMMO_EQUIPEMENTS`). Les flux sont un tableau
+`(n_objets, T + 1)` : le coût en t = 0, puis le loyer supplémentaire net de
+l'impôt qu'il génère, selon le régime fiscal du scénario.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from moteur.finance import tri, van
+from moteur.portefeuille import selectionner
+from moteur.projection import facteurs_indexation
+
+# Exemples vécus (onglet Rendement Entrepreneurial), complétés des durées
+CATALOGUE_EXEMPLE = pd.DataFrame({
+    "Équipement": ["Cuisine équipée", "Lave-linge", "Parquet PVC", "Meuble sous-vasque",
+                   "Peinture neuve", "Double vitrage"],
+    "Coût (€)": [1000, 270, 600, 250, 800, 2500],
+    "Loyer sup. (€/mois)": [50, 30, 15, 10, 20, 15],
+    "Durée de vie (ans)": [12, 8, 15, 12, 8, 30],
+    "Amortissement (ans)": [10, 5, 10, 7, 7, 15],
+})
+DEFAUTS_EQUIPEMENT = {"Durée de vie (ans)": 10, "Amortissement (ans)": 7}
+NUMERIQUES = ("Coût (€)", "Loyer sup. (€/mois)", "Durée de vie (ans)", "Amortissement (ans)")
+
+CHEMIN_EQUIPEMENTS = Path(os.environ.get("DASH_IMMO_EQUIPEMENTS",
+                                         Path(__file__).resolve().parent.parent / "donnees" / "equipements.csv"))
+
+
+def _nombres(colonne):
+    """Colonne numérique, écrite à la française (« 270,5 », « 1 200 ») ou non ; NaN pour les cellules vides."""
+    if pd.api.types.is_numeric_dtype(colonne):
+        return colonne.astype(float)
+    texte = colonne.astype(str).str.replace("[\\s\u00a0\u202f€]", "", regex=True).str.replace(",", ".")
+    nombres = pd.to_numeric(texte.where(colonne.notna() & (texte != "")), errors="coerce")
+    invalides = nombres.isna() & colonne.notna() & (texte != "")
+    if invalides.any():
+        lignes = ", ".join(f"ligne {i + 1} ({valeur!r})" for i, valeur in colonne[invalides].head(5).items())
+        raise ValueError(f"« {colonne.name} » non numérique : {lignes}")
+    return nombres
+
+
+def normaliser_catalogue(catalogue):
+    """
+    Catalogue complet : colonnes numériques converties (ValueError nommant
+    les lignes illisibles), lignes sans coût ou sans loyer écartées, durées
+    vides aux valeurs par défaut.
+    """
+    catalogue = pd.DataFrame(catalogue).reset_index(drop=True)
+    manquantes = {"Coût (€)", "Loyer sup. (€/mois)"} - set(catalogue.columns)
+    if manquantes:
+        raise ValueError(f"Colonnes absentes du catalogue : {', '.join(sorted(manquantes))}")
+    catalogue = catalogue.assign(**{nom: _nombres(catalogue[nom]) for nom in NUMERIQUES if nom in catalogue})
+    catalogue = catalogue.dropna(subset=["Coût (€)", "Loyer sup. (€/mois)"]).reset_index(drop=True)
+    catalogue = catalogue.assign(**{nom: catalogue[nom].fillna(defaut) if nom in catalogue else defaut
+                                    for nom, defaut in DEFAUTS_EQUIPEMENT.items()})
+    noms = pd.Series([f"Équipement {i + 1}" for i in range(len(catalogue))])
+    catalogue["Équipement"] = catalogue["Équipement"].fillna(noms) if "Équipement" in catalogue else noms
+    return catalogue
+
+
+def catalogue_disponible():
+    """Catalogue de `CHEMIN_EQUIPEMENTS` (séparateur détecté), ou celui des exemples."""
+    if not CHEMIN_EQUIPEMENTS.is_file():
+        return CATALOGUE_EXEMPLE
+    return normaliser_catalogue(pd.read_csv(CHEMIN_EQUIPEMENTS, sep=None, engine="python", encoding="utf-8-sig"))
+
+
+def flux_equipements(catalogue, regime, taux_imposition, indexation_loyer=0.0, abattement_cosse=50.0,
+                     abattement_micro_bic=50.0):
+    """
+    Flux annuels après impôts `(n_objets, T + 1)` pour un code de régime
+    (voir `moteur.projection.code_regime`) et un taux marginal d'imposition
+    (TMI + prélèvements sociaux, %).
+
+    Régimes micro : seul le loyer supplémentaire après abattement est
+    imposé. Réel foncier : le coût est déduit l'année 1 (travaux
+    d'amélioration). LMNP réel : il est amorti sur la durée d'amortissement.
+    """
+    couts = catalogue["Coût (€)"].to_numpy(dtype=float)[:, None]
+    loyers = catalogue["Loyer sup. (€/mois)"].to_numpy(dtype=float)[:, None] * 12
+    vies = catalogue["Durée de vie (ans)"].to_numpy(dtype=float)[:, None]
+    amortissements = np.maximum(catalogue["Amortissement (ans)"].to_numpy(dtype=float)[:, None], 1)
+    n_annees = int(max(vies.max(initial=1), amortissements.max(initial=1)))
+    annees = np.arange(1, n_annees + 1)
+
+    loyers = loyers * facteurs_indexation(indexation_loyer, n_annees) * (annees <= vies)
+    if regime == "micro_foncier":
+        base = loyers * 0.70
+    elif regime == "micro_bic":
+        base = loyers * (1 - abattement_micro_bic / 100)
+    elif regime in ("cosse", "deficit_foncier"):
+        abattement = abattement_cosse if regime == "cosse" else 0.0
+        base = loyers * (1 - abattement / 100) - couts * (annees == 1)
+    elif regime == "lmnp_reel":
+        base = loyers - couts / amortissements * (annees <= amortissements)
+    else:
+        raise ValueError(f"Régime fiscal inconnu : {regime!r}")
+    return np.concatenate([-couts, loyers - base * taux_imposition / 100], axis=1)
+
+
+def evaluer_equipements(catalogue, taux_actualisation, regime, taux_imposition, **options):
+    """
+    Catalogue complété, pour chaque objet, du temps de retour brut et net
+    d'impôts (mois, NaN s'il n'est pas atteint pendant la durée de vie), de
+    la VAN au `taux_actualisation` (%), du TRI et de la VAN par euro investi.
+    `options` : voir `flux_equipements`.
+    """
+    flux = flux_equipements(catalogue, regime, taux_imposition, **options)
+    couts = catalogue["Coût (€)"].to_numpy(dtype=float)
+    cumul = np.cumsum(flux, axis=1)
+    atteint = cumul >= 0
+    annee = atteint.argmax(axis=1)  # première année où le coût est couvert (0 : objet gratuit)
+    lignes = np.arange(len(flux))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(annee > 0, -cumul[lignes, annee - 1] / flux[lignes, annee], 0.0)
+        retour_brut = couts / catalogue["Loyer sup. (€/mois)"].to_numpy(dtype=float)
+        valeurs = van(flux, taux_actualisation / 100)
+        return catalogue.assign(**{
+            "Retour (mois)": retour_brut,
+            "Retour net d'impôt (mois)": np.where(atteint.any(axis=1), (np.maximum(annee - 1, 0) + fraction) * 12,
+                                                  np.nan),
+            "VAN (€)": valeurs,
+            "TRI (%)": tri(flux) * 100,
+            "VAN / € investi": valeurs / couts,
+        })
+
+
+def meilleure_selection(evalues, budget):
+    """
+    Objets à VAN positive qui maximisent la VAN totale sans dépasser
+    `budget` (sac à dos de `moteur.portefeuille`). Renvoie la `Selection`,
+    son masque étendu à tout le catalogue.
+    """
+    couts = evalues["Coût (€)"].to_numpy(dtype=float)
+    valeurs = evalues["VAN (€)"].to_numpy(dtype=float)
+    eligibles = np.flatnonzero((valeurs > 0) & (couts <= budget))
+    selection = selectionner(valeurs[eligibles], couts[eligibles], np.zeros(len(eligibles)), budget, 0.0)
+    retenus = np.zeros(len(evalues), dtype=bool)
+    retenus[eligibles[selection.retenus]] = True
+    selection.retenus = retenus
+    return selection
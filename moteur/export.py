@@ -0,0 +1,219 @@
+"""
+Export comptable de scénarios : échéancier mensuel complet, détail fiscal
+annuel de chaque régime et indicateurs clés, en CSV ou en XLSX.
+
+    python -m moteur.export scenarios/ export.xlsx
+    python -m moteur.export scenarios.csv export/ --processus 8   # trois CSV
+
+L'entrée est un dossier de scénarios JSON, un fichier JSON ou un CSV à un
+scénario par ligne (voir `moteur.scenario`). L'écriture se fait au fil de
+l'eau, scénario par scénario et dans l'ordre (calculs répartis sur
+plusieurs processus) : la mémoire ne dépend pas du nombre de scénarios
+exportés. Le XLSX nécessite openpyxl (mode écriture seule, lignes
+vidées sur disque) ; une feuille pleine continue sur « Feuille (2) ».
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from moteur.indicateurs import PART_LOYER_BANQUE
+from moteur.scenario import REGIMES_FISCAUX, etat_scenario, lire_scenarios
+
+FEUILLES = {"echeancier": "Échéancier", "fiscalite": "Fiscalité par régime", "indicateurs": "Indicateurs"}
+COLONNES = {
+    "echeancier": ["Scénario", "Mois", "Année", "Mensualité", "Intérêts", "Capital Remboursé",
+                   "Capital Restant Dû", "Assurance"],
+    "fiscalite": ["Scénario", "Régime", "Année", "Loyer Effectif", "Charges", "Intérêts", "Impôts",
+                  "Gain Fiscal", "Cash-flow Annuel"],
+    "indicateurs": ["Scénario", "Régime", "Investissement Total", "Montant Emprunté",
+                    "Mensualité (assurance comprise)", "Rendement Brut (%)", "Rendement Net Charges (%)",
+                    "Rendement Net-Net (%)", "Cash-flow Mensuel", "Endettement Non-Compensation (%)",
+                    "Endettement Compensation (%)", "Meilleur TRI (%)", "Année du Meilleur TRI",
+                    "Cash-flow Stressé"],
+}
+LIGNES_MAX_XLSX = 1_048_576  # limite d'une feuille Excel, en-tête compris
+EN_VOL_PAR_PROCESSUS = 8
+
+
+def _valeurs(*colonnes):
+    """Lignes de valeurs Python natives (pour csv et openpyxl) ; les scalaires sont répétés."""
+    n = max(len(c) for c in colonnes if np.ndim(c))
+    return list(zip(*(np.asarray(c).tolist() if np.ndim(c) else [c] * n for c in colonnes)))
+
+
+def tables_scenario(parametres):
+    """Lignes des trois tables pour un scénario : dict table -> liste de tuples."""
+    etat = etat_scenario(parametres)
+    nom = str(parametres["nom"])
+
+    echeancier = etat["echeancier"]
+    n_mois = len(echeancier["mensualite"])
+    mois = np.arange(1, n_mois + 1)
+    assurance = np.full(n_mois, etat["assurance_emprunt_mensuel"])
+    lignes_echeancier = _valeurs(nom, mois, (mois - 1) // 12 + 1, echeancier["mensualite"].round(2),
+                                 echeancier["interets"].round(2), echeancier["capital_rembourse"].round(2),
+                                 echeancier["capital_restant"].round(2), assurance.round(2))
+
+    mensualite_totale = etat["mensualite"] + etat["assurance_emprunt_mensuel"]
+    loyer_banque = parametres["loyer_mensuel_cc"] * PART_LOYER_BANQUE
+    tri = etat["df_revente"]["TRI (%)"].dropna()
+    indicateurs = [(
+        nom, parametres["regime_fiscal"], etat["investissement_total"], etat["montant_emprunt"],
+        mensualite_totale, etat["rendement_brut"], etat["rendement_net_charges"], etat["rendement_net_net"],
+        etat["cashflow_mensuel"], mensualite_totale / (parametres["salaire_net"] + loyer_banque) * 100,
+        max(0.0, mensualite_totale - loyer_banque) / parametres["salaire_net"] * 100,
+        tri.max() if len(tri) else None, int(tri.idxmax()) if len(tri) else None, etat["cf_stress"],
+    )]
+    indicateurs = [tuple(round(float(v), 4) if isinstance(v, (float, np.floating)) else v for v in ligne)
+                   for ligne in indicateurs]
+
+    # Même scénario sous chaque régime : seuls les nœuds en aval du régime sont recalculés
+    lignes_fiscalite = []
+    for regime in REGIMES_FISCAUX:
+        etat.definir(regime_fiscal=regime)
+        projection = etat["projection_credit"]
+        lignes_fiscalite += _valeurs(nom, regime, *(np.round(projection[colonne], 2)
+                                                    for colonne in COLONNES["fiscalite"][2:]))
+
+    return {"echeancier": lignes_echeancier, "fiscalite": lignes_fiscalite, "indicateurs": indicateurs}
+
+
+class EcrivainCSV:
+    """Trois fichiers CSV (un par table) dans `dossier`, ou en mémoire puis zippés si `dossier` est None."""
+
+    def __init__(self, dossier=None):
+        self.dossier = dossier
+        if dossier is None:
+            self.fichiers = {table: io.StringIO(newline="") for table in COLONNES}
+        else:
+            Path(dossier).mkdir(parents=True, exist_ok=True)
+            self.fichiers = {table: open(Path(dossier) / f"{table}.csv", "w", encoding="utf-8-sig", newline="")
+                             for table in COLONNES}
+        self.ecrivains = {table: csv.writer(fichier, delimiter=";") for table, fichier in self.fichiers.items()}
+        for table, ecrivain in self.ecrivains.items():
+            ecrivain.writerow(COLONNES[table])
+
+    def ajouter(self, tables):
+        for table, lignes in tables.items():
+            self.ecrivains[table].writerows(lignes)
+
+    def fermer(self):
+        if self.dossier is not None:
+            for fichier in self.fichiers.values():
+                fichier.close()
+            return None
+        tampon = io.BytesIO()
+        with zipfile.ZipFile(tampon, "w", zipfile.ZIP_DEFLATED) as archive:
+            for table, fichier in self.fichiers.items():
+                archive.writestr(f"{table}.csv", "\ufeff" + fichier.getvalue())
+        return tampon.getvalue()
+
+
+class EcrivainXLSX:
+    """Classeur XLSX en écriture seule : une feuille par table, continuée au-delà de la limite d'Excel."""
+
+    def __init__(self, destination):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("L'export XLSX nécessite openpyxl (pip install openpyxl)") from None
+        self.destination = destination
+        self.classeur = Workbook(write_only=True)
+        self.feuilles = {}  # table -> [feuille courante, numéro, lignes écrites]
+        for table in COLONNES:
+            self._nouvelle_feuille(table, 1)
+
+    def _nouvelle_feuille(self, table, numero):
+        feuille = self.classeur.create_sheet(FEUILLES[table] + (f" ({numero})" if numero > 1 else ""))
+        feuille.append(COLONNES[table])
+        self.feuilles[table] = [feuille, numero, 1]
+
+    def ajouter(self, tables):
+        for table, lignes in tables.items():
+            for ligne in lignes:
+                feuille, numero, n_lignes = self.feuilles[table]
+                if n_lignes >= LIGNES_MAX_XLSX:
+                    self._nouvelle_feuille(table, numero + 1)
+                    feuille = self.feuilles[table][0]
+                feuille.append(ligne)
+                self.feuilles[table][2] += 1
+
+    def fermer(self):
+        self.classeur.save(self.destination)
+        if isinstance(self.destination, io.BytesIO):
+            return self.destination.getvalue()
+        return None
+
+
+def exporter(scenarios, ecrivain, processus=1, journal=None):
+    """
+    Écrit les tables de chaque scénario (itérable de paramètres), dans
+    l'ordre, et renvoie le nombre de scénarios. Avec plusieurs processus, le
+    nombre de scénarios en vol est borné : la mémoire ne dépend pas de la
+    taille de l'entrée.
+    """
+    n_scenarios, debut = 0, time.perf_counter()
+
+    def ecrire(tables):
+        nonlocal n_scenarios
+        ecrivain.ajouter(tables)
+        n_scenarios += 1
+        if journal and n_scenarios % 500 == 0:
+            debit = n_scenarios / max(time.perf_counter() - debut, 1e-9)
+            print(f"{n_scenarios:,} scénarios ({debit:,.0f} / s)", file=journal)
+
+    if processus <= 1:
+        for parametres in scenarios:
+            ecrire(tables_scenario(parametres))
+        return n_scenarios
+
+    with ProcessPoolExecutor(processus) as pool:
+        en_vol = deque()
+        for parametres in scenarios:
+            en_vol.append(pool.submit(tables_scenario, parametres))
+            if len(en_vol) >= EN_VOL_PAR_PROCESSUS * processus:
+                ecrire(en_vol.popleft().result())
+        while en_vol:
+            ecrire(en_vol.popleft().result())
+    return n_scenarios
+
+
+def export_octets(parametres, format_="xlsx"):
+    """Export d'un seul scénario en mémoire (bouton de téléchargement de l'app) : XLSX, ou zip de CSV."""
+    ecrivain = EcrivainXLSX(io.BytesIO()) if format_ == "xlsx" else EcrivainCSV()
+    exporter([parametres], ecrivain)
+    return ecrivain.fermer()
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m moteur.export", description=__doc__.split("\n\n")[1])
+    parser.add_argument("entree", help="Dossier de scénarios JSON, fichier JSON ou CSV (un scénario par ligne)")
+    parser.add_argument("sortie", help="Fichier .xlsx, ou dossier recevant les trois CSV")
+    parser.add_argument("--taille-bloc", type=int, default=1_000, help="Lignes du CSV d'entrée lues par bloc")
+    parser.add_argument("--processus", type=int, default=None, help="Processus de calcul (défaut : nb de cœurs)")
+    args = parser.parse_args(arguments)
+
+    try:
+        ecrivain = EcrivainXLSX(args.sortie) if args.sortie.endswith(".xlsx") else EcrivainCSV(args.sortie)
+    except RuntimeError as exc:
+        raise SystemExit(str(exc)) from None
+    try:
+        n_scenarios = exporter(lire_scenarios(args.entree, args.taille_bloc), ecrivain,
+                               args.processus or os.cpu_count() or 1, journal=sys.stderr)
+    finally:
+        ecrivain.fermer()
+    print(f"{n_scenarios:,} scénarios exportés → {args.sortie}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Outils financiers génériques vectorisés : VAN et TRI par lot.
+
+Les flux sont des tableaux `(..., T + 1)` dont la dernière dimension est le
+temps (t = 0 pour l'investissement initial). Toutes les lignes sont résolues
+ensemble, si bien qu'une courbe de 30 TRI coûte à peu près un seul calcul.
+"""
+
+import numpy as np
+
+
+def van(flux, taux):
+    """Valeur actuelle nette de `flux` au taux annuel `taux` (décimal, broadcast)."""
+    flux = np.asarray(flux, dtype=float)
+    t = np.arange(flux.shape[-1])
+    actualisation = (1 + np.asarray(taux, dtype=float)[..., None]) ** -t
+    return (flux * actualisation).sum(axis=-1)
+
+
+def tri(flux, tol=1e-9, max_iter=100, borne_basse=-0.99, borne_haute=10.0):
+    """
+    Taux de rendement interne de chaque ligne de `flux` (décimal).
+
+    Newton sécurisé par dichotomie : toutes les lignes avancent ensemble et
+    un pas de Newton qui sort de l'intervalle encadrant la racine est remplacé
+    par le milieu de l'intervalle. Renvoie NaN quand la VAN ne change pas de
+    signe sur [`borne_basse`, `borne_haute`] (aucun TRI défini).
+    """
+    flux = np.asarray(flux, dtype=float)
+    forme = flux.shape[:-1]
+    flux = flux.reshape(-1, flux.shape[-1])
+    t = np.arange(flux.shape[-1])
+
+    def van_et_derivee(r, lignes):
+        actualisation = (1 + r[:, None]) ** -t
+        v = (lignes * actualisation).sum(axis=1)
+        dv = -(lignes * t * actualisation / (1 + r[:, None])).sum(axis=1)
+        return v, dv
+
+    bas = np.full(len(flux), borne_basse)
+    haut = np.full(len(flux), borne_haute)
+    v_bas, _ = van_et_derivee(bas, flux)
+    v_haut, _ = van_et_derivee(haut, flux)
+    encadre = np.sign(v_bas) != np.sign(v_haut)
+
+    r = np.where(encadre, 0.05, np.nan)
+    actifs = encadre.copy()
+    for _ in range(max_iter):
+        if not actifs.any():
+            break
+        v, dv = van_et_derivee(r[actifs], flux[actifs])
+        meme_signe = np.sign(v) == np.sign(v_bas[actifs])
+        bas[actifs] = np.where(meme_signe, r[actifs], bas[actifs])
+        v_bas[actifs] = np.where(meme_signe, v, v_bas[actifs])
+        haut[actifs] = np.where(meme_signe, haut[actifs], r[actifs])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r_newton = r[actifs] - v / dv
+        hors = ~np.isfinite(r_newton) | (r_newton <= bas[actifs]) | (r_newton >= haut[actifs])
+        r_suivant = np.where(hors, (bas[actifs] + haut[actifs]) / 2, r_newton)
+
+        converge = (np.abs(r_suivant - r[actifs]) < tol) | (np.abs(v) < tol)
+        r[actifs] = r_suivant
+        idx = np.flatnonzero(actifs)
+        actifs[idx[converge]] = False
+
+    return r.reshape(forme)
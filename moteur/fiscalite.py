@@ -0,0 +1,83 @@
+"""
+Fiscalité du foyer — barème progressif de l'impôt sur le revenu.
+
+Toutes les fonctions acceptent des scalaires ou des tableaux NumPy (broadcast) :
+le même code sert la boucle annuelle, la comparaison des régimes et les
+évaluations en lot (Monte Carlo, screeners) sur des milliers de revenus.
+"""
+
+import numpy as np
+
+# Barème 2025 (revenus 2024) : (seuil bas de la tranche, taux %)
+BAREME_IR = (
+    (0, 0),
+    (11_497, 11),
+    (29_315, 30),
+    (83_823, 41),
+    (180_294, 45),
+)
+PLAFOND_DEMI_PART = 1_791  # avantage max. du quotient familial par demi-part
+ABATTEMENT_SALAIRES_PCT = 10  # frais professionnels forfaitaires
+ABATTEMENT_SALAIRES_MIN = 504
+ABATTEMENT_SALAIRES_MAX = 14_426
+PRELEVEMENTS_SOCIAUX = 17.2
+PLAFOND_DEFICIT_FONCIER = 10_700  # imputation annuelle sur le revenu global
+
+_SEUILS = np.array([s for s, _ in BAREME_IR], dtype=float)
+_TAUX = np.array([t for _, t in BAREME_IR], dtype=float) / 100
+_LARGEURS = np.append(np.diff(_SEUILS), np.inf)
+
+
+def revenu_net_salaires(salaires):
+    """Salaires imposables après l'abattement forfaitaire de 10 %."""
+    salaires = np.asarray(salaires, dtype=float)
+    abattement = np.clip(salaires * ABATTEMENT_SALAIRES_PCT / 100,
+                         ABATTEMENT_SALAIRES_MIN, ABATTEMENT_SALAIRES_MAX)
+    return np.maximum(0, salaires - np.minimum(abattement, salaires))
+
+
+def _impot_par_part(quotient):
+    tranches = np.clip(quotient[..., None] - _SEUILS, 0, _LARGEURS)
+    return (tranches * _TAUX).sum(axis=-1)
+
+
+def impot_revenu(revenu_imposable, parts=1.0, couple=False):
+    """
+    Impôt sur le revenu au barème progressif, quotient familial plafonné.
+
+    `parts` est le nombre de parts du foyer ; `couple` indique une imposition
+    commune (2 parts de base), les parts au-delà étant plafonnées.
+    """
+    revenu = np.maximum(0, np.asarray(revenu_imposable, dtype=float))
+    parts = np.asarray(parts, dtype=float)
+    parts_base = np.minimum(parts, np.where(couple, 2.0, 1.0))
+
+    impot_qf = _impot_par_part(revenu / parts) * parts
+    impot_base = _impot_par_part(revenu / parts_base) * parts_base
+    demi_parts_sup = (parts - parts_base) * 2
+    return np.maximum(impot_qf, impot_base - demi_parts_sup * PLAFOND_DEMI_PART)
+
+
+def taux_marginal(revenu_imposable, parts=1.0):
+    """Tranche marginale (%) atteinte par le quotient familial."""
+    quotient = np.maximum(0, np.asarray(revenu_imposable, dtype=float)) / np.asarray(parts, dtype=float)
+    idx = np.searchsorted(_SEUILS, quotient, side="right") - 1
+    return _TAUX[np.maximum(idx, 0)] * 100
+
+
+def impot_locatif(base_locative, salaires, parts=1.0, couple=False,
+                  imputation_revenu_global=0.0, taux_ps=PRELEVEMENTS_SOCIAUX):
+    """
+    Supplément d'impôt + prélèvements sociaux dû à la location.
+
+    Calculé comme la différence d'IR du foyer avec et sans le revenu locatif,
+    de sorte qu'un revenu qui franchit une tranche est taxé à chaque taux.
+    Un déficit imputé sur le revenu global (`imputation_revenu_global`)
+    réduit l'IR sans ouvrir droit à remboursement de prélèvements sociaux :
+    le résultat est alors négatif (gain fiscal).
+    """
+    base = np.maximum(0, np.asarray(base_locative, dtype=float))
+    revenu_foyer = revenu_net_salaires(salaires)
+    ir_sans = impot_revenu(revenu_foyer, parts, couple)
+    ir_avec = impot_revenu(revenu_foyer + base - imputation_revenu_global, parts, couple)
+    return ir_avec - ir_sans + base * taux_ps / 100
@@ -0,0 +1,130 @@
+"""
+Graphe de dépendances avec mémoïsation : recalcul incrémental des grandeurs
+dérivées.
+
+Un `Graphe` déclare les nœuds (fonctions dont les noms de paramètres sont
+les dépendances) ; un `EtatGraphe`, propre à chaque session, mémorise les
+entrées et les résultats. Lire un nœud ne le recalcule que si une de ses
+dépendances a changé depuis le dernier calcul ; un nœud recalculé dont la
+valeur est identique n'invalide pas ses descendants.
+"""
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from moteur.cache import taille_objet
+
+
+def _egal(a, b):
+    """Égalité tolérante aux tableaux, DataFrames et conteneurs."""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (pd.DataFrame, pd.Series)):
+        return a.equals(b)
+    if isinstance(a, np.ndarray):
+        return a.shape == b.shape and np.array_equal(a, b, equal_nan=a.dtype.kind in "fc")
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_egal(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_egal(x, y) for x, y in zip(a, b))
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class Graphe:
+    """Déclaration des nœuds : nom -> (fonction, dépendances)."""
+
+    def __init__(self):
+        self.noeuds = {}
+
+    def noeud(self, fonction):
+        """Décorateur : déclare `fonction` comme nœud, dépendant de ses paramètres."""
+        self.noeuds[fonction.__name__] = (fonction, tuple(inspect.signature(fonction).parameters))
+        return fonction
+
+    def entrees(self):
+        """Noms requis qui ne sont pas des nœuds (à fournir via `EtatGraphe.definir`)."""
+        requis = {dep for _, deps in self.noeuds.values() for dep in deps}
+        return sorted(requis - self.noeuds.keys())
+
+    def descendants(self, noms):
+        """Nœuds impactés (directement ou non) par un changement de `noms`."""
+        impactes, frontiere = set(), set(noms)
+        while frontiere:
+            frontiere = {nom for nom, (_, deps) in self.noeuds.items()
+                         if nom not in impactes and frontiere.intersection(deps)}
+            impactes |= frontiere
+        return impactes
+
+    def dot(self, surlignes=()):
+        """Description Graphviz (DOT) du graphe ; `surlignes` en couleur."""
+        surlignes = set(surlignes)
+        lignes = ["digraph {", "  rankdir=LR;", '  node [shape=box, style="rounded,filled", fillcolor="#edf2f7"];']
+        for nom in self.entrees():
+            lignes.append(f'  "{nom}" [shape=ellipse, fillcolor="#ffffff"];')
+        for nom, (_, deps) in self.noeuds.items():
+            if nom in surlignes:
+                lignes.append(f'  "{nom}" [fillcolor="#f6ad55"];')
+            lignes.extend(f'  "{dep}" -> "{nom}";' for dep in deps)
+        lignes.append("}")
+        return "\n".join(lignes)
+
+    def etat(self):
+        return EtatGraphe(self)
+
+
+class EtatGraphe:
+    """Valeurs mémorisées d'un graphe pour une session."""
+
+    def __init__(self, graphe):
+        self.graphe = graphe
+        self.entrees = {}
+        self.versions = {}
+        self.memo = {}
+        self.recalcules = []
+        self.entrees_modifiees = []
+
+    @property
+    def nbytes(self):
+        """Empreinte des entrées et des valeurs mémorisées (budget du cache de session)."""
+        return (sum(taille_objet(valeur) for valeur in self.entrees.values())
+                + sum(taille_objet(valeur) for valeur, _ in self.memo.values()))
+
+    def nouvelle_passe(self):
+        """Remet à zéro le journal des recalculs (à appeler en début de rerun)."""
+        self.recalcules = []
+        self.entrees_modifiees = []
+
+    def definir(self, **entrees):
+        for nom, valeur in entrees.items():
+            if nom in self.graphe.noeuds:
+                raise ValueError(f"{nom!r} est un nœud calculé, pas une entrée")
+            if nom not in self.entrees or not _egal(self.entrees[nom], valeur):
+                self.entrees[nom] = valeur
+                self.versions[nom] = self.versions.get(nom, 0) + 1
+                self.entrees_modifiees.append(nom)
+
+    def __getitem__(self, nom):
+        if nom not in self.graphe.noeuds:
+            if nom not in self.entrees:
+                raise KeyError(f"{nom!r} n'est ni un nœud ni une entrée définie")
+            return self.entrees[nom]
+
+        fonction, deps = self.graphe.noeuds[nom]
+        valeurs = [self[dep] for dep in deps]
+        signature = tuple(self.versions[dep] for dep in deps)
+        if nom in self.memo and self.memo[nom][1] == signature:
+            return self.memo[nom][0]
+
+        valeur = fonction(*valeurs)
+        self.recalcules.append(nom)
+        if nom not in self.memo or not _egal(self.memo[nom][0], valeur):
+            self.versions[nom] = self.versions.get(nom, 0) + 1
+        self.memo[nom] = (valeur, signature)
+        return valeur
@@ -0,0 +1,70 @@
+"""
+Indicateurs clés d'un lot de scénarios (prêt unique à taux fixe) : mêmes
+règles que le dashboard, évaluées en une passe vectorisée sur l'année 1.
+
+Tous les paramètres acceptent des scalaires ou des tableaux de même forme
+(un élément par scénario) ; seul le régime fiscal est commun au lot.
+"""
+
+import numpy as np
+
+from moteur.credit import capital_apres, mensualite_constante
+from moteur.fiscalite import PRELEVEMENTS_SOCIAUX
+from moteur.projection import AMORTISSEMENT_MEUBLES, projection_annuelle
+
+PART_LOYER_BANQUE = 0.70  # part des loyers retenue par les banques
+
+
+def evaluer_indicateurs(regime, prix_achat, loyer_mensuel_cc, frais_notaire_pct=7.5, travaux=0.0, apport=0.0,
+                        taux_emprunt=1.8, duree_credit=20, assurance_emprunt_pct=0.20, charges_copro_an=0.0,
+                        taxe_fonciere=0.0, assurance_pno=0.0, vacance_loc_mois=0.0, revenus_foyer=0.0,
+                        parts_fiscales=1.0, imposition_commune=False, salaire_net=2_500,
+                        prelevement_sociaux=PRELEVEMENTS_SOCIAUX, abattement_cosse=50.0,
+                        mobilier=AMORTISSEMENT_MEUBLES[0]):
+    """
+    Rendements, cash-flow de l'année 1 et taux d'endettement pour un code de
+    régime (voir `moteur.projection.code_regime`) ; `abattement_cosse` (%)
+    selon la zone et la convention (voir `moteur.zonage`) ; `mobilier` :
+    meubles amortis en LMNP réel.
+
+    Renvoie un dict de tableaux : "rendement_brut", "rendement_net_charges",
+    "rendement_net_net", "cashflow_mensuel", "mensualite",
+    "endettement_nc" (non-compensation) et "endettement_comp" (compensation).
+    """
+    prix_achat = np.asarray(prix_achat, dtype=float)
+    loyer_mensuel_cc = np.asarray(loyer_mensuel_cc, dtype=float)
+    frais_notaire = prix_achat * np.asarray(frais_notaire_pct, dtype=float) / 100
+    investissement_total = prix_achat + frais_notaire + travaux
+    montant_emprunt = prix_achat + travaux - np.asarray(apport, dtype=float)
+    nb_mois = np.asarray(duree_credit) * 12
+
+    mensualite = mensualite_constante(montant_emprunt, taux_emprunt, nb_mois)
+    restant_an1 = capital_apres(montant_emprunt, taux_emprunt, mensualite, 12)
+    capital_an1 = montant_emprunt - restant_an1
+    interets_an1 = mensualite * 12 - capital_an1
+    assurance_emprunt_mensuel = montant_emprunt * np.asarray(assurance_emprunt_pct, dtype=float) / 100 / 12
+
+    loyer_effectif_an = loyer_mensuel_cc * (12 - np.asarray(vacance_loc_mois, dtype=float))
+    charges_totales_an = (np.asarray(taxe_fonciere, dtype=float) + np.asarray(charges_copro_an, dtype=float) * 0.35
+                          + assurance_pno + np.asarray(travaux, dtype=float) * 0.02)
+
+    annee1 = projection_annuelle(
+        1, regime, loyer_effectif_an, charges_copro_an, taxe_fonciere, assurance_pno,
+        np.asarray(travaux, dtype=float) * 0.02, prix_achat,
+        (mensualite * 12)[..., None], interets_an1[..., None], capital_an1[..., None], restant_an1[..., None],
+        assurance_emprunt_mensuel * 12, revenus_foyer, parts_fiscales, imposition_commune,
+        abattement_cosse=abattement_cosse, taux_ps=prelevement_sociaux, mobilier=mobilier,
+    )
+    impots_an1 = annee1["Impôts"][..., 0] - annee1["Gain Fiscal"][..., 0]
+
+    credit_mensuel = mensualite + assurance_emprunt_mensuel
+    loyer_banque = loyer_mensuel_cc * PART_LOYER_BANQUE
+    return {
+        "rendement_brut": loyer_mensuel_cc * 12 / investissement_total * 100,
+        "rendement_net_charges": (loyer_effectif_an - charges_totales_an) / investissement_total * 100,
+        "rendement_net_net": (loyer_effectif_an - charges_totales_an - impots_an1) / investissement_total * 100,
+        "cashflow_mensuel": annee1["Cash-flow Mensuel"][..., 0],
+        "mensualite": credit_mensuel,
+        "endettement_nc": credit_mensuel / (salaire_net + loyer_banque) * 100,
+        "endettement_comp": np.maximum(0, credit_mensuel - loyer_banque) / salaire_net * 100,
+    }
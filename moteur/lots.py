@@ -0,0 +1,72 @@
+"""
+Immeuble de rapport et colocation : plusieurs lots (ou chambres), chacun
+avec son loyer, sa vacance, ses charges et son mobilier.
+
+Les calculs par lot sont vectorisés (un tableau par colonne, une ligne par
+lot) puis agrégés en paramètres du bien entier : le reste du modèle
+(crédit, fiscalité, projection) traite l'immeuble comme un seul bien, quel
+que soit le nombre de lots.
+"""
+
+import pandas as pd
+
+from moteur.projection import PART_CHARGES_RECUPERABLES, facteurs_indexation
+
+# Lots proposés à l'ouverture de l'éditeur : une colocation de quatre chambres
+LOTS_EXEMPLE = pd.DataFrame({
+    "Lot": [f"Chambre {i}" for i in range(1, 5)],
+    "Loyer CC (€)": [420, 420, 400, 380],
+    "Vacance (mois/an)": [0.75, 0.75, 0.75, 1.0],
+    "Charges copro / an (€)": [250, 250, 250, 250],
+    "Meublé": [True, True, True, True],
+    "Mobilier (€)": [2_500, 2_500, 2_500, 2_500],
+})
+DEFAUTS_LOT = {"Vacance (mois/an)": 0.0, "Charges copro / an (€)": 0.0, "Meublé": False, "Mobilier (€)": 0.0}
+
+
+def normaliser_lots(lots):
+    """Lots complets (DataFrame) : lignes sans loyer écartées, cellules vides aux valeurs par défaut."""
+    lots = pd.DataFrame(lots)
+    if "Loyer CC (€)" not in lots:
+        raise ValueError("Colonne « Loyer CC (€) » absente des lots")
+    lots = lots.dropna(subset=["Loyer CC (€)"]).reset_index(drop=True)
+    lots = lots.assign(**{nom: lots[nom].fillna(defaut) if nom in lots else defaut
+                          for nom, defaut in DEFAUTS_LOT.items()})
+    noms = pd.Series([f"Lot {i + 1}" for i in range(len(lots))])
+    lots["Lot"] = lots["Lot"].fillna(noms) if "Lot" in lots else noms
+    return lots
+
+
+def agreger_lots(lots):
+    """
+    Paramètres du bien entier : loyer CC et charges cumulés, vacance
+    équivalente (pondérée par les loyers, pour que le loyer perçu soit la
+    somme de ceux des lots) et mobilier amortissable des lots meublés.
+    """
+    loyers = lots["Loyer CC (€)"].to_numpy(dtype=float)
+    vacances = lots["Vacance (mois/an)"].to_numpy(dtype=float)
+    loyer_total = loyers.sum()
+    return {
+        "loyer_mensuel_cc": float(loyer_total),
+        "vacance_loc_mois": float(loyers @ vacances / loyer_total) if loyer_total else 0.0,
+        "charges_copro_an": float(lots["Charges copro / an (€)"].to_numpy(dtype=float).sum()),
+        "mobilier": float(lots["Mobilier (€)"].to_numpy(dtype=float)[lots["Meublé"].to_numpy(dtype=bool)].sum()),
+    }
+
+
+def echeancier_lots(lots, n_annees, indexation_loyer=0.0, indexation_charges=0.0):
+    """
+    Détail annuel par lot, tableaux `(n_lots, n_annees)` : "Loyer Effectif",
+    "Charges Récupérables" et "Contribution" (loyer perçu moins la part non
+    récupérable des charges). Leur somme sur les lots est celle du bien.
+    """
+    loyers = lots["Loyer CC (€)"].to_numpy(dtype=float)[:, None]
+    vacances = lots["Vacance (mois/an)"].to_numpy(dtype=float)[:, None]
+    charges = lots["Charges copro / an (€)"].to_numpy(dtype=float)[:, None]
+    loyer_effectif = loyers * (12 - vacances) * facteurs_indexation(indexation_loyer, n_annees)
+    charges = charges * facteurs_indexation(indexation_charges, n_annees)
+    return {
+        "Loyer Effectif": loyer_effectif,
+        "Charges Récupérables": charges * PART_CHARGES_RECUPERABLES,
+        "Contribution": loyer_effectif - charges * (1 - PART_CHARGES_RECUPERABLES),
+    }
@@ -0,0 +1,150 @@
+"""
+Indices mensuels des prix du logement (national, par ville) : saisonnalité,
+tendance glissante et glissement annuel, par fenêtres glissantes vectorisées.
+
+Fichiers CSV acceptés :
+  - large : une colonne `mois` (AAAA-MM) puis une colonne par série
+    (« France », « Lyon »…) ;
+  - long : colonnes `serie`, `mois`, `indice`.
+
+Les analyses sont gardées par série dans le cache de la session
+(`moteur.cache`, borné en mémoire) : quand la série revient avec des mois
+en plus (même historique), seule la fin est recalculée.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+MOIS = ["Jan", "Fév", "Mar", "Avr", "Mai", "Jun", "Jul", "Aoû", "Sep", "Oct", "Nov", "Déc"]
+# Profil indicatif (écart au prix moyen de l'année, %) quand aucune série n'est chargée
+PROFIL_INDICATIF = np.array([-0.2, -0.2, -0.2, 1.8, 1.8, 1.8, -0.2, -0.2, -0.2, -1.4, -1.4, -1.4])
+RECUL = 24  # mois recalculés avant les nouveaux (fenêtres centrées et glissantes)
+
+
+def lire_indices(source):
+    """Séries d'un fichier CSV (chemin ou fichier ouvert) : DataFrame indexé par mois, une colonne par série."""
+    brut = pd.read_csv(source)
+    if {"serie", "mois", "indice"} <= set(brut.columns):
+        brut = brut.pivot_table(index="mois", columns="serie", values="indice")
+    else:
+        if "mois" not in brut.columns:
+            raise ValueError("Colonne « mois » absente (format AAAA-MM)")
+        brut = brut.set_index("mois")
+    brut.index = pd.PeriodIndex(brut.index.astype(str), freq="M")
+    brut = brut.sort_index().apply(pd.to_numeric, errors="coerce")
+    return brut.reindex(pd.period_range(brut.index.min(), brut.index.max(), freq="M")).rename_axis("mois")
+
+
+def indices_disponibles(dossier):
+    """Toutes les séries des CSV d'un dossier : dict nom -> Series (« fichier — série » en cas de doublon)."""
+    series = {}
+    for chemin in sorted(Path(dossier).glob("*.csv")):
+        for nom, serie in lire_indices(chemin).items():
+            series[nom if nom not in series else f"{chemin.stem} — {nom}"] = bornee(serie)
+    return series
+
+
+def bornee(serie):
+    """Série limitée à ses mois renseignés extrêmes (les trous intérieurs restent NaN)."""
+    return serie.loc[serie.first_valid_index():serie.last_valid_index()]
+
+
+def moyenne_centree_2x12(valeurs):
+    """Moyenne mobile centrée 2×12 (tendance d'une série mensuelle) ; NaN sur 6 mois à chaque bout."""
+    valeurs = np.asarray(valeurs, dtype=float)
+    tendance = np.full(len(valeurs), np.nan)
+    if len(valeurs) >= 13:
+        poids = np.r_[0.5, np.ones(11), 0.5] / 12
+        tendance[6:-6] = sliding_window_view(valeurs, 13) @ poids
+    return tendance
+
+
+def pente_glissante(valeurs, fenetre=12):
+    """Tendance annualisée (%) : pente des moindres carrés du log de l'indice sur les `fenetre` derniers mois."""
+    log = np.log(np.asarray(valeurs, dtype=float))
+    pente = np.full(len(log), np.nan)
+    if len(log) >= fenetre:
+        t = np.arange(fenetre) - (fenetre - 1) / 2
+        pente[fenetre - 1:] = sliding_window_view(log, fenetre) @ (t / (t ** 2).sum())
+    return np.expm1(pente * 12) * 100
+
+
+def glissement_annuel(valeurs):
+    """Variation sur un an (%) de chaque mois."""
+    valeurs = np.asarray(valeurs, dtype=float)
+    glissement = np.full(len(valeurs), np.nan)
+    glissement[12:] = (valeurs[12:] / valeurs[:-12] - 1) * 100
+    return glissement
+
+
+class AnalyseIndice:
+    """Analyse d'une série mensuelle, prolongeable sans tout recalculer."""
+
+    def __init__(self, serie):
+        self.mois = serie.index
+        self.valeurs = serie.to_numpy(dtype=float)
+        self.tendance = moyenne_centree_2x12(self.valeurs)
+        self.pente = pente_glissante(self.valeurs)
+        self.glissement = glissement_annuel(self.valeurs)
+
+    @property
+    def nbytes(self):
+        return self.valeurs.nbytes * 4 + self.mois.memory_usage()
+
+    def prolonger(self, serie):
+        """
+        Même historique avec des mois en plus : seuls les `RECUL` derniers
+        mois connus et les nouveaux sont recalculés. Renvoie faux si
+        l'historique a changé (il faut alors une nouvelle analyse).
+        """
+        valeurs = serie.to_numpy(dtype=float)
+        n = len(self.valeurs)
+        if (len(valeurs) < n or not np.array_equal(valeurs[:n], self.valeurs, equal_nan=True)
+                or not serie.index[:n].equals(self.mois)):
+            return False
+        if len(valeurs) == n:
+            return True
+        debut = max(0, n - RECUL)
+        # Les fenêtres tronquées au début du recul gardent les valeurs déjà calculées
+        garde = RECUL // 2 if debut else 0
+        for nom, calcul in (("tendance", moyenne_centree_2x12), ("pente", pente_glissante),
+                            ("glissement", glissement_annuel)):
+            setattr(self, nom, np.concatenate([getattr(self, nom)[:debut + garde], calcul(valeurs[debut:])[garde:]]))
+        self.mois, self.valeurs = serie.index, valeurs
+        return True
+
+    def saisonnalite(self):
+        """
+        Écart moyen (%) de chaque mois calendaire à la tendance (modèle
+        multiplicatif), recentré pour que les 12 mois soient en moyenne nuls.
+        """
+        ratio = np.log(self.valeurs / self.tendance)
+        valide = np.isfinite(ratio)
+        mois = np.asarray(self.mois.month) - 1
+        comptes = np.bincount(mois[valide], minlength=12)
+        moyenne = np.bincount(mois[valide], weights=ratio[valide], minlength=12) / np.maximum(comptes, 1)
+        if not comptes.any():  # moins de 13 mois : pas de tendance centrée
+            return np.full(12, np.nan)
+        moyenne = np.where(comptes > 0, moyenne, np.nan)
+        return np.expm1(moyenne - np.nanmean(moyenne)) * 100
+
+    def tableau(self):
+        return pd.DataFrame({"Indice": self.valeurs, "Tendance": self.tendance,
+                             "Tendance annualisée (%)": self.pente, "Glissement annuel (%)": self.glissement},
+                            index=self.mois.to_timestamp())
+
+
+def analyse(cache, source, nom, serie):
+    """
+    Analyse de la série `nom` de `source` gardée dans `cache` (un
+    `moteur.cache.CacheSession`), prolongée si la série s'est allongée.
+    """
+    cle = ("indice", source, nom)
+    courante = cache.get(cle)
+    if courante is None or not courante.prolonger(serie):
+        courante = AnalyseIndice(serie)
+    cache[cle] = courante  # taille recomptée après un prolongement
+    return courante
@@ -0,0 +1,254 @@
+"""
+Modèle du dashboard : grandeurs dérivées des paramètres déclarées comme
+nœuds d'un graphe de dépendances (voir `moteur.graphe`).
+
+Chaque nœud porte le nom de la variable utilisée dans l'app ; ses
+paramètres sont les entrées de la sidebar ou d'autres nœuds.
+"""
+
+import numpy as np
+
+from moteur.credit import LigneCredit, cumul_annuel, echeancier_composite
+from moteur.fiscalite import impot_locatif
+from moteur.graphe import Graphe
+from moteur.projection import AMORTISSEMENT_BATI, AMORTISSEMENT_MEUBLES, code_regime, projection_annuelle
+from moteur.revente import balayage_revente
+from moteur.zonage import abattement_cosse as abattement_zone
+
+NATURES_CREDIT = {"Amortissable": "amortissable", "In fine": "in_fine", "À paliers": "paliers"}
+HORIZON_REVENTE = 30  # années de sortie balayées
+
+modele = Graphe()
+
+
+# ── Acquisition & financement ──────────────────────────────────────
+
+@modele.noeud
+def frais_notaire(prix_achat, frais_notaire_pct):
+    return prix_achat * frais_notaire_pct / 100
+
+
+@modele.noeud
+def investissement_total(prix_achat, frais_notaire, travaux):
+    return prix_achat + frais_notaire + travaux
+
+
+@modele.noeud
+def besoin_financement(prix_achat, travaux, apport):
+    return prix_achat + travaux - apport
+
+
+@modele.noeud
+def nb_mois(duree_credit):
+    return duree_credit * 12
+
+
+@modele.noeud
+def taux_mensuel(taux_emprunt):
+    return taux_emprunt / 100 / 12
+
+
+@modele.noeud
+def lignes_credit(financement_composite, lignes_editees, besoin_financement, taux_emprunt, nb_mois):
+    # Plan de financement : une ligne à taux fixe, ou les lignes saisies
+    if not financement_composite or lignes_editees is None or not len(lignes_editees):
+        return [LigneCredit(besoin_financement, taux_emprunt, nb_mois)]
+    lignes = []
+    for _, ligne in lignes_editees.iterrows():
+        duree_ligne = int(ligne["Durée (ans)"]) * 12
+        differe = int(ligne["Différé (mois)"])
+        palier = int(ligne["Palier (ans)"]) * 12
+        progression = 1 + ligne["Progression (%)"] / 100
+        lignes.append(LigneCredit(
+            float(ligne["Montant (€)"]), float(ligne["Taux (%)"]), duree_ligne,
+            nature=NATURES_CREDIT[ligne["Type"]], differe_mois=differe,
+            differe_total=bool(ligne["Différé total"]),
+            paliers=tuple((palier, progression ** k) for k in range(-(-(duree_ligne - differe) // palier))),
+        ))
+    return lignes
+
+
+@modele.noeud
+def montant_emprunt(lignes_credit):
+    return sum(ligne.montant for ligne in lignes_credit)
+
+
+@modele.noeud
+def echeancier(lignes_credit):
+    return echeancier_composite(lignes_credit)
+
+
+@modele.noeud
+def mensualites_an(echeancier):
+    return cumul_annuel(echeancier["mensualite"])
+
+
+@modele.noeud
+def interets_par_an(echeancier):
+    return cumul_annuel(echeancier["interets"])
+
+
+@modele.noeud
+def capital_par_an(echeancier):
+    return cumul_annuel(echeancier["capital_rembourse"])
+
+
+@modele.noeud
+def capital_restant_an(echeancier):
+    return echeancier["capital_restant"][11::12]  # durées en années entières
+
+
+@modele.noeud
+def mensualite(mensualites_an):
+    return mensualites_an[0] / 12  # moyenne de l'année 1
+
+
+@modele.noeud
+def assurance_emprunt_mensuel(montant_emprunt, assurance_emprunt_pct):
+    return montant_emprunt * assurance_emprunt_pct / 100 / 12
+
+
+# ── Loyers & rendements ────────────────────────────────────────────
+
+@modele.noeud
+def loyer_annuel_cc(loyer_mensuel_cc):
+    return loyer_mensuel_cc * 12
+
+
+@modele.noeud
+def loyer_effectif_an(loyer_mensuel_cc, vacance_loc_mois):
+    return loyer_mensuel_cc * (12 - vacance_loc_mois)
+
+
+@modele.noeud
+def loyer_nu_an(loyer_effectif_an, charges_copro_an):
+    return loyer_effectif_an - charges_copro_an * 0.65  # part récup. estimée
+
+
+@modele.noeud
+def charges_totales_an(taxe_fonciere, charges_copro_an, assurance_pno, travaux):
+    return taxe_fonciere + (charges_copro_an * 0.35) + assurance_pno + travaux * 0.02  # 2% entretien
+
+
+@modele.noeud
+def rendement_brut(loyer_annuel_cc, investissement_total):
+    return (loyer_annuel_cc / investissement_total) * 100
+
+
+@modele.noeud
+def rendement_net_charges(loyer_effectif_an, charges_totales_an, investissement_total):
+    return ((loyer_effectif_an - charges_totales_an) / investissement_total) * 100
+
+
+# ── Projection & fiscalité ─────────────────────────────────────────
+
+@modele.noeud
+def abattement_cosse(zone_abc, convention_cosse):
+    return abattement_zone(zone_abc, convention_cosse)
+
+
+@modele.noeud
+def projection(regime_fiscal, loyer_effectif_an, charges_copro_an, taxe_fonciere, assurance_pno, travaux,
+               prix_achat, mensualites_an, interets_par_an, capital_par_an, capital_restant_an,
+               assurance_emprunt_mensuel, revenus_foyer, parts_fiscales, imposition_commune,
+               indexation_loyer, indexation_charges, indexation_taxe, indexation_valeur, inflation,
+               abattement_cosse, mobilier, prelevement_sociaux):
+    # Projection annuelle (vectorisée, indexée) — au-delà du crédit pour la revente
+    return projection_annuelle(
+        max(30, len(mensualites_an)), code_regime(regime_fiscal),
+        loyer_effectif_an, charges_copro_an, taxe_fonciere, assurance_pno, travaux * 0.02, prix_achat,
+        mensualites_an, interets_par_an, capital_par_an, capital_restant_an, assurance_emprunt_mensuel * 12,
+        revenus_foyer, parts_fiscales, imposition_commune,
+        indexation_loyer, indexation_charges, indexation_taxe, indexation_valeur, inflation,
+        abattement_cosse=abattement_cosse, taux_ps=prelevement_sociaux, mobilier=mobilier,
+    )
+
+
+@modele.noeud
+def projection_credit(projection, mensualites_an):
+    return projection.annees(len(mensualites_an))
+
+
+@modele.noeud
+def impots_nets_an1(projection):
+    return float(projection["Impôts"][0] - projection["Gain Fiscal"][0])
+
+
+@modele.noeud
+def rendement_net_net(loyer_effectif_an, charges_totales_an, impots_nets_an1, investissement_total):
+    return ((loyer_effectif_an - charges_totales_an - impots_nets_an1) / investissement_total) * 100
+
+
+@modele.noeud
+def cashflow_mensuel(projection):
+    return float(projection["Cash-flow Mensuel"][0])
+
+
+@modele.noeud
+def regimes(projection, loyer_nu_an, loyer_effectif_an, taxe_fonciere, assurance_pno, charges_copro_an, prix_achat,
+            revenus_foyer, parts_fiscales, imposition_commune, prelevement_sociaux, abattement_cosse, mobilier):
+    # Impôts année 1 par régime : un seul appel vectorisé au barème
+    charges_deductibles_an1 = projection["Intérêts"][0] + taxe_fonciere + assurance_pno + charges_copro_an * 0.35
+    bases_regimes = {
+        "Micro-foncier": loyer_nu_an * 0.70,
+        "Réel (Déf. Foncier)": max(0, loyer_nu_an - charges_deductibles_an1),
+        f"Réel + Cosse ({abattement_cosse:.0f} %)": max(0, loyer_nu_an * (1 - abattement_cosse / 100)
+                                                       - charges_deductibles_an1),
+        "Micro-BIC (Meublé)": loyer_effectif_an * 0.50,
+        "LMNP Réel": max(0, loyer_effectif_an - (charges_deductibles_an1 + prix_achat * 0.90 / 30
+                                                 + mobilier / AMORTISSEMENT_MEUBLES[1])),
+    }
+    impots = impot_locatif(np.array(list(bases_regimes.values())), revenus_foyer, parts_fiscales,
+                           imposition_commune, taux_ps=prelevement_sociaux)
+    return dict(zip(bases_regimes, impots))
+
+
+# ── Revente ────────────────────────────────────────────────────────
+
+@modele.noeud
+def df_revente(projection, regime_fiscal, prix_achat, frais_notaire, travaux, investissement_total,
+               montant_emprunt, indexation_valeur, frais_revente_pct):
+    if code_regime(regime_fiscal) == "lmnp_reel":
+        # Amortissements du bâti réintégrés dans la plus-value (LF 2025)
+        part_bati, duree_bati = AMORTISSEMENT_BATI
+        amort_cumules = np.minimum(np.arange(1, HORIZON_REVENTE + 1) * prix_achat * part_bati / duree_bati,
+                                   prix_achat * part_bati)
+    else:
+        amort_cumules = 0.0
+    return balayage_revente(
+        prix_achat, frais_notaire, travaux, investissement_total - montant_emprunt,
+        projection["Cash-flow Annuel"][:HORIZON_REVENTE], projection["Capital Restant Dû"][:HORIZON_REVENTE],
+        indexation_valeur, frais_revente_pct, amort_cumules,
+    )
+
+
+# ── Stress test ────────────────────────────────────────────────────
+
+@modele.noeud
+def loyer_stress(loyer_mensuel_cc, stress_loyer, stress_vacance):
+    return loyer_mensuel_cc * (1 - stress_loyer / 100) * (12 - stress_vacance)
+
+
+@modele.noeud
+def cf_stress(loyer_stress, charges_totales_an, stress_charges, projection, stress_impots, mensualite,
+              assurance_emprunt_mensuel):
+    charges_stress = charges_totales_an * (1 + stress_charges / 100)
+    impots_stress = max(0, projection["Impôts"][0]) * (1 + stress_impots / 100)
+    return (loyer_stress - (mensualite + assurance_emprunt_mensuel) * 12 - charges_stress - impots_stress) / 12
+
+
+@modele.noeud
+def rdt_stress(loyer_stress, investissement_total):
+    return (loyer_stress / investissement_total) * 100
+
+
+# ── Comparables ────────────────────────────────────────────────────
+
+@modele.noeud
+def prix_m2_bien(prix_achat, surface_m2):
+    return prix_achat / surface_m2 if surface_m2 > 0 else 0
+
+
+@modele.noeud
+def decote_pct(prix_m2_marche, prix_m2_bien):
+    return ((prix_m2_marche - prix_m2_bien) / prix_m2_marche) * 100 if prix_m2_marche > 0 else 0
@@ -0,0 +1,202 @@
+"""
+Sélection d'un portefeuille parmi des biens candidats (voir
+`moteur.candidats`) : le sous-ensemble qui maximise le cash-flow ou le
+patrimoine net, sous l'épargne disponible (mises de fonds), la règle
+d'endettement de la banque et un plancher de sérénité facultatif.
+
+Les deux règles d'endettement de l'onglet Financement sont linéaires en la
+sélection x (0/1), avec m la mensualité, L le loyer et t le taux maximal :
+
+    non-compensation : Σ m / (salaire + 70 % Σ L) ≤ t  ⇔  Σ (m − t·0,7·L) ≤ t·salaire
+    compensation     : (Σ m − 70 % Σ L) / salaire ≤ t   ⇔  Σ (m − 0,7·L) ≤ t·salaire
+
+d'où un sac à dos 0/1 à deux contraintes (poids d'endettement de signe
+quelconque), résolu exactement par séparation et évaluation.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.indicateurs import PART_LOYER_BANQUE
+
+TAUX_ENDETTEMENT_MAX = 35.0  # recommandation HCSF (%)
+OBJECTIFS = {"cashflow": "Cash-flow Mensuel", "patrimoine": "Patrimoine Net 10 ans"}
+
+
+@dataclass
+class Selection:
+    """Résultat du solveur : masque des objets retenus, valeur, preuve d'optimalité."""
+    retenus: np.ndarray
+    valeur: float
+    optimale: bool
+    noeuds: int
+
+
+def _sac_fractionnaire(valeurs, poids, capacite):
+    """Borne du sac à dos fractionnaire (objets à valeur positive, meilleur rapport d'abord)."""
+    utiles = valeurs > 0
+    valeurs, poids = valeurs[utiles], poids[utiles]
+    ordre = np.argsort(-valeurs / np.maximum(poids, 1e-12))
+    cumul = np.cumsum(poids[ordre])
+    complets = np.searchsorted(cumul, capacite, side="right")
+    borne = valeurs[ordre][:complets].sum()
+    if complets < len(ordre):
+        reste = capacite - (cumul[complets - 1] if complets else 0.0)
+        borne += valeurs[ordre][complets] * reste / max(poids[ordre][complets], 1e-12)
+    return borne
+
+
+def _multiplicateur(valeurs, mises, poids_dette, epargne, capacite_dette, iterations=60):
+    """
+    Multiplicateur de Lagrange λ ≥ 0 de la contrainte d'endettement qui
+    minimise la borne λ·capacité + sac fractionnaire(v − λ·w) (fonction
+    convexe de λ : recherche ternaire).
+    """
+    positifs = poids_dette > 0
+    haut = float((valeurs[positifs] / poids_dette[positifs]).max()) if positifs.any() else 0.0
+    if haut <= 0:
+        return 0.0
+
+    def borne(lam):
+        return lam * capacite_dette + _sac_fractionnaire(valeurs - lam * poids_dette, mises, epargne)
+
+    bas = 0.0
+    for _ in range(iterations):
+        m1, m2 = bas + (haut - bas) / 3, haut - (haut - bas) / 3
+        if borne(m1) <= borne(m2):
+            haut = m2
+        else:
+            bas = m1
+    return (bas + haut) / 2
+
+
+def selectionner(valeurs, mises, poids_dette, epargne, capacite_dette, noeuds_max=1_000_000):
+    """
+    Sac à dos 0/1 : maximise Σ valeurs sous Σ mises ≤ epargne (mises ≥ 0) et
+    Σ poids_dette ≤ capacite_dette (poids de signe quelconque).
+
+    Parcours en profondeur, objets triés par rapport valeur lagrangienne /
+    mise ; chaque nœud est borné par la relaxation lagrangienne de la
+    contrainte d'endettement (sac fractionnaire en O(log n) par sommes
+    cumulées) et élagué si la dette ne peut plus redescendre sous le
+    plafond. Au-delà de `noeuds_max`, la meilleure sélection trouvée est
+    rendue avec `optimale=False`.
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    mises = np.asarray(mises, dtype=float)
+    poids_dette = np.asarray(poids_dette, dtype=float)
+    n = len(valeurs)
+
+    lam = _multiplicateur(valeurs, mises, poids_dette, epargne, capacite_dette)
+    lagrangiens = valeurs - lam * poids_dette
+    ordre = np.argsort(-lagrangiens / np.maximum(mises, 1e-12))
+    v, a, w, vl = valeurs[ordre], mises[ordre], poids_dette[ordre], lagrangiens[ordre]
+
+    # Sommes cumulées des objets à valeur lagrangienne positive (en tête après le tri)
+    n_positifs = int((vl > 0).sum())
+    cumul_a = [0.0, *np.cumsum(a[:n_positifs]).tolist()]
+    cumul_v = [0.0, *np.cumsum(vl[:n_positifs]).tolist()]
+    # Dette minimale atteignable avec les objets restants (poids négatifs)
+    dette_min_reste = np.concatenate([np.cumsum(np.minimum(w, 0)[::-1])[::-1], [0.0]]).tolist()
+    v, a, w, vl = v.tolist(), a.tolist(), w.tolist(), vl.tolist()
+
+    def borne(k, reste_epargne):
+        if k >= n_positifs:
+            return 0.0
+        cible = cumul_a[k] + reste_epargne
+        j = bisect_right(cumul_a, cible) - 1  # objets k..j-1 entiers
+        if j >= n_positifs:
+            return cumul_v[n_positifs] - cumul_v[k]
+        return cumul_v[j] - cumul_v[k] + vl[j] * (cible - cumul_a[j]) / max(a[j], 1e-12)
+
+    meilleure, meilleur_choix = 0.0, []
+    pile = [(0, epargne, 0.0, 0.0, [])]  # (profondeur, épargne restante, dette, valeur, choix)
+    noeuds = 0
+    while pile:
+        k, reste, dette, valeur, choix = pile.pop()
+        noeuds += 1
+        if noeuds > noeuds_max:
+            break
+        if dette <= capacite_dette and valeur > meilleure:
+            meilleure, meilleur_choix = valeur, choix
+        if k == n or dette + dette_min_reste[k] > capacite_dette:
+            continue
+        if valeur + lam * (capacite_dette - dette) + borne(k, reste) <= meilleure + 1e-9:
+            continue
+        pile.append((k + 1, reste, dette, valeur, choix))
+        if a[k] <= reste:  # branche « on prend » explorée d'abord
+            pile.append((k + 1, reste - a[k], dette + w[k], valeur + v[k], choix + [k]))
+
+    retenus = np.zeros(n, dtype=bool)
+    retenus[ordre[meilleur_choix]] = True
+    return Selection(retenus, meilleure, noeuds <= noeuds_max, noeuds)
+
+
+def endettement_portefeuille(mensualites, loyers, salaire_net, methode):
+    """Taux d'endettement (%) d'un ensemble de biens selon la méthode de la banque."""
+    mensualites, loyer_banque = np.sum(mensualites), np.sum(loyers) * PART_LOYER_BANQUE
+    if methode == "compensation":
+        return max(0.0, mensualites - loyer_banque) / salaire_net * 100
+    return mensualites / (salaire_net + loyer_banque) * 100
+
+
+def optimiser_portefeuille(candidats, epargne, salaire_net, methode="non_compensation",
+                           taux_max=TAUX_ENDETTEMENT_MAX, plancher_serenite=None, objectif="cashflow"):
+    """
+    Portefeuille optimal parmi `candidats` (sortie de `evaluer_candidats`).
+    Renvoie la `Selection`, les candidats complétés de « Retenu » et
+    « Explication », et les totaux du portefeuille.
+    """
+    t = taux_max / 100
+    mensualites = candidats["Mensualité"].to_numpy(dtype=float)
+    loyers = candidats["Loyer CC"].to_numpy(dtype=float)
+    mises = candidats["Mise de Fonds"].to_numpy(dtype=float)
+    valeurs = candidats[OBJECTIFS[objectif]].to_numpy(dtype=float)
+    serenite = candidats["Sérénité"].to_numpy(dtype=float)
+    part = t * PART_LOYER_BANQUE if methode == "non_compensation" else PART_LOYER_BANQUE
+    poids_dette = mensualites - part * loyers
+    capacite_dette = t * salaire_net
+
+    # Écartés d'office : sous le plancher, trop chers seuls, ou sans intérêt
+    # (valeur négative sans alléger l'endettement) — le solveur n'en voit rien
+    sous_plancher = serenite < plancher_serenite if plancher_serenite else np.zeros(len(candidats), dtype=bool)
+    trop_cher = mises > epargne
+    inutile = (valeurs <= 0) & (poids_dette >= 0)
+    eligibles = np.flatnonzero(~(sous_plancher | trop_cher | inutile))
+
+    selection = selectionner(valeurs[eligibles], mises[eligibles], poids_dette[eligibles], epargne, capacite_dette)
+    retenus = np.zeros(len(candidats), dtype=bool)
+    retenus[eligibles[selection.retenus]] = True
+    selection.retenus = retenus
+
+    mise_totale = mises[retenus].sum()
+    endettement = endettement_portefeuille(mensualites[retenus], loyers[retenus], salaire_net, methode)
+    libelle = OBJECTIFS[objectif].lower()
+    explications = []
+    for i in range(len(candidats)):
+        if retenus[i]:
+            explications.append(f"Retenu : {libelle} {valeurs[i]:+,.0f} €, mise de fonds {mises[i]:,.0f} €")
+        elif sous_plancher[i]:
+            explications.append(f"Sérénité {serenite[i]:.0f} sous le plancher de {plancher_serenite:.0f}")
+        elif trop_cher[i]:
+            explications.append(f"Mise de fonds {mises[i]:,.0f} € supérieure à l'épargne disponible")
+        elif inutile[i]:
+            explications.append(f"N'améliore pas l'objectif ({libelle} {valeurs[i]:+,.0f} €)")
+        else:
+            # Écarté par l'optimisation : ce que coûterait son ajout à la sélection
+            motifs = []
+            if mise_totale + mises[i] > epargne:
+                motifs.append(f"dépasserait l'épargne de {mise_totale + mises[i] - epargne:,.0f} €")
+            taux = endettement_portefeuille(np.append(mensualites[retenus], mensualites[i]),
+                                            np.append(loyers[retenus], loyers[i]), salaire_net, methode)
+            if taux > taux_max:
+                motifs.append(f"porterait l'endettement à {taux:.1f} %")
+            explications.append("S'il était ajouté : " + " et ".join(motifs) + " — les biens retenus "
+                                 "rapportent plus pour ces ressources" if motifs else
+                                 f"Écarté : un autre arbitrage rapporte plus ({libelle} {valeurs[i]:+,.0f} €)")
+
+    detail = candidats.assign(Retenu=retenus, Explication=explications)
+    return selection, detail, {"Mise de fonds": mise_totale, "Endettement (%)": endettement,
+                               "Objectif": valeurs[retenus].sum()}
@@ -0,0 +1,187 @@
+"""
+Projection annuelle du bien : loyers, charges, impôts et cash-flow année par
+année, avec indexation (IRL, charges, taxe foncière, valeur du bien).
+
+Aucune boucle Python sur les années : les paramètres d'un scénario sont des
+scalaires ou des tableaux `(...)` (lot de scénarios) et les séries du crédit
+des tableaux `(..., n_annees)`. Le même code sert l'app, le Monte Carlo, les
+screeners et les traitements batch.
+"""
+
+import numpy as np
+import pandas as pd
+
+from moteur.fiscalite import PLAFOND_DEFICIT_FONCIER, PRELEVEMENTS_SOCIAUX, impot_locatif
+
+PART_CHARGES_RECUPERABLES = 0.65  # part des charges de copro refacturée au locataire
+AMORTISSEMENT_BATI = (0.90, 30)  # 90 % du prix sur 30 ans (LMNP réel)
+AMORTISSEMENT_MEUBLES = (3000, 7)  # meubles sur 7 ans
+
+
+def code_regime(libelle):
+    """Code interne d'un libellé de régime fiscal de la sidebar."""
+    if "Micro-foncier" in libelle:
+        return "micro_foncier"
+    if "Réel" in libelle and "Cosse" in libelle:
+        return "cosse"
+    if "Réel" in libelle and "Déficit" in libelle:
+        return "deficit_foncier"
+    if "Micro-BIC" in libelle:
+        return "micro_bic"
+    if "LMNP" in libelle and "Réel" in libelle:
+        return "lmnp_reel"
+    raise ValueError(f"Régime fiscal inconnu : {libelle!r}")
+
+
+def facteurs_indexation(taux_pct, n_annees):
+    """Facteurs `(1 + g)^(t - 1)` pour t = 1..n_annees, broadcast sur `taux_pct`."""
+    return (1 + np.asarray(taux_pct, dtype=float)[..., None] / 100) ** np.arange(n_annees)
+
+
+def prolonger(serie, n_annees):
+    """Complète une série annuelle `(..., n)` par des zéros jusqu'à `n_annees` (fin du crédit)."""
+    serie = np.asarray(serie, dtype=float)
+    manque = n_annees - serie.shape[-1]
+    if manque < 0:
+        return serie[..., :n_annees]
+    return np.pad(serie, [(0, 0)] * (serie.ndim - 1) + [(0, manque)])
+
+
+def _par_scenario(valeur):
+    return np.asarray(valeur, dtype=float)[..., None]
+
+
+class ResultatAnnuel:
+    """
+    Résultat colonnaire de `projection_annuelle` : un tableau NumPy par
+    colonne, gardé dans sa forme propre (l'année ou le déflateur, communs à
+    tous les scénarios, ne sont pas dupliqués) et lu en `(..., n_annees)`.
+
+    Le DataFrame n'est construit qu'à l'affichage (`vers_dataframe`).
+    """
+
+    def __init__(self, colonnes, forme):
+        self.colonnes = colonnes
+        self.forme = tuple(forme)
+
+    def __getitem__(self, nom):
+        return np.broadcast_to(self.colonnes[nom], self.forme)
+
+    def __contains__(self, nom):
+        return nom in self.colonnes
+
+    def __eq__(self, autre):
+        if not isinstance(autre, ResultatAnnuel):
+            return NotImplemented
+        return (self.forme == autre.forme and self.colonnes.keys() == autre.colonnes.keys()
+                and all(np.array_equal(self[nom], autre[nom]) for nom in self.colonnes))
+
+    def keys(self):
+        return self.colonnes.keys()
+
+    @property
+    def n_annees(self):
+        return self.forme[-1]
+
+    @property
+    def nbytes(self):
+        return sum(colonne.nbytes for colonne in self.colonnes.values())
+
+    def annees(self, n):
+        """Les `n` premières années (vues, sans copie)."""
+        return ResultatAnnuel({nom: colonne[..., :n] for nom, colonne in self.colonnes.items()},
+                              self.forme[:-1] + (min(n, self.n_annees),))
+
+    def vers_dataframe(self, scenario=()):
+        """Tableau d'un scénario (indice dans le lot ; rien pour un scénario unique)."""
+        return pd.DataFrame({nom: self[nom][scenario] for nom in self.colonnes})
+
+
+def projection_annuelle(n_annees, regime, loyer_effectif_an, charges_copro_an, taxe_fonciere, assurance_pno,
+                        entretien_an, prix_achat, mensualites_an, interets_an, capital_rembourse_an,
+                        capital_restant_an, assurance_emprunt_an, salaires, parts=1.0, couple=False,
+                        indexation_loyer=0.0, indexation_charges=0.0, indexation_taxe=0.0,
+                        indexation_valeur=0.0, inflation=0.0, abattement_cosse=50.0,
+                        taux_ps=PRELEVEMENTS_SOCIAUX, occupation=1.0, mobilier=AMORTISSEMENT_MEUBLES[0],
+                        recettes=None, charges_exploitation=0.0, abattement_micro_bic=50.0,
+                        dtype=np.float64):
+    """
+    Tableau annuel sur `n_annees` pour un code de régime (voir `code_regime`).
+
+    Les séries du crédit sont prolongées par des zéros après son terme.
+    Renvoie un `ResultatAnnuel` dont les colonnes `(..., n_annees)` sont
+    nommées comme le tableau de l'app, plus la valeur du bien en fin
+    d'année et le déflateur d'inflation (multiplier un montant nominal par
+    le déflateur l'exprime en euros constants de la date d'achat).
+    `occupation` : part du loyer de chaque année effectivement perçue,
+    `(..., n_annees)` (chemins de `moteur.rotation`) ; `mobilier` : montant
+    des meubles amortis en LMNP réel. Location saisonnière (voir
+    `moteur.saisonnier`) : `recettes` remplace le loyer indexé et
+    `charges_exploitation` (commission, ménage, énergie) s'ajoute aux
+    charges déductibles, tous deux `(..., n_annees)` ; `abattement_micro_bic`
+    vaut 30 % pour un meublé de tourisme non classé.
+    `dtype=np.float32` divise par deux la mémoire des gros lots.
+    """
+    if recettes is None:
+        loyer = _par_scenario(loyer_effectif_an) * facteurs_indexation(indexation_loyer, n_annees) * occupation
+    else:
+        loyer = np.asarray(recettes, dtype=float)
+    idx_charges = facteurs_indexation(indexation_charges, n_annees)
+    copro = _par_scenario(charges_copro_an) * idx_charges
+    taxe = _par_scenario(taxe_fonciere) * facteurs_indexation(indexation_taxe, n_annees)
+    pno = _par_scenario(assurance_pno) * idx_charges
+    entretien = _par_scenario(entretien_an) * idx_charges
+
+    mensualites = prolonger(mensualites_an, n_annees)
+    interets = prolonger(interets_an, n_annees)
+    en_cours = prolonger(np.ones(np.shape(mensualites_an)[-1]), n_annees)
+    assurance = _par_scenario(assurance_emprunt_an) * en_cours
+
+    loyer_nu = loyer - copro * PART_CHARGES_RECUPERABLES
+    charges_totales = taxe + copro * (1 - PART_CHARGES_RECUPERABLES) + pno + entretien + charges_exploitation
+    charges_deductibles = interets + taxe + pno + copro * (1 - PART_CHARGES_RECUPERABLES) + charges_exploitation
+    imputation = 0.0
+
+    if regime == "micro_foncier":
+        base = loyer_nu * 0.70
+    elif regime == "cosse":
+        base = np.maximum(0, loyer_nu * (1 - _par_scenario(abattement_cosse) / 100) - charges_deductibles)
+    elif regime == "deficit_foncier":
+        resultat = loyer_nu - charges_deductibles
+        base = np.maximum(0, resultat)
+        imputation = np.clip(-resultat, 0, PLAFOND_DEFICIT_FONCIER)
+    elif regime == "micro_bic":
+        base = loyer * (1 - _par_scenario(abattement_micro_bic) / 100)
+    elif regime == "lmnp_reel":
+        part_bati, duree_bati = AMORTISSEMENT_BATI
+        duree_meubles = AMORTISSEMENT_MEUBLES[1]
+        annees = np.arange(1, n_annees + 1)
+        amortissements = (_par_scenario(prix_achat) * part_bati / duree_bati * (annees <= duree_bati)
+                          + _par_scenario(mobilier) / duree_meubles * (annees <= duree_meubles))
+        base = np.maximum(0, loyer - charges_deductibles - amortissements)
+    else:
+        raise ValueError(f"Régime fiscal inconnu : {regime!r}")
+
+    impots = impot_locatif(base, _par_scenario(salaires), _par_scenario(parts), _par_scenario(couple),
+                           imputation, taux_ps)
+    credit_an = mensualites + assurance
+    cashflow = loyer - credit_an - charges_totales - impots
+
+    colonnes = {
+        "Année": np.arange(1, n_annees + 1, dtype=np.int16),
+        "Loyer Effectif": loyer,
+        "Mensualités Crédit": credit_an,
+        "Intérêts": interets,
+        "Capital Remboursé": prolonger(capital_rembourse_an, n_annees),
+        "Capital Restant Dû": np.maximum(0, prolonger(capital_restant_an, n_annees)),
+        "Charges": charges_totales,
+        "Impôts": np.maximum(0, impots),
+        "Gain Fiscal": np.abs(np.minimum(0, impots)),
+        "Cash-flow Annuel": cashflow,
+        "Cash-flow Mensuel": cashflow / 12,
+        "Valeur du Bien": _par_scenario(prix_achat) * facteurs_indexation(indexation_valeur, n_annees + 1)[..., 1:],
+        "Déflateur": 1 / facteurs_indexation(inflation, n_annees + 1)[..., 1:],
+    }
+    forme = np.broadcast_shapes(*(np.shape(colonne) for colonne in colonnes.values()))
+    return ResultatAnnuel({nom: colonne if nom == "Année" else np.asarray(colonne, dtype=dtype)
+                           for nom, colonne in colonnes.items()}, forme)
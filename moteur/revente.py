@@ -0,0 +1,114 @@
+"""
+Revente du bien : impôt sur la plus-value immobilière et balayage de
+l'année de sortie (produit net, TRI, multiple de capital pour chaque durée
+de détention en une seule passe vectorisée).
+"""
+
+import numpy as np
+import pandas as pd
+
+from moteur.finance import tri
+
+TAUX_PV_IR = 19.0
+TAUX_PV_PS = 17.2
+FORFAIT_FRAIS_ACQUISITION_PCT = 7.5
+FORFAIT_TRAVAUX_PCT = 15.0  # admis au-delà de 5 ans de détention
+
+# Surtaxe sur les plus-values > 50 000 € : (borne basse, borne haute, taux %, coef. de lissage)
+_SURTAXE = (
+    (50_000, 60_000, 2, 1 / 20),
+    (100_000, 110_000, 3, 1 / 10),
+    (150_000, 160_000, 4, 15 / 100),
+    (200_000, 210_000, 5, 20 / 100),
+    (250_000, 260_000, 6, 25 / 100),
+)
+
+
+def abattements_duree_detention(annees):
+    """Abattements (%) pour durée de détention : (impôt sur le revenu, prélèvements sociaux)."""
+    n = np.asarray(annees, dtype=float)
+    abatt_ir = np.where(n < 6, 0, np.minimum(n - 5, 16) * 6 + np.where(n >= 22, 4, 0))
+    abatt_ps = (np.where(n < 6, 0, np.minimum(n - 5, 16) * 1.65)
+                + np.where(n >= 22, 1.60, 0)
+                + np.clip(n - 22, 0, 8) * 9)
+    return np.minimum(abatt_ir, 100), np.minimum(abatt_ps, 100)
+
+
+def surtaxe_plus_value(pv_imposable):
+    """Taxe sur les plus-values immobilières élevées (art. 1609 nonies G CGI), avec lissage."""
+    pv = np.asarray(pv_imposable, dtype=float)
+    surtaxe = np.zeros_like(pv)
+    for bas, haut, taux, lissage in _SURTAXE:
+        plafond_suivant = haut + 40_000 if taux < 6 else np.inf
+        lisse = (pv > bas) & (pv <= haut)
+        plein = (pv > haut) & (pv <= plafond_suivant)
+        surtaxe = np.where(lisse, pv * taux / 100 - (haut - pv) * lissage, surtaxe)
+        surtaxe = np.where(plein, pv * taux / 100, surtaxe)
+    return np.maximum(0, surtaxe)
+
+
+def impot_plus_value(prix_vente, prix_achat, frais_acquisition, travaux, annees,
+                     amortissements_reintegres=0.0):
+    """
+    Impôt total (IR 19 % + PS 17,2 % + surtaxe) sur la plus-value d'une revente.
+
+    Le prix d'acquisition est majoré du plus élevé entre les frais réels et le
+    forfait de 7,5 %, et entre les travaux réels et le forfait de 15 % après
+    5 ans. Les amortissements déduits en LMNP réel sont réintégrés.
+    """
+    annees = np.asarray(annees, dtype=float)
+    frais_retenus = np.maximum(frais_acquisition, prix_achat * FORFAIT_FRAIS_ACQUISITION_PCT / 100)
+    travaux_retenus = np.where(annees > 5, np.maximum(travaux, prix_achat * FORFAIT_TRAVAUX_PCT / 100), travaux)
+    pv_brute = prix_vente - (prix_achat + frais_retenus + travaux_retenus) + amortissements_reintegres
+    pv_brute = np.maximum(0, pv_brute)
+
+    abatt_ir, abatt_ps = abattements_duree_detention(annees)
+    pv_ir = pv_brute * (1 - abatt_ir / 100)
+    pv_ps = pv_brute * (1 - abatt_ps / 100)
+    return pv_ir * TAUX_PV_IR / 100 + pv_ps * TAUX_PV_PS / 100 + surtaxe_plus_value(pv_ir)
+
+
+def balayage_revente(prix_achat, frais_acquisition, travaux, apport_initial, cashflows,
+                     capital_restant, revalorisation_pct=1.0, frais_revente_pct=5.0,
+                     amortissements_cumules=0.0):
+    """
+    Résultat d'une revente en fin d'année n pour chaque n de 1 à len(cashflows).
+
+    `cashflows` et `capital_restant` sont les séries annuelles (année 1 en
+    tête) du cash-flow après impôts et du capital restant dû en fin d'année.
+    Renvoie un DataFrame indexé par l'année de revente.
+    """
+    cashflows = np.asarray(cashflows, dtype=float)
+    capital_restant = np.asarray(capital_restant, dtype=float)
+    horizon = len(cashflows)
+    annees = np.arange(1, horizon + 1)
+
+    prix_vente = prix_achat * (1 + revalorisation_pct / 100) ** annees
+    frais_revente = prix_vente * frais_revente_pct / 100
+    impot_pv = impot_plus_value(prix_vente, prix_achat, frais_acquisition, travaux, annees,
+                                np.broadcast_to(amortissements_cumules, annees.shape))
+    produit_net = prix_vente - frais_revente - impot_pv - capital_restant
+
+    # Matrice des flux (sortie × temps) : triangle inférieur des cash-flows + produit net
+    detenu = annees[None, :] <= annees[:, None]
+    flux = np.zeros((horizon, horizon + 1))
+    flux[:, 0] = -apport_initial
+    flux[:, 1:] = np.where(detenu, cashflows[None, :], 0)
+    flux[annees - 1, annees] += produit_net
+
+    apports = apport_initial - np.where(detenu, np.minimum(cashflows, 0), 0).sum(axis=1)
+    distributions = np.where(detenu, np.maximum(cashflows, 0), 0).sum(axis=1) + np.maximum(produit_net, 0)
+    apports = apports - np.minimum(produit_net, 0)
+    multiple = np.divide(distributions, apports, out=np.full(horizon, np.nan), where=apports > 0)
+
+    return pd.DataFrame({
+        "Année de revente": annees,
+        "Prix de revente": prix_vente,
+        "Frais de revente": frais_revente,
+        "Impôt Plus-value": impot_pv,
+        "Capital Restant Dû": capital_restant,
+        "Produit Net": produit_net,
+        "Cash-flows Cumulés": np.cumsum(cashflows),
+        "Multiple": multiple,
+        "TRI (%)": tri(flux) * 100,
+    }).set_index("Année de revente")
@@ -0,0 +1,134 @@
+"""
+Rotation des locataires : cycle de vie d'une location simulé comme une
+chaîne de Markov mensuelle, sur de nombreux chemins à la fois.
+
+Chaque mois, un bien est dans l'un des états :
+  - loué et payé (avec l'ancienneté du locataire dans son bail) ;
+  - en impayé (loyer non perçu, jusqu'au départ du locataire) ;
+  - vacant (jusqu'à la relocation).
+
+Un locataire part à l'échéance de son bail avec une probabilité donnée, et
+en cours de bail à un taux annuel ; à son départ (ou à la fin d'un
+impayé), le bien est reloué le mois suivant ou reste vacant, avec un délai
+moyen de relocation. La boucle porte sur les mois, chaque pas traitant
+tous les chemins d'un bloc.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Profils indicatifs par type de bien (voir `moteur.serenite.TYPES_BIENS`, colonne « Turnover »)
+PROFILS_ROTATION = pd.DataFrame({
+    "Type": ["Maison T4+", "T3", "T2 centre-ville", "T1/Studio", "Colocation", "Immeuble rapport", "Meublé tourisme"],
+    "Bail (mois)": [36, 36, 36, 12, 12, 36, 1],
+    "Départ à l'échéance (%)": [25, 35, 45, 40, 55, 40, 100],
+    "Départ en cours de bail (%/an)": [8, 12, 18, 25, 30, 18, 0],
+    "Relocation (mois)": [1.5, 1.2, 1.0, 0.8, 0.7, 1.2, 0.5],
+    "Impayés (%/an)": [2.0, 2.5, 3.0, 4.0, 3.0, 4.0, 0.5],
+    "Durée d'un impayé (mois)": [6, 6, 5, 5, 4, 6, 1],
+})
+PROFIL_DEFAUT = "T2 centre-ville"
+
+_COLONNES = {
+    "bail_mois": "Bail (mois)", "depart_echeance": "Départ à l'échéance (%)",
+    "depart_en_cours": "Départ en cours de bail (%/an)", "relocation_mois": "Relocation (mois)",
+    "impayes_an": "Impayés (%/an)", "duree_impaye_mois": "Durée d'un impayé (mois)",
+}
+
+
+@dataclass(frozen=True)
+class ProfilRotation:
+    """Paramètres du cycle de vie d'une location (taux en %)."""
+    bail_mois: int = 36
+    depart_echeance: float = 45.0
+    depart_en_cours: float = 18.0
+    relocation_mois: float = 1.0
+    impayes_an: float = 3.0
+    duree_impaye_mois: float = 5.0
+
+    @classmethod
+    def du_type(cls, type_bien, profils=PROFILS_ROTATION):
+        """Profil d'un type de `profils` (une ligne par type)."""
+        ligne = profils.set_index("Type").loc[type_bien]
+        return cls(**{champ: ligne[colonne] for champ, colonne in _COLONNES.items()})
+
+    def probabilites(self):
+        """Probabilités mensuelles : départ à l'échéance, départ en cours, impayé, fin d'impayé, relocation."""
+        return (self.depart_echeance / 100,
+                1 - (1 - self.depart_en_cours / 100) ** (1 / 12),
+                1 - (1 - self.impayes_an / 100) ** (1 / 12),
+                1 / max(self.duree_impaye_mois, 1.0),
+                1 / (1 + self.relocation_mois))  # vacance géométrique de moyenne `relocation_mois`
+
+
+def simuler_rotation(profils, n_chemins, n_annees, graine=None):
+    """
+    Chemins de location pour chaque profil de `profils` (un `ProfilRotation`
+    ou une liste), simulés ensemble.
+
+    Renvoie un dict de tableaux `(n_profils, n_chemins, n_annees)` (sans la
+    première dimension pour un profil seul) : "mois_payes", "mois_impayes"
+    et "mois_vacants" de chaque année (12 au total).
+    """
+    seul = isinstance(profils, ProfilRotation)
+    profils = [profils] if seul else list(profils)
+    n = len(profils) * n_chemins
+    # Paramètres par chemin (float32 : les tirages le sont aussi)
+    p_echeance, p_en_cours, p_impaye, p_fin_impaye, p_relocation = (
+        np.repeat(np.array(colonne, dtype=np.float32), n_chemins)
+        for colonne in zip(*(profil.probabilites() for profil in profils)))
+    bail = np.repeat(np.array([max(int(profil.bail_mois), 1) for profil in profils], dtype=np.int16), n_chemins)
+
+    rng = np.random.default_rng(graine)
+    PAYE, IMPAYE, VACANT = 0, 1, 2
+    etat = np.zeros(n, dtype=np.int8)  # loué dès l'achat
+    anciennete = np.zeros(n, dtype=np.int16)  # mois écoulés dans le bail en cours
+    impayes, vacants = np.zeros((2, n_annees, n), dtype=np.int8)  # (année, chemin) : lignes contiguës
+    for mois in range(n_annees * 12):
+        impayes[mois // 12] += etat == IMPAYE
+        vacants[mois // 12] += etat == VACANT
+        tirages = rng.random((3, n), dtype=np.float32)
+        paye = etat == PAYE
+        depart = paye & (tirages[0] < np.where(anciennete == bail - 1, p_echeance, p_en_cours))
+        defaut = paye & ~depart & (tirages[1] < p_impaye)
+        sortie = depart | ((etat == IMPAYE) & (tirages[0] < p_fin_impaye))
+        reloue = (sortie | (etat == VACANT)) & (tirages[2] < p_relocation)
+
+        anciennete = np.where(paye & ~sortie, (anciennete + 1) % bail, 0).astype(np.int16)
+        etat[defaut] = IMPAYE
+        etat[sortie] = VACANT
+        etat[reloue] = PAYE
+
+    resultats = {nom: valeurs.T.reshape(len(profils), n_chemins, n_annees) for nom, valeurs in
+                 (("mois_payes", 12 - impayes - vacants), ("mois_impayes", impayes), ("mois_vacants", vacants))}
+    return {nom: valeurs[0] for nom, valeurs in resultats.items()} if seul else resultats
+
+
+@lru_cache(maxsize=64)
+def esperance_rotation(profil, n_annees):
+    """
+    Mois non perçus par an (vacance + impayés) en moyenne sur `n_annees`,
+    calculés exactement en propageant la loi des états de la chaîne.
+    """
+    p_echeance, p_en_cours, p_impaye, p_fin_impaye, p_relocation = profil.probabilites()
+    bail = max(int(profil.bail_mois), 1)
+    p_depart = np.full(bail, p_en_cours)
+    p_depart[-1] = p_echeance
+    paye = np.zeros(bail)  # loi de l'ancienneté des chemins loués et payés
+    paye[0] = 1.0
+    impaye = vacant = perdus = 0.0
+    for _ in range(n_annees * 12):
+        perdus += impaye + vacant
+        departs = (paye * p_depart).sum()
+        defauts = (paye * (1 - p_depart)).sum() * p_impaye
+        sorties = departs + impaye * p_fin_impaye
+        reloues = (sorties + vacant) * p_relocation
+        reste = paye * (1 - p_depart) * (1 - p_impaye)
+        paye = np.roll(reste, 1)  # renouvelés à l'échéance : ancienneté 0
+        paye[0] += reloues
+        impaye = impaye * (1 - p_fin_impaye) + defauts
+        vacant = (sorties + vacant) * (1 - p_relocation)
+    return float(perdus / n_annees)
@@ -0,0 +1,127 @@
+"""
+Location meublée saisonnière au jour près : prix de la nuit et occupation
+selon le calendrier (saison, week-end), ménage, énergie et commission de
+plateforme, sur de nombreux scénarios de demande à la fois.
+
+Les nuits sont des tableaux `(scénarios, 365)` par année (le 29 février
+est écarté) ; chaque scénario tire un choc de demande par année, puis
+l'occupation de chaque nuit. Une probabilité d'occupation ne dépassant
+pas 1, le choc est recalibré mois par mois pour que l'occupation moyenne
+reste celle du profil. Les totaux annuels `(scénarios, années)`
+alimentent `moteur.projection.projection_annuelle` (paramètres `recettes`
+et `charges_exploitation`), donc le tableau de cash-flow et les régimes
+Micro-BIC et LMNP réel.
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from moteur.marche import MOIS
+
+# Profil indicatif d'une destination balnéaire : prix relatif et occupation par mois
+PROFIL_SAISONNIER = pd.DataFrame({
+    "Mois": MOIS,
+    "Prix (×)": [0.80, 0.80, 0.85, 0.95, 1.00, 1.20, 1.50, 1.60, 1.10, 0.90, 0.80, 0.95],
+    "Occupation (%)": [25, 30, 35, 50, 60, 75, 92, 95, 70, 45, 25, 35],
+})
+
+
+@dataclass(frozen=True)
+class Saisonnier:
+    """Paramètres d'exploitation d'une location saisonnière (montants de l'année 1)."""
+    prix_nuit: float = 80.0
+    majoration_weekend: float = 15.0  # % les nuits du vendredi et du samedi
+    sejour_moyen: float = 4.0  # nuits par séjour
+    menage_par_sejour: float = 40.0
+    commission: float = 15.0  # % des recettes
+    energie_nuit: float = 6.0  # eau, électricité, consommables par nuit louée
+    volatilite_demande: float = 15.0  # % d'écart type du choc annuel d'occupation
+
+
+def calendrier(annee_debut, n_annees):
+    """Mois (0-11) et nuits de week-end de chaque jour, tableaux `(n_annees, 365)`."""
+    jours = np.arange(np.datetime64(f"{annee_debut}-01-01"), np.datetime64(f"{annee_debut + n_annees}-01-01"))
+    debut_mois = jours.astype("datetime64[M]")
+    mois = debut_mois.astype(int) % 12
+    garde = ~((mois == 1) & ((jours - debut_mois).astype(int) == 28))  # 29 février écarté
+    jours, mois = jours[garde], mois[garde]
+    semaine = (jours.astype(int) + 3) % 7  # 0 = lundi (le 1er janvier 1970 était un jeudi)
+    return mois.reshape(n_annees, 365), ((semaine == 4) | (semaine == 5)).reshape(n_annees, 365)
+
+
+_PHI = np.vectorize(lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2))))  # loi normale centrée réduite
+
+
+def echelle_occupation(occupation, sigma, iterations=60):
+    """
+    Facteurs `a` tels que E[min(a·p·X, 1)] = p pour chaque probabilité
+    d'occupation p, X lognormal de moyenne 1 et d'écart type log `sigma` :
+    le plafond à 1 des mois pleins ne biaise plus l'occupation moyenne.
+    """
+    p = np.clip(np.asarray(occupation, dtype=float), 1e-9, 1 - 1e-9)
+    if sigma <= 0:
+        return np.ones_like(p)
+    mu = -sigma ** 2 / 2
+
+    def esperance(a):  # E[min(c·X, 1)], c = a·p
+        seuil = np.log(1 / (a * p))
+        return a * p * _PHI((seuil - mu - sigma ** 2) / sigma) + 1 - _PHI((seuil - mu) / sigma)
+
+    bas, haut = np.ones_like(p), np.ones_like(p)
+    while (esperance(haut) < p).any():  # E croît avec a : élargit jusqu'à encadrer
+        haut = np.where(esperance(haut) < p, haut * 2, haut)
+    for _ in range(iterations):
+        milieu = (bas + haut) / 2
+        trop_bas = esperance(milieu) < p
+        bas, haut = np.where(trop_bas, milieu, bas), np.where(trop_bas, haut, milieu)
+    return (bas + haut) / 2
+
+
+def simuler_saisonnier(parametres, profil, n_annees, n_scenarios, annee_debut, indexation_prix=0.0,
+                       baisse_prix=0.0, baisse_occupation=0.0, hausse_charges=0.0, graine=None):
+    """
+    Recettes et coûts d'exploitation de chaque scénario et de chaque année.
+
+    `profil` : DataFrame de 12 mois (« Prix (×) », « Occupation (%) ») ;
+    `annee_debut` fixe le calendrier (week-ends), donc les tirages d'une
+    même `graine`. Les stress (`baisse_prix` en %, `baisse_occupation` en
+    points, `hausse_charges` en %) s'appliquent à toutes les nuits.
+
+    Renvoie un dict de tableaux `(n_scenarios, n_annees)` : "nuits",
+    "recettes", "commission", "menage", "energie" et "charges_exploitation"
+    (leur somme), plus "recettes_jour" `(365,)`, recette moyenne de chaque
+    nuit de l'année 1.
+    """
+    mois, weekend = calendrier(annee_debut, n_annees)
+    prix_mois = profil["Prix (×)"].to_numpy(dtype=np.float32)
+    occupation_mois = np.clip(profil["Occupation (%)"].to_numpy(dtype=np.float32) - baisse_occupation, 0, 100) / 100
+    prix_nuits = (parametres.prix_nuit * (1 - baisse_prix / 100) * prix_mois[mois]
+                  * (1 + parametres.majoration_weekend / 100 * weekend)
+                  * (1 + indexation_prix / 100) ** np.arange(n_annees)[:, None]).astype(np.float32)
+    sigma = parametres.volatilite_demande / 100
+    occupation_nuits = (occupation_mois * echelle_occupation(occupation_mois, sigma))[mois].astype(np.float32)
+
+    rng = np.random.default_rng(graine)
+    # Choc de demande par scénario et par année (lognormal, de moyenne 1)
+    chocs = rng.lognormal(-sigma ** 2 / 2, sigma, (n_scenarios, n_annees)).astype(np.float32)
+    nuits = np.empty((n_scenarios, n_annees), dtype=np.float32)
+    recettes = np.empty((n_scenarios, n_annees), dtype=np.float32)
+    for annee in range(n_annees):  # une année à la fois : mémoire en (scénarios, 365)
+        louees = rng.random((n_scenarios, 365), dtype=np.float32) < occupation_nuits[annee] * chocs[:, annee, None]
+        nuits[:, annee] = louees.sum(axis=1)
+        recettes[:, annee] = louees @ prix_nuits[annee]
+        if annee == 0:
+            recettes_jour = louees.mean(axis=0) * prix_nuits[0]
+
+    indexation = (1 + indexation_prix / 100) ** np.arange(n_annees)
+    hausse = 1 + hausse_charges / 100
+    commission = recettes * parametres.commission / 100
+    menage = nuits / max(parametres.sejour_moyen, 1.0) * parametres.menage_par_sejour * indexation * hausse
+    energie = nuits * parametres.energie_nuit * indexation * hausse
+    return {
+        "nuits": nuits, "recettes": recettes, "commission": commission, "menage": menage, "energie": energie,
+        "charges_exploitation": commission + menage + energie, "recettes_jour": recettes_jour,
+    }
@@ -0,0 +1,157 @@
+"""
+Scénarios hors de l'app : un fichier JSON de paramètres de la sidebar,
+complétés par les valeurs par défaut du dashboard, évalué sur le graphe
+du modèle (`moteur.modele`) exactement comme dans l'app.
+
+    {"nom": "T2 Lyon 7e", "prix_achat": 180000, "loyer_mensuel_cc": 850,
+     "regime_fiscal": "lmnp_reel", "stress_loyer": 15}
+
+`regime_fiscal` accepte le libellé de la sidebar ou son code
+(`micro_foncier`, `deficit_foncier`, `cosse`, `micro_bic`, `lmnp_reel`).
+La zone (`zone_abc`) peut se déduire de `code_insee` si le zonage officiel
+est déposé (voir `moteur.zonage`).
+Un financement composite se décrit par `lignes_credit`, liste de lignes
+aux colonnes de l'éditeur de l'app (« Type », « Montant (€) »…), et un
+immeuble ou une colocation par `lots` (colonnes « Loyer CC (€) »,
+« Vacance (mois/an) »…), qui remplacent loyer, vacance et charges.
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from moteur.fiscalite import PRELEVEMENTS_SOCIAUX
+from moteur.modele import modele
+from moteur.lots import agreger_lots, normaliser_lots
+from moteur.projection import AMORTISSEMENT_MEUBLES, code_regime
+from moteur.zonage import CONVENTION_DEFAUT, ZONE_DEFAUT, zonage_officiel
+
+REGIMES_FISCAUX = (
+    "Nu — Micro-foncier (30%)",
+    "Nu — Réel (Déficit foncier)",
+    "Nu — Réel + Cosse Ancien",
+    "Meublé LMNP — Micro-BIC (50%)",
+    "Meublé LMNP — Réel Simplifié",
+)
+
+# Valeurs par défaut des widgets de l'app (sidebar, stress test, comparables)
+DEFAUTS = {
+    "prix_achat": 100_000, "frais_notaire_pct": 7.5, "travaux": 5_000, "surface_m2": 40,
+    "apport": 0, "taux_emprunt": 1.8, "duree_credit": 20, "assurance_emprunt_pct": 0.20, "salaire_net": 2_500,
+    "loyer_mensuel_cc": 600, "charges_copro_an": 800, "taxe_fonciere": 700, "assurance_pno": 120,
+    "vacance_loc_mois": 0.5, "mobilier": AMORTISSEMENT_MEUBLES[0],
+    "revenus_foyer": 40_000, "parts_fiscales": 1.0, "imposition_commune": False,
+    "prelevement_sociaux": PRELEVEMENTS_SOCIAUX, "regime_fiscal": REGIMES_FISCAUX[4],
+    "zone_abc": ZONE_DEFAUT, "convention_cosse": CONVENTION_DEFAUT,
+    "indexation_loyer": 1.5, "indexation_charges": 2.0, "indexation_taxe": 3.0, "indexation_valeur": 1.0,
+    "inflation": 2.0, "frais_revente_pct": 5.0,
+    "stress_vacance": 2.0, "stress_loyer": 10, "stress_charges": 20, "stress_impots": 0,
+    "prix_m2_marche": 2_000,
+}
+HORS_GRAPHE = ("nom", "salaire_net", "lignes_credit", "code_insee", "lots")
+ENTIERS = ("duree_credit", "surface_m2")  # tailles de tableaux, jamais fractionnaires
+VRAI, FAUX = ("1", "true", "vrai", "oui", "yes"), ("0", "false", "faux", "non", "no")
+DEFAUTS_LIGNE = {"Différé (mois)": 0, "Différé total": False, "Palier (ans)": 5, "Progression (%)": 0.0}
+
+
+def libelle_regime(regime):
+    """Libellé de la sidebar pour un libellé ou un code de régime."""
+    if regime in REGIMES_FISCAUX:
+        return regime
+    for libelle in REGIMES_FISCAUX:
+        if code_regime(libelle) == regime:
+            return libelle
+    raise ValueError(f"Régime fiscal inconnu : {regime!r}")
+
+
+def _typer(nom, valeur):
+    """
+    Valeur saisie convertie au type de sa valeur par défaut : un CSV à
+    cellules vides relit ses colonnes entières en flottants, un JSON peut
+    écrire `20.0` ou `"oui"`.
+    """
+    defaut = DEFAUTS[nom]
+    if isinstance(defaut, bool):
+        if isinstance(valeur, str):
+            cle = valeur.strip().lower()
+            if cle not in VRAI + FAUX:
+                raise ValueError(f"{nom} : booléen attendu, pas {valeur!r}")
+            return cle in VRAI
+        return bool(valeur)
+    if isinstance(defaut, (int, float)):
+        try:
+            nombre = float(valeur)
+        except (TypeError, ValueError):
+            raise ValueError(f"{nom} : nombre attendu, pas {valeur!r}") from None
+        if isinstance(defaut, int) and nombre.is_integer():
+            return int(nombre)
+        if nom in ENTIERS:
+            raise ValueError(f"{nom} : entier attendu, pas {valeur!r}")
+        return nombre
+    return valeur
+
+
+def completer_scenario(saisis, nom):
+    """Paramètres complets d'un scénario à partir des seuls paramètres saisis."""
+    inconnus = sorted(set(saisis) - set(DEFAUTS) - set(HORS_GRAPHE))
+    if inconnus:
+        raise ValueError(f"paramètres inconnus : {', '.join(inconnus)}")
+    saisis = {cle: _typer(cle, valeur) if cle in DEFAUTS else valeur for cle, valeur in saisis.items()}
+    parametres = {**DEFAUTS, "nom": nom, **saisis}
+    parametres["regime_fiscal"] = libelle_regime(parametres["regime_fiscal"])
+    if saisis.get("lots"):
+        parametres.update(agreger_lots(normaliser_lots(saisis["lots"])))
+    if "code_insee" in saisis:
+        zonage = zonage_officiel()
+        if zonage is None:
+            raise ValueError("code_insee nécessite le zonage officiel (DASH_IMMO_ZONAGE)")
+        parametres["zone_abc"] = zonage.zone(saisis["code_insee"])
+        if parametres["zone_abc"] is None:
+            raise ValueError(f"code INSEE inconnu du zonage : {saisis['code_insee']}")
+    return parametres
+
+
+def charger_scenario(chemin):
+    """Paramètres complets du scénario `chemin` (JSON), défauts compris."""
+    chemin = Path(chemin)
+    try:
+        return completer_scenario(json.loads(chemin.read_text(encoding="utf-8")), chemin.stem)
+    except ValueError as exc:
+        raise ValueError(f"{chemin.name} : {exc}") from None
+
+
+def lire_scenarios(entree, taille_bloc=1_000):
+    """
+    Scénarios successifs d'un dossier de fichiers JSON, d'un fichier JSON ou
+    d'un CSV à un scénario par ligne (colonnes = paramètres, cellules vides =
+    défauts), lu par blocs.
+    """
+    entree = Path(entree)
+    if entree.is_dir():
+        for chemin in sorted(entree.glob("*.json")):
+            yield charger_scenario(chemin)
+    elif entree.suffix == ".json":
+        yield charger_scenario(entree)
+    else:
+        for bloc in pd.read_csv(entree, chunksize=taille_bloc):
+            for numero, ligne in zip(bloc.index, bloc.to_dict("records")):
+                saisis = {nom: valeur for nom, valeur in ligne.items() if not pd.isna(valeur)}
+                yield completer_scenario(saisis, str(saisis.pop("nom", numero + 1)))
+
+
+def etat_scenario(parametres):
+    """
+    État du graphe du modèle renseigné avec les paramètres d'un scénario (ou
+    les entrées d'un état existant, complétées des défauts).
+    """
+    entrees = {nom: valeur for nom, valeur in parametres.items() if nom not in HORS_GRAPHE}
+    lignes = parametres.get("lignes_credit")
+    if lignes:
+        entrees.update(financement_composite=True,
+                       lignes_editees=pd.DataFrame([{**DEFAUTS_LIGNE, **ligne} for ligne in lignes]))
+    entrees.setdefault("financement_composite", False)
+    entrees.setdefault("lignes_editees", None)
+    etat = modele.etat()
+    etat.definir(**entrees)
+    return etat
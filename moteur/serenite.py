@@ -0,0 +1,52 @@
+"""
+Modèle du taux de sérénité (chapitre B.2) : sérénité et énergie à déployer
+en fonction du rendement brut, et sérénité typique par type de bien.
+"""
+
+import numpy as np
+import pandas as pd
+
+TYPES_BIENS = pd.DataFrame({
+    "Type": ["Maison T4+", "T3", "T2 centre-ville", "T1/Studio", "Colocation", "Immeuble rapport", "Meublé tourisme"],
+    "Rdt Brut Typique (%)": [5, 5.5, 7, 8, 10, 12, 14],
+    "Sérénité": [85, 75, 70, 55, 45, 35, 25],
+    "Turnover": ["Très faible", "Faible", "Moyen", "Élevé", "Élevé", "Variable", "Très élevé"],
+})
+
+
+def serenite(rendement_brut):
+    """Taux de sérénité (%) : élevé, puis baisse linéaire, puis accélérée au-delà de 10 %."""
+    x = np.asarray(rendement_brut, dtype=float)
+    valeur = np.piecewise(x, [x < 5, (x >= 5) & (x <= 10), x > 10], [
+        lambda x: 90 - (x - 3) * 2,
+        lambda x: 86 - (x - 5) * 6,
+        lambda x: 56 - (x - 10) * 8 - (x - 10) ** 1.5 * 2,
+    ])
+    return np.clip(valeur, 5, 95)
+
+
+def energie(rendement_brut):
+    """Énergie à déployer (%) : faible, linéaire, puis exponentielle au-delà de 10 %."""
+    x = np.asarray(rendement_brut, dtype=float)
+    valeur = np.piecewise(x, [x < 5, (x >= 5) & (x <= 10), x > 10], [
+        lambda x: 10 + (x - 3) * 3,
+        lambda x: 16 + (x - 5) * 8,
+        lambda x: 56 + (x - 10) * 12 + (x - 10) ** 2 * 3,
+    ])
+    return np.clip(valeur, 5, 100)
+
+
+def serenite_bien(rendement_brut, type_bien=None):
+    """
+    Sérénité d'un ou plusieurs biens : la courbe au rendement brut du bien,
+    décalée de l'écart propre à son type (sérénité typique du type moins la
+    courbe à son rendement typique). Type inconnu ou absent : la courbe seule.
+    """
+    rendement_brut = np.asarray(rendement_brut, dtype=float)
+    if type_bien is None:
+        return serenite(rendement_brut)
+    ecarts = dict(zip(TYPES_BIENS["Type"],
+                      TYPES_BIENS["Sérénité"] - serenite(TYPES_BIENS["Rdt Brut Typique (%)"])))
+    types = np.broadcast_to(np.asarray(type_bien, dtype=object), rendement_brut.shape)
+    ecart = pd.Series(types.ravel()).map(ecarts).fillna(0.0).to_numpy().reshape(rendement_brut.shape)
+    return np.clip(serenite(rendement_brut) + ecart, 5, 95)
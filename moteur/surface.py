@@ -0,0 +1,68 @@
+"""
+Surfaces de réponse : indicateurs précalculés sur une grille autour du point
+courant, puis interpolés (multilinéaire) pour un retour instantané quand un
+curseur bouge. Le moteur exact affine ensuite la valeur affichée.
+"""
+
+from itertools import product
+
+import numpy as np
+
+from moteur.graphe import _egal
+
+
+class SurfaceReponse:
+    """
+    Valeurs d'une fonction vectorisée sur une grille régulière.
+
+    `axes` associe à chaque paramètre variable ses points de grille
+    (croissants) ; `fixes` sont les autres paramètres, qui doivent être
+    identiques pour que la surface reste valable.
+    """
+
+    def __init__(self, axes, fixes, valeurs):
+        self.axes = {nom: np.asarray(points, dtype=float) for nom, points in axes.items()}
+        self.fixes = fixes
+        self.valeurs = valeurs
+
+    @classmethod
+    def construire(cls, fonction, axes, fixes):
+        """Évalue `fonction(**fixes, **point)` sur toute la grille en un seul appel."""
+        grilles = np.meshgrid(*axes.values(), indexing="ij")
+        resultats = fonction(**fixes, **{nom: grille.ravel() for nom, grille in zip(axes, grilles)})
+        forme = grilles[0].shape
+        return cls(axes, fixes, {cle: np.asarray(v).reshape(forme) for cle, v in resultats.items()})
+
+    def valable(self, point, fixes):
+        """Vrai si `point` est dans la grille et les paramètres fixes inchangés."""
+        if self.fixes.keys() != fixes.keys() or not all(_egal(self.fixes[k], fixes[k]) for k in fixes):
+            return False
+        return all(points[0] <= point[nom] <= points[-1] for nom, points in self.axes.items())
+
+    def interpoler(self, point):
+        """Interpolation multilinéaire de chaque indicateur au `point`."""
+        indices, poids = [], []
+        for nom, points in self.axes.items():
+            i = int(np.clip(np.searchsorted(points, point[nom]) - 1, 0, len(points) - 2))
+            t = (point[nom] - points[i]) / (points[i + 1] - points[i])
+            indices.append(i)
+            poids.append(t)
+
+        resultat = {cle: 0.0 for cle in self.valeurs}
+        for coin in product((0, 1), repeat=len(indices)):
+            w = np.prod([t if c else 1 - t for c, t in zip(coin, poids)])
+            if w == 0:
+                continue
+            position = tuple(i + c for i, c in zip(indices, coin))
+            for cle, valeurs in self.valeurs.items():
+                resultat[cle] += w * valeurs[position]
+        return {cle: float(v) for cle, v in resultat.items()}
+
+
+def grille_autour(valeur, borne_basse, borne_haute, demi_largeur, n_points=9):
+    """Points régulièrement espacés autour de `valeur`, bornés au domaine du curseur."""
+    bas = max(borne_basse, valeur - demi_largeur)
+    haut = min(borne_haute, valeur + demi_largeur)
+    if haut <= bas:
+        haut = bas + 1e-9
+    return np.linspace(bas, haut, n_points)
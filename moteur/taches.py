@@ -0,0 +1,76 @@
+"""
+Tâches de calcul en arrière-plan : un calcul découpé en blocs s'exécute
+dans un pool de threads (NumPy libère le GIL sur les opérations lourdes),
+expose sa progression et ses résultats partiels, et s'annule entre deux
+blocs.
+
+Un registre par session (un dict) garde la tâche courante de chaque calcul :
+relancer avec d'autres paramètres annule la tâche devenue obsolète au lieu
+de la laisser s'exécuter jusqu'au bout.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_EXECUTEUR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tache")
+
+
+class Tache:
+    """Applique `fonction` à chaque élément de `blocs`, dans l'ordre, en arrière-plan."""
+
+    def __init__(self, fonction, blocs, cle=None):
+        self.cle = cle
+        self.total = len(blocs)
+        self.resultats = []
+        self.erreur = None
+        self._annulation = threading.Event()
+        self._future = _EXECUTEUR.submit(self._executer, fonction, list(blocs))
+
+    def _executer(self, fonction, blocs):
+        for bloc in blocs:
+            if self._annulation.is_set():
+                return
+            try:
+                self.resultats.append(fonction(bloc))
+            except Exception as exc:  # remontée à l'affichage, pas au thread
+                self.erreur = exc
+                return
+
+    def annuler(self):
+        self._annulation.set()
+
+    @property
+    def annulee(self):
+        return self._annulation.is_set()
+
+    @property
+    def terminee(self):
+        return self._future.done()
+
+    @property
+    def progression(self):
+        """Part des blocs calculés, entre 0 et 1."""
+        return len(self.resultats) / self.total if self.total else 1.0
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par les résultats partiels."""
+        return sum(getattr(resultat, "nbytes", 0) for resultat in list(self.resultats))
+
+    def partiels(self):
+        """Copie des résultats déjà disponibles (le thread peut encore en ajouter)."""
+        return list(self.resultats)
+
+
+def tache_courante(registre, nom, cle, fonction, blocs, relancer=False):
+    """
+    Tâche `nom` du registre pour les paramètres `cle` : la tâche existante si
+    elle a la même clé, sinon une nouvelle (l'ancienne est annulée).
+    """
+    tache = registre.get(nom)
+    if tache is not None and tache.cle == cle and not relancer:
+        return tache
+    if tache is not None:
+        tache.annuler()
+    registre[nom] = tache = Tache(fonction, blocs, cle)
+    return tache
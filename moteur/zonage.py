@@ -0,0 +1,174 @@
+"""
+Zonage A bis / A / B1 / B2 / C des communes (tension du marché locatif) et
+abattement « Cosse ancien » (Louer abordable) qui en découle.
+
+La liste officielle des communes par zone (code INSEE, commune, zone) se
+dépose en CSV dans `donnees/zonage_abc.csv` (ou le chemin de
+`DASH_IMMO_ZONAGE`) ; les intitulés de colonnes de la publication
+ministérielle (`CODGEO`, `LIBGEO`, `Zone ABC`) sont reconnus. Elle est
+indexée une fois : la zone d'une commune (par code ou par nom) est un
+accès de dictionnaire, et celle de tout un bloc d'annonces une passe de
+table de hachage (`pd.Index.get_indexer`).
+"""
+
+import os
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ZONES = ("A bis", "A", "B1", "B2", "C")
+CONVENTIONS = ("Intermédiaire", "Social / très social", "Intermédiation locative")
+
+# Abattement Cosse (%) sur les loyers bruts : convention Anah × zone
+# (en zone C, hors intermédiation, seules les conventions sociales avec travaux)
+ABATTEMENTS_COSSE = np.array([
+    [30, 30, 30, 15, 0],
+    [70, 70, 70, 50, 50],
+    [85, 85, 85, 85, 85],
+], dtype=float)
+ZONE_DEFAUT, CONVENTION_DEFAUT = "B2", "Social / très social"
+
+# Profil indicatif de chaque zone (onglet Stratégies)
+PROFILS_ZONES = pd.DataFrame({
+    "Zone": list(ZONES),
+    "Exemples": ["Paris, proche couronne", "Grandes agglomérations, Côte d'Azur", "Métropoles",
+                 "Villes moyennes", "Rural"],
+    "Rendement Brut Typique": [3, 4, 5, 7.5, 12],
+    "Risque Vacance": [5, 8, 15, 25, 45],
+    "Prix m² Moyen": [10000, 5500, 3500, 1800, 800],
+    "Sérénité": [80, 75, 70, 65, 40],
+    "Cash-flow Possible": ["Très difficile", "Très difficile", "Difficile", "Oui avec optimisation",
+                           "Oui, très positif"],
+})
+
+CHEMIN_ZONAGE = Path(os.environ.get("DASH_IMMO_ZONAGE",
+                                    Path(__file__).resolve().parent.parent / "donnees" / "zonage_abc.csv"))
+_COLONNES = {
+    "code": ("code_insee", "codgeo", "code insee", "code commune", "insee"),
+    "commune": ("commune", "libgeo", "nom", "libellé commune", "libelle commune"),
+    "zone": ("zone", "zone abc", "zone_abc", "zonage abc"),
+}
+
+
+def normaliser_zone(zone):
+    """Libellé canonique d'une zone (« Abis », « A BIS », « b1 »…), ou None."""
+    if zone is None or pd.isna(zone):
+        return None
+    cle = str(zone).upper().replace(" ", "").replace("ZONE", "")
+    return {"ABIS": "A bis", "A": "A", "B1": "B1", "B2": "B2", "C": "C"}.get(cle)
+
+
+def abattement_cosse(zone, convention=CONVENTION_DEFAUT):
+    """
+    Abattement Cosse (%) d'une zone et d'une convention, ou de tableaux des
+    deux (NaN si la zone ou la convention est inconnue).
+    """
+    valeurs = _abattements(pd.Index(ZONES).get_indexer(np.atleast_1d(np.asarray(zone, dtype=object))), convention)
+    return valeurs if np.ndim(zone) or np.ndim(convention) else float(valeurs[0])
+
+
+def _abattements(rangs_zone, convention):
+    # rangs_zone : positions dans ZONES (-1 : inconnue)
+    c = pd.Index(CONVENTIONS).get_indexer(np.atleast_1d(np.asarray(convention, dtype=object)))
+    z, c = np.broadcast_arrays(rangs_zone, c)
+    return np.where((z >= 0) & (c >= 0), ABATTEMENTS_COSSE[c, z], np.nan)
+
+
+def _cle_nom(nom):
+    sans_accents = unicodedata.normalize("NFKD", str(nom)).encode("ascii", "ignore").decode()
+    return " ".join(sans_accents.upper().replace("-", " ").replace("'", " ").split())
+
+
+def _code(code):
+    return str(code).strip().upper().removesuffix(".0").zfill(5)  # codes relus comme nombres
+
+
+class Zonage:
+    """Liste des communes indexée par code INSEE et par nom."""
+
+    def __init__(self, codes, zones, communes=None):
+        self.codes = pd.Index([_code(code) for code in codes])
+        self.zones = np.array([normaliser_zone(zone) for zone in zones], dtype=object)
+        self.rangs = pd.Index(ZONES).get_indexer(self.zones).astype(np.int8)
+        self.communes = np.asarray(communes if communes is not None else self.codes, dtype=object)
+        self._par_code = dict(zip(self.codes, range(len(self.codes))))
+        self._par_nom = {}
+        for i, nom in enumerate(self.communes):
+            self._par_nom.setdefault(_cle_nom(nom), []).append(i)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def rechercher(self, texte):
+        """Communes (DataFrame code, commune, zone) de code INSEE ou de nom `texte`."""
+        texte = str(texte).strip()
+        i = self._par_code.get(_code(texte))
+        lignes = [i] if i is not None else self._par_nom.get(_cle_nom(texte), [])
+        return pd.DataFrame({"Code INSEE": self.codes[lignes], "Commune": self.communes[lignes],
+                             "Zone": self.zones[lignes]})
+
+    def zone(self, code):
+        """Zone d'un code INSEE, ou None s'il est inconnu."""
+        i = self._par_code.get(_code(code))
+        return None if i is None else self.zones[i]
+
+    def rangs_de(self, codes):
+        """Positions dans `ZONES` des zones d'un tableau de codes INSEE (-1 : code inconnu)."""
+        codes = pd.Series(codes, dtype=str).str.strip().str.upper().str.removesuffix(".0").str.zfill(5)
+        positions = self.codes.get_indexer(codes)
+        return np.where(positions >= 0, self.rangs[positions], -1)
+
+    def zones_de(self, codes):
+        """Zones d'un tableau de codes INSEE (None pour les codes inconnus)."""
+        rangs = self.rangs_de(codes)
+        return np.where(rangs >= 0, np.array(ZONES, dtype=object)[rangs], None)
+
+    def effectifs(self):
+        """Nombre de communes de chaque zone."""
+        return pd.Series(self.zones).value_counts().reindex(list(ZONES), fill_value=0)
+
+
+def _colonne(table, role):
+    noms = {str(colonne).strip().lower(): colonne for colonne in table.columns}
+    for candidat in _COLONNES[role]:
+        if candidat in noms:
+            return noms[candidat]
+    if role == "commune":
+        return None
+    raise ValueError(f"Colonne {role} introuvable dans le zonage ({', '.join(map(str, table.columns))})")
+
+
+@lru_cache(maxsize=4)
+def charger_zonage(chemin):
+    """Zonage lu d'un CSV (séparateur détecté), indexé une fois par chemin."""
+    table = pd.read_csv(chemin, sep=None, engine="python", dtype=str, encoding="utf-8-sig")
+    colonne_commune = _colonne(table, "commune")
+    return Zonage(table[_colonne(table, "code")], table[_colonne(table, "zone")],
+                  table[colonne_commune] if colonne_commune is not None else None)
+
+
+def zonage_officiel():
+    """Zonage de `CHEMIN_ZONAGE`, ou None si le fichier n'a pas été déposé."""
+    return charger_zonage(str(CHEMIN_ZONAGE)) if CHEMIN_ZONAGE.is_file() else None
+
+
+def abattements_annonces(annonces, zonage=None, defaut=None):
+    """
+    Abattement Cosse de chaque annonce d'un DataFrame, d'après sa colonne
+    `zone_abc`, ou à défaut `code_insee` et le zonage, et `convention_cosse`
+    (convention sociale si absente). Lignes sans zone connue : `defaut`.
+    Renvoie None si les annonces n'ont aucune de ces colonnes.
+    """
+    if "zone_abc" in annonces:
+        rangs = pd.Index(ZONES).get_indexer(annonces["zone_abc"].map(normaliser_zone))
+    elif "code_insee" in annonces and zonage is not None:
+        rangs = zonage.rangs_de(annonces["code_insee"].to_numpy())
+    else:
+        return None
+    conventions = (annonces["convention_cosse"].fillna(CONVENTION_DEFAUT).to_numpy(dtype=object)
+                   if "convention_cosse" in annonces else CONVENTION_DEFAUT)
+    valeurs = _abattements(rangs, conventions)
+    return np.where(np.isnan(valeurs), np.nan if defaut is None else defaut, valeurs)
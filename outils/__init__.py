@@ -0,0 +1,2 @@
+"""Outils d'exploitation du dashboard (tests de charge, profilage du démarrage,
+rapports en lot)."""
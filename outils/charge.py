@@ -0,0 +1,231 @@
+"""
+Test de charge local : lance le dashboard et simule N sessions
+simultanées qui rejouent des scripts d'interaction réalistes.
+
+    python -m outils.charge --sessions 1 4 8 16 --duree 30
+
+Chaque session virtuelle parle le protocole WebSocket de Streamlit comme un
+navigateur : premier rendu, puis modifications de curseurs de la sidebar et
+du stress test, entrecoupées de temps de réflexion. Les onglets ne
+s'exécutent qu'ouverts : avant de toucher au stress test, la session ouvre
+« Gestion des Risques » (widget `onglet`), ce qui coûte un rerun au serveur,
+compté à part. Pour chaque palier de N : latence de rerun p50/p99, débit,
+changements d'onglet, CPU et mémoire du serveur.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+RACINE = Path(__file__).resolve().parent.parent
+
+# Scripts d'interaction : libellé du widget -> valeurs tirées au hasard
+SCRIPTS = {
+    "sidebar": {
+        "Prix d'achat (€)": lambda r: int(r.choice(np.arange(60_000, 300_001, 5_000))),
+        "Taux d'emprunt (%)": lambda r: round(float(r.choice(np.arange(0.5, 6.01, 0.1))), 1),
+        "Durée du crédit (ans)": lambda r: int(r.integers(5, 26)),
+        "Loyer mensuel CC (€)": lambda r: int(r.choice(np.arange(300, 2_001, 25))),
+        "Vacance locative (mois/an)": lambda r: float(r.choice(np.arange(0, 3.01, 0.25))),
+    },
+    "stress": {
+        "Vacance locative stress (mois/an)": lambda r: float(r.choice(np.arange(0, 6.01, 0.5))),
+        "Baisse des loyers (%)": lambda r: int(r.choice(np.arange(0, 31, 5))),
+        "Hausse des charges (%)": lambda r: int(r.choice(np.arange(0, 51, 5))),
+    },
+}
+# Onglet à ouvrir avant de jouer un script (None : sidebar, toujours rendue)
+ONGLETS = {"sidebar": None, "stress": "🛡️ Gestion des Risques"}
+WIDGETS_SAISIE = ("slider", "number_input")
+
+
+# ── Serveur ─────────────────────────────────────────────────────────
+
+def lancer_serveur(app, port):
+    processus = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(app), "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=RACINE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limite = time.time() + 60
+    while time.time() < limite:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return processus
+        except OSError:
+            time.sleep(0.2)
+    processus.terminate()
+    raise SystemExit("Le serveur Streamlit n'a pas démarré en 60 s")
+
+
+def mesure_processus(pid):
+    """(temps CPU cumulé en s, mémoire résidente en Mo) lus dans /proc (Linux)."""
+    try:
+        champs = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        cpu = (int(champs[11]) + int(champs[12])) / os.sysconf("SC_CLK_TCK")
+        rss = int(champs[21]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+        return cpu, rss
+    except (OSError, IndexError, ValueError):
+        return np.nan, np.nan
+
+
+# ── Session virtuelle ───────────────────────────────────────────────
+
+class SessionVirtuelle:
+    def __init__(self, url, graine):
+        self.url = url
+        self.alea = np.random.default_rng(graine)
+        self.widgets = {}  # libellé -> (type, identifiant, entier ?)
+        self.etats = {}  # identifiant -> WidgetState envoyé
+        self.onglets = None  # identifiant du widget `onglet` (st.tabs à état)
+        self.onglet = None  # onglet ouvert (None : celui par défaut)
+        self.changements_onglet = 0
+        self.latences = []
+        self.erreurs = 0
+
+    async def rerun(self, ws):
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.widget_states.widgets.extend(self.etats.values())
+        debut = time.perf_counter()
+        await ws.send(message.SerializeToString())
+        while True:
+            retour = ForwardMsg()
+            retour.ParseFromString(await ws.recv())
+            genre = retour.WhichOneof("type")
+            if genre == "delta" and retour.delta.WhichOneof("type") == "new_element":
+                self._noter_element(retour.delta.new_element)
+            elif genre == "delta" and retour.delta.WhichOneof("type") == "add_block":
+                self._noter_bloc(retour.delta.add_block)
+            elif genre == "script_finished":
+                self.latences.append(time.perf_counter() - debut)
+                return
+
+    def _noter_element(self, element):
+        genre = element.WhichOneof("type")
+        if genre == "exception":
+            self.erreurs += 1
+        elif genre in WIDGETS_SAISIE:
+            widget = getattr(element, genre)
+            entier = genre == "number_input" and widget.data_type == NumberInput.INT
+            self.widgets[widget.label] = (genre, widget.id, entier)
+
+    def _noter_bloc(self, bloc):
+        if bloc.WhichOneof("type") == "tab_container" and bloc.tab_container.id:
+            self.onglets = bloc.tab_container.id
+
+    async def ouvrir(self, ws, onglet):
+        """Ouvre `onglet` comme un clic sur son titre : un rerun du serveur."""
+        if onglet is None or onglet == self.onglet or self.onglets is None:
+            return
+        self.etats[self.onglets] = WidgetState(id=self.onglets, string_value=onglet)
+        self.onglet = onglet
+        self.changements_onglet += 1
+        await self.rerun(ws)
+
+    def modifier(self, libelle, valeur):
+        genre, identifiant, entier = self.widgets[libelle]
+        etat = self.etats.get(identifiant) or WidgetState(id=identifiant)
+        if genre == "slider":
+            etat.double_array_value.data[:] = [valeur]
+        elif entier:
+            etat.int_value = int(valeur)
+        else:
+            etat.double_value = float(valeur)
+        self.etats[identifiant] = etat
+
+    async def jouer(self, fin, reflexion):
+        async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None) as ws:
+            await self.rerun(ws)  # premier rendu
+            while time.time() < fin:
+                nom_script = self.alea.choice(list(SCRIPTS))
+                script = SCRIPTS[nom_script]
+                await self.ouvrir(ws, ONGLETS[nom_script])  # widgets rendus seulement onglet ouvert
+                libelle = self.alea.choice(list(script))
+                if libelle in self.widgets:
+                    self.modifier(libelle, script[libelle](self.alea))
+                    await self.rerun(ws)
+                await asyncio.sleep(self.alea.uniform(*reflexion))
+
+
+# ── Paliers de charge ───────────────────────────────────────────────
+
+async def palier(url, n_sessions, duree, reflexion, pid):
+    fin = time.time() + duree
+    sessions = [SessionVirtuelle(url, graine) for graine in range(n_sessions)]
+    cpu_debut, _ = mesure_processus(pid) if pid else (np.nan, np.nan)
+    rss_max, debut = 0.0, time.perf_counter()
+
+    async def echantillonner():
+        nonlocal rss_max
+        while time.time() < fin:
+            rss_max = max(rss_max, mesure_processus(pid)[1] if pid else np.nan)
+            await asyncio.sleep(0.5)
+
+    await asyncio.gather(echantillonner(), *(session.jouer(fin, reflexion) for session in sessions))
+    ecoule = time.perf_counter() - debut
+    cpu_fin, _ = mesure_processus(pid) if pid else (np.nan, np.nan)
+
+    latences = np.concatenate([session.latences for session in sessions]) * 1000
+    return {
+        "Sessions": n_sessions,
+        "Reruns": len(latences),
+        "Débit (reruns/s)": len(latences) / ecoule,
+        "Changements d'onglet": sum(session.changements_onglet for session in sessions),
+        "p50 (ms)": np.percentile(latences, 50),
+        "p99 (ms)": np.percentile(latences, 99),
+        "Max (ms)": latences.max(),
+        "CPU serveur (%)": (cpu_fin - cpu_debut) / ecoule * 100,
+        "RAM serveur max (Mo)": rss_max,
+        "Erreurs": sum(session.erreurs for session in sessions),
+    }
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m outils.charge", description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8], help="Paliers de sessions simultanées")
+    parser.add_argument("--duree", type=float, default=20.0, help="Durée de chaque palier (s)")
+    parser.add_argument("--reflexion", type=float, nargs=2, default=[0.2, 1.0], metavar=("MIN", "MAX"),
+                        help="Temps de réflexion entre deux interactions (s)")
+    parser.add_argument("--app", default="app.py", help="Script Streamlit à lancer")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--url", default=None, help="Serveur déjà lancé (ws://hôte:port) — pas de mesure CPU/RAM")
+    parser.add_argument("--csv", default=None, help="Enregistre le rapport en CSV")
+    args = parser.parse_args(arguments)
+
+    serveur = None if args.url else lancer_serveur(args.app, args.port)
+    url = f"{args.url or f'ws://localhost:{args.port}'}/_stcore/stream"
+    try:
+        lignes = []
+        for n_sessions in args.sessions:
+            lignes.append(asyncio.run(palier(url, n_sessions, args.duree, args.reflexion,
+                                             serveur.pid if serveur else None)))
+            print(f"{n_sessions} session(s) : p50 {lignes[-1]['p50 (ms)']:.0f} ms, "
+                  f"p99 {lignes[-1]['p99 (ms)']:.0f} ms", file=sys.stderr)
+    finally:
+        if serveur:
+            serveur.terminate()
+            serveur.wait()
+
+    rapport = pd.DataFrame(lignes).set_index("Sessions")
+    print(rapport.round(1).to_string())
+    if args.csv:
+        rapport.to_csv(args.csv)
+
+
+if __name__ == "__main__":
+    main()
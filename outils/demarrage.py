@@ -0,0 +1,100 @@
+"""
+Profil du démarrage à froid du dashboard, comparé à un budget.
+
+    python -m outils.demarrage --budget-import-ms 1500 --budget-rendu-ms 2500
+
+Mesure, dans des processus neufs : le temps d'import des modules de tête
+de `app.py` (détail par module, via `python -X importtime`), le démarrage
+du serveur Streamlit, le premier rendu d'une session (à froid) et celui
+d'une seconde session (à chaud). Code de sortie 1 si un budget est
+dépassé, pour servir de garde-fou en intégration continue.
+"""
+
+import argparse
+import ast
+import asyncio
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import websockets
+
+from outils.charge import RACINE, SessionVirtuelle, lancer_serveur
+
+
+def modules_importes(app):
+    """Modules importés au niveau module par le script (hors imports locaux aux onglets)."""
+    modules = []
+    for noeud in ast.parse((RACINE / app).read_text()).body:
+        if isinstance(noeud, ast.Import):
+            modules.extend(alias.name for alias in noeud.names)
+        elif isinstance(noeud, ast.ImportFrom) and noeud.module:
+            modules.append(noeud.module)
+    return list(dict.fromkeys(modules))
+
+
+def profil_imports(modules):
+    """
+    Temps cumulé (ms) de chaque module demandé, mesuré dans un interpréteur
+    neuf ; un module déjà chargé par un précédent compte pour zéro.
+    """
+    resultat = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+                              cwd=RACINE, capture_output=True, text=True, check=True)
+    temps = {}
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith("import time:") or "cumulative" in ligne:
+            continue
+        _, cumule, nom = ligne[len("import time:"):].split("|")
+        if not nom[1:].startswith(" "):  # imports de premier niveau seulement
+            temps[nom.strip()] = int(cumule) / 1000
+    return {module: temps.get(module, 0.0) for module in modules}
+
+
+async def rendus(port):
+    url = f"ws://localhost:{port}/_stcore/stream"
+    latences = []
+    for graine in range(2):
+        session = SessionVirtuelle(url, graine)
+        async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+            await session.rerun(ws)
+        latences.append(session.latences[0] * 1000)
+    return latences
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m outils.demarrage", description=__doc__.split("\n\n")[1])
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--port", type=int, default=8598)
+    parser.add_argument("--budget-import-ms", type=float, default=2_000.0)
+    parser.add_argument("--budget-rendu-ms", type=float, default=3_000.0)
+    args = parser.parse_args(arguments)
+
+    imports = profil_imports(modules_importes(args.app))
+    print(pd.Series(imports, name="Import (ms)").sort_values(ascending=False).round(1).to_string())
+
+    debut = time.perf_counter()
+    serveur = lancer_serveur(args.app, args.port)
+    demarrage_ms = (time.perf_counter() - debut) * 1000
+    try:
+        rendu_froid, rendu_chaud = asyncio.run(rendus(args.port))
+    finally:
+        serveur.terminate()
+        serveur.wait()
+
+    mesures = pd.DataFrame([
+        ("Imports du script", sum(imports.values()), args.budget_import_ms),
+        ("Démarrage du serveur", demarrage_ms, None),
+        ("Premier rendu (à froid)", rendu_froid, args.budget_rendu_ms),
+        ("Rendu d'une 2e session (à chaud)", rendu_chaud, None),
+    ], columns=["Étape", "Temps (ms)", "Budget (ms)"]).set_index("Étape")
+    mesures["Statut"] = ["dépassé" if budget and temps > budget else "ok"
+                         for temps, budget in zip(mesures["Temps (ms)"], mesures["Budget (ms)"])]
+    print()
+    print(mesures.round(0).to_string())
+    if (mesures["Statut"] == "dépassé").any():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Rapports HTML hors ligne, en lot, pour un dossier de scénarios.
+
+    python -m outils.rapports scenarios/ rapports/ --processus 4
+
+Chaque fichier `*.json` du dossier (voir `moteur.scenario`) donne un
+rapport `<nom>.html` : indicateurs clés, graphiques, tableau des flux
+annuels, comparaison des régimes fiscaux et stress test. Les rapports sont
+produits en parallèle dans un pool de processus.
+
+La bibliothèque Plotly n'est écrite qu'une fois, dans `plotly.min.js` à
+côté des rapports (le dossier se consulte sans connexion) ; avec
+`--autonome`, elle est incluse dans chaque rapport (un fichier unique à
+transmettre, ~4 Mo).
+"""
+
+import argparse
+import html
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+from moteur.indicateurs import PART_LOYER_BANQUE
+from moteur.scenario import charger_scenario, etat_scenario
+
+FICHIER_PLOTLY = "plotly.min.js"
+MISE_EN_PAGE = dict(template="plotly_white", height=380, margin=dict(l=50, r=30, t=50, b=40),
+                    font=dict(family="DM Sans, sans-serif"))
+
+STYLE = """
+body { font-family: "DM Sans", sans-serif; max-width: 1100px; margin: 2rem auto; color: #1a202c; }
+h1 { margin-bottom: 0.2rem; } h2 { border-bottom: 2px solid #e2e8f0; padding-bottom: 0.3rem; margin-top: 2rem; }
+.cartes { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.8rem; }
+.carte { border: 1px solid #e2e8f0; border-radius: 10px; padding: 0.8rem; }
+.carte .valeur { font-size: 1.5rem; font-weight: 700; color: #2f855a; }
+.carte.negative .valeur { color: #c53030; }
+.carte .libelle { font-size: 0.85rem; color: #4a5568; }
+table { border-collapse: collapse; font-size: 0.85rem; width: 100%; }
+th, td { border-bottom: 1px solid #edf2f7; padding: 0.3rem 0.5rem; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.graphiques { display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }
+.pied { margin-top: 2rem; font-size: 0.8rem; color: #718096; }
+"""
+
+PARAMETRES_AFFICHES = {
+    "prix_achat": ("Prix d'achat", "{:,.0f} €"), "travaux": ("Travaux", "{:,.0f} €"),
+    "apport": ("Apport", "{:,.0f} €"), "taux_emprunt": ("Taux d'emprunt", "{:.2f} %"),
+    "duree_credit": ("Durée du crédit", "{} ans"), "loyer_mensuel_cc": ("Loyer mensuel CC", "{:,.0f} €"),
+    "charges_copro_an": ("Charges copro / an", "{:,.0f} €"), "taxe_fonciere": ("Taxe foncière", "{:,.0f} €"),
+    "vacance_loc_mois": ("Vacance locative", "{:.2f} mois/an"), "regime_fiscal": ("Régime fiscal", "{}"),
+    "revenus_foyer": ("Salaires du foyer", "{:,.0f} €/an"), "parts_fiscales": ("Parts fiscales", "{:g}"),
+}
+
+
+@lru_cache(maxsize=1)
+def script_plotly_integre():
+    return f"<script>{get_plotlyjs()}</script>"
+
+
+def _carte(libelle, valeur, negative=False):
+    classe = "carte negative" if negative else "carte"
+    return (f'<div class="{classe}"><div class="valeur">{html.escape(valeur)}</div>'
+            f'<div class="libelle">{html.escape(libelle)}</div></div>')
+
+
+def _tableau(df, formats="{:,.0f}"):
+    return df.to_html(float_format=formats.format, border=0, na_rep="—")
+
+
+def _graphique(figure):
+    figure.update_layout(**MISE_EN_PAGE)
+    return figure.to_html(full_html=False, include_plotlyjs=False, config={"displaylogo": False})
+
+
+def rapport_html(parametres, script_plotly):
+    """Page HTML complète du scénario ; `script_plotly` est la balise qui charge Plotly."""
+    etat = etat_scenario(parametres)
+    projection_credit = etat["projection_credit"]
+    regimes = etat["regimes"]
+    df_revente = etat["df_revente"]
+    mensualite_totale = etat["mensualite"] + etat["assurance_emprunt_mensuel"]
+    endettement = mensualite_totale / (parametres["salaire_net"]
+                                       + parametres["loyer_mensuel_cc"] * PART_LOYER_BANQUE) * 100
+    tri = df_revente["TRI (%)"].dropna()
+    cf_stress, rdt_stress = etat["cf_stress"], etat["rdt_stress"]
+
+    cartes = [
+        _carte("Rendement brut", f"{etat['rendement_brut']:.2f} %"),
+        _carte("Rendement net de charges", f"{etat['rendement_net_charges']:.2f} %"),
+        _carte("Rendement net-net", f"{etat['rendement_net_net']:.2f} %", etat["rendement_net_net"] <= 0),
+        _carte("Cash-flow mensuel (année 1)", f"{etat['cashflow_mensuel']:+,.0f} €", etat["cashflow_mensuel"] < 0),
+        _carte("Mensualité (assurance comprise)", f"{mensualite_totale:,.0f} €"),
+        _carte("Endettement (non-compensation)", f"{endettement:.1f} %", endettement >= 33),
+        _carte("Investissement total", f"{etat['investissement_total']:,.0f} €"),
+        _carte("Meilleur TRI de revente", f"{tri.max():.1f} % (an {tri.idxmax()})" if len(tri) else "—",
+               bool(len(tri)) and tri.max() < 0),
+    ]
+
+    # Comparaison des régimes (année 1), comme l'onglet Fiscalité
+    cf_avant_impots = (etat["loyer_effectif_an"] / 12 - mensualite_totale - etat["charges_totales_an"] / 12)
+    comparaison = [(nom, impot, cf_avant_impots - impot / 12) for nom, impot in regimes.items()]
+
+    fig_cf = go.Figure(go.Bar(
+        x=projection_credit["Année"], y=projection_credit["Cash-flow Annuel"],
+        marker_color=["#48bb78" if v >= 0 else "#fc8181" for v in projection_credit["Cash-flow Annuel"]],
+        hovertemplate="Année %{x}<br>Cash-flow: %{y:,.0f} €<extra></extra>",
+    ))
+    fig_cf.update_layout(title="Cash-flow annuel", yaxis_title="€")
+    fig_regimes = go.Figure(go.Bar(
+        x=[nom for nom, _, _ in comparaison], y=[cf for _, _, cf in comparaison],
+        marker_color=["#48bb78" if cf >= 0 else "#fc8181" for _, _, cf in comparaison],
+        text=[f"{cf:+,.0f} €" for _, _, cf in comparaison], textposition="outside",
+    ))
+    fig_regimes.update_layout(title="Cash-flow mensuel selon le régime fiscal (année 1)", yaxis_title="€ / mois")
+    fig_tri = go.Figure(go.Bar(
+        x=df_revente.index, y=df_revente["TRI (%)"], marker_color="#63b3ed",
+        hovertemplate="Sortie année %{x}<br>TRI: %{y:.1f} %<extra></extra>",
+    ))
+    fig_tri.update_layout(title="TRI selon l'année de revente", xaxis_title="Année de revente", yaxis_title="%")
+
+    lignes_parametres = "".join(
+        f"<tr><td>{libelle}</td><td>{html.escape(format_.format(parametres[nom]))}</td></tr>"
+        for nom, (libelle, format_) in PARAMETRES_AFFICHES.items()
+    )
+    lignes_regimes = "".join(
+        f"<tr><td>{html.escape(nom)}</td><td>{impot:,.0f} €</td><td>{cf:+,.0f} €</td></tr>"
+        for nom, impot, cf in comparaison
+    )
+    flux = projection_credit.vers_dataframe().set_index("Année").drop(columns="Déflateur")
+    nom = html.escape(str(parametres["nom"]))
+
+    return f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>{nom} — Rapport d'investissement locatif</title>
+<style>{STYLE}</style>
+{script_plotly}
+</head>
+<body>
+<h1>🏠 {nom}</h1>
+<div>{html.escape(parametres["regime_fiscal"])}</div>
+
+<h2>Indicateurs clés</h2>
+<div class="cartes">{"".join(cartes)}</div>
+
+<h2>Paramètres</h2>
+<table>{lignes_parametres}</table>
+
+<h2>Graphiques</h2>
+<div class="graphiques">
+<div>{_graphique(fig_cf)}</div>
+<div>{_graphique(fig_tri)}</div>
+</div>
+
+<h2>Comparaison des régimes fiscaux (année 1)</h2>
+<table><tr><th>Régime</th><th>Impôts + prélèvements sociaux</th><th>Cash-flow mensuel</th></tr>
+{lignes_regimes}</table>
+{_graphique(fig_regimes)}
+
+<h2>Stress test</h2>
+<p>Vacance {parametres["stress_vacance"]:g} mois/an, loyers −{parametres["stress_loyer"]:g} %,
+charges +{parametres["stress_charges"]:g} %, fiscalité +{parametres["stress_impots"]:g} %.</p>
+<div class="cartes">
+{_carte("Cash-flow stressé", f"{cf_stress:+,.0f} €/mois", cf_stress < 0)}
+{_carte("Rendement brut stressé", f"{rdt_stress:.2f} %", rdt_stress <= parametres["taux_emprunt"])}
+{_carte("Réserve conseillée (2 ans)", f"{max(0.0, -cf_stress) * 24:,.0f} €", cf_stress < 0)}
+</div>
+
+<h2>Flux annuels sur la durée du crédit</h2>
+{_tableau(flux)}
+
+<div class="pied">Rapport généré le {time.strftime("%d/%m/%Y")} — simulation indicative, ne constitue pas
+un conseil fiscal ou financier.</div>
+</body>
+</html>
+"""
+
+
+def generer_rapport(chemin_scenario, dossier_sortie, autonome=False):
+    """Écrit le rapport d'un scénario et renvoie son chemin."""
+    parametres = charger_scenario(chemin_scenario)
+    script = script_plotly_integre() if autonome else f'<script src="{FICHIER_PLOTLY}"></script>'
+    sortie = Path(dossier_sortie) / f"{Path(chemin_scenario).stem}.html"
+    sortie.write_text(rapport_html(parametres, script), encoding="utf-8")
+    return sortie
+
+
+def executer(dossier_scenarios, dossier_sortie, processus=None, autonome=False, journal=sys.stderr):
+    """Génère un rapport par scénario du dossier ; renvoie le nombre de rapports écrits."""
+    scenarios = sorted(Path(dossier_scenarios).glob("*.json"))
+    if not scenarios:
+        raise SystemExit(f"Aucun scénario (*.json) dans {dossier_scenarios}")
+    dossier_sortie = Path(dossier_sortie)
+    dossier_sortie.mkdir(parents=True, exist_ok=True)
+    if not autonome:
+        (dossier_sortie / FICHIER_PLOTLY).write_text(get_plotlyjs(), encoding="utf-8")
+
+    n_rapports, erreurs = 0, 0
+    with ProcessPoolExecutor(processus) as pool:
+        futures = {pool.submit(generer_rapport, chemin, dossier_sortie, autonome): chemin for chemin in scenarios}
+        for future in as_completed(futures):
+            try:
+                print(f"→ {future.result()}", file=journal)
+                n_rapports += 1
+            except (ValueError, KeyError, TypeError) as exc:  # scénario mal formé : on continue
+                nom = futures[future].name
+                message = str(exc) if str(exc).startswith(nom) else f"{nom} : {type(exc).__name__} : {exc}"
+                print(f"✗ {message}", file=journal)
+                erreurs += 1
+    if erreurs:
+        print(f"{erreurs} scénario(s) en erreur", file=journal)
+    return n_rapports
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m outils.rapports", description=__doc__.split("\n\n")[1])
+    parser.add_argument("scenarios", help="Dossier de scénarios (*.json)")
+    parser.add_argument("sortie", help="Dossier des rapports HTML")
+    parser.add_argument("--processus", type=int, default=None, help="Processus de calcul (défaut : nb de cœurs)")
+    parser.add_argument("--autonome", action="store_true", help="Inclut Plotly dans chaque rapport")
+    args = parser.parse_args(arguments)
+
+    debut = time.perf_counter()
+    n_rapports = executer(args.scenarios, args.sortie, args.processus, args.autonome)
+    print(f"{n_rapports} rapport(s) en {time.perf_counter() - debut:.1f} s → {args.sortie}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
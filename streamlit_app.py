@@ -7,12 +7,43 @@ Run with:  streamlit run app.py
 Requires:  pip install streamlit plotly numpy pandas
 """
 
+import hmac
+import os
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import plotly.graph_objects as go
-import plotly.express as px
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+
+from moteur.fiscalite import (
+    PLAFOND_DEFICIT_FONCIER, PRELEVEMENTS_SOCIAUX,
+    impot_locatif, revenu_net_salaires, taux_marginal,
+)
+from moteur.cache import cache_session, etat_caches, purger_global
+from moteur.candidats import evaluer_candidats
+from moteur.credit import (
+    chemins_historiques, echeancier_variable, grille_remboursement_anticipe, simuler_chemins_indice,
+)
+from moteur.equipements import (
+    CATALOGUE_EXEMPLE, catalogue_disponible, evaluer_equipements, meilleure_selection, normaliser_catalogue,
+)
+from moteur.indicateurs import PART_LOYER_BANQUE, evaluer_indicateurs
+from moteur.marche import MOIS, PROFIL_INDICATIF, analyse, bornee, indices_disponibles, lire_indices
+from moteur.modele import HORIZON_REVENTE, NATURES_CREDIT, modele
+from moteur.portefeuille import OBJECTIFS, TAUX_ENDETTEMENT_MAX, optimiser_portefeuille
+from moteur.lots import LOTS_EXEMPLE, agreger_lots, echeancier_lots, normaliser_lots
+from moteur.projection import (
+    AMORTISSEMENT_MEUBLES, PART_CHARGES_RECUPERABLES, code_regime, facteurs_indexation, projection_annuelle,
+)
+from moteur.rotation import PROFIL_DEFAUT, PROFILS_ROTATION, ProfilRotation, esperance_rotation, simuler_rotation
+from moteur.saisonnier import PROFIL_SAISONNIER, Saisonnier, simuler_saisonnier
+from moteur.serenite import TYPES_BIENS, energie, serenite
+from moteur.surface import SurfaceReponse, grille_autour
+from moteur.zonage import (
+    ABATTEMENTS_COSSE, CONVENTION_DEFAUT, CONVENTIONS, PROFILS_ZONES, ZONE_DEFAUT, ZONES, abattement_cosse,
+    zonage_officiel,
+)
 
 # ─────────────────────────────────────────────────────────────────────
 # CONFIG & STYLING
@@ -306,6 +337,18 @@ PLOTLY_LAYOUT = dict(
     yaxis=dict(gridcolor="rgba(255,255,255,0.06)", zerolinecolor="rgba(255,255,255,0.1)"),
 )
 
+TAILLE_BLOC_CHEMINS = 10_000  # chemins par bloc des simulations en arrière-plan
+
+# Budgets mémoire des résultats mis en cache (surchargeables par variables d'environnement)
+BUDGET_CACHE_SESSION = float(os.environ.get("DASH_IMMO_CACHE_SESSION_MO", 256)) * 1e6
+BUDGET_CACHE_GLOBAL = float(os.environ.get("DASH_IMMO_CACHE_GLOBAL_MO", 2_048)) * 1e6
+DUREE_VIE_CACHE_S = float(os.environ.get("DASH_IMMO_CACHE_TTL_MIN", 30)) * 60
+# Jeton de la vue d'administration (?admin=<jeton>) ; sans jeton, la vue est désactivée
+JETON_ADMIN = os.environ.get("DASH_IMMO_ADMIN_TOKEN", "")
+
+# Indices mensuels des prix du logement (CSV), voir moteur/marche.py
+DOSSIER_INDICES = os.environ.get("DASH_IMMO_INDICES", os.path.join(os.path.dirname(__file__), "donnees", "indices"))
+
 
 # ─────────────────────────────────────────────────────────────────────
 # SIDEBAR — GLOBAL PARAMETERS
@@ -326,17 +369,108 @@ with st.sidebar:
     taux_emprunt = st.slider("Taux d'emprunt (%)", 0.5, 6.0, 1.8, 0.1)
     duree_credit = st.slider("Durée du crédit (ans)", 5, 25, 20)
     assurance_emprunt_pct = st.slider("Assurance emprunteur (%/an)", 0.05, 0.60, 0.20, 0.01)
+    salaire_net = st.number_input("Salaire net mensuel (€)", 500, 50_000, 2_500, step=100,
+                                  help="Pour le taux d'endettement")
+    financement_composite = st.checkbox("Financement composite (plusieurs lignes)", value=False,
+                                        help="Prêt principal avec différé, prêt à paliers, tranche in fine…")
+    lignes_editees = None
+    if financement_composite:
+        besoin = prix_achat + travaux - apport
+        with st.expander("🧩 Lignes de crédit", expanded=True):
+            lignes_editees = st.data_editor(
+                pd.DataFrame({
+                    "Ligne": ["Prêt principal", "Tranche in fine"],
+                    "Type": ["Amortissable", "In fine"],
+                    "Montant (€)": [round(besoin * 0.8, -2), besoin - round(besoin * 0.8, -2)],
+                    "Taux (%)": [taux_emprunt, taux_emprunt + 0.3],
+                    "Durée (ans)": [duree_credit, 15],
+                    "Différé (mois)": [12, 0],
+                    "Différé total": [False, False],
+                    "Palier (ans)": [5, 5],
+                    "Progression (%)": [0.0, 0.0],
+                }),
+                num_rows="dynamic", hide_index=True, key="lignes_credit",
+                column_config={
+                    "Type": st.column_config.SelectboxColumn(options=list(NATURES_CREDIT), required=True),
+                    "Montant (€)": st.column_config.NumberColumn(min_value=0, step=1_000),
+                    "Taux (%)": st.column_config.NumberColumn(min_value=0.0, max_value=10.0, step=0.05),
+                    "Durée (ans)": st.column_config.NumberColumn(min_value=1, max_value=30, step=1),
+                    "Différé (mois)": st.column_config.NumberColumn(min_value=0, max_value=36, step=1),
+                    "Palier (ans)": st.column_config.NumberColumn(min_value=1, max_value=15, step=1,
+                                                                  help="Type « À paliers » uniquement"),
+                    "Progression (%)": st.column_config.NumberColumn(min_value=-50.0, max_value=100.0, step=5.0,
+                                                                     help="Hausse de la mensualité à chaque palier"),
+                },
+            ).dropna(subset=["Type", "Montant (€)", "Taux (%)", "Durée (ans)"]).fillna(
+                {"Différé (mois)": 0, "Différé total": False, "Palier (ans)": 5, "Progression (%)": 0.0})
+            st.caption(f"Total des lignes : {lignes_editees['Montant (€)'].sum():,.0f} € "
+                       f"— besoin après apport : {besoin:,.0f} €")
 
     st.markdown("### 🔑 La Location")
-    loyer_mensuel_cc = st.number_input("Loyer mensuel CC (€)", 50, 10_000, 600, step=25)
-    charges_copro_an = st.number_input("Charges copro / an (€)", 0, 15_000, 800, step=100)
+    plusieurs_lots = st.checkbox("Plusieurs lots (immeuble de rapport, colocation)", value=False,
+                                 help="Un loyer, une vacance, des charges et un mobilier par lot ou par chambre")
+    lots_edites = None
+    if plusieurs_lots:
+        with st.expander("🏢 Lots", expanded=True):
+            lots_edites = normaliser_lots(st.data_editor(
+                LOTS_EXEMPLE, num_rows="dynamic", hide_index=True, key="lots",
+                column_config={
+                    "Loyer CC (€)": st.column_config.NumberColumn(min_value=0, step=10),
+                    "Vacance (mois/an)": st.column_config.NumberColumn(min_value=0.0, max_value=12.0, step=0.25),
+                    "Charges copro / an (€)": st.column_config.NumberColumn(min_value=0, step=50),
+                    "Mobilier (€)": st.column_config.NumberColumn(min_value=0, step=250,
+                                                                  help="Amorti en LMNP réel (lots meublés)"),
+                },
+            ))
+            agregat_lots = agreger_lots(lots_edites)
+            st.caption(f"{len(lots_edites)} lots : {agregat_lots['loyer_mensuel_cc']:,.0f} € CC / mois, "
+                       f"vacance pondérée {agregat_lots['vacance_loc_mois']:.2f} mois/an")
+        loyer_mensuel_cc = agregat_lots["loyer_mensuel_cc"]
+        charges_copro_an = agregat_lots["charges_copro_an"]
+        mobilier = agregat_lots["mobilier"]
+    else:
+        loyer_mensuel_cc = st.number_input("Loyer mensuel CC (€)", 50, 10_000, 600, step=25)
+        charges_copro_an = st.number_input("Charges copro / an (€)", 0, 15_000, 800, step=100)
+        mobilier = AMORTISSEMENT_MEUBLES[0]
     taxe_fonciere = st.number_input("Taxe foncière / an (€)", 0, 10_000, 700, step=50)
     assurance_pno = st.number_input("Assurance PNO / an (€)", 0, 2_000, 120, step=10)
-    vacance_loc_mois = st.slider("Vacance locative (mois/an)", 0.0, 3.0, 0.5, 0.25)
+    mode_vacance = "Lots" if plusieurs_lots else st.radio("Vacance locative", ["Fixe", "Rotation des locataires"], horizontal=True,
+                            help="Rotation : vacance et impayés attendus d'après le cycle de vie des locataires "
+                                 "(chaîne de Markov, détail dans Gestion des Risques)")
+    if mode_vacance == "Lots":
+        vacance_loc_mois = agregat_lots["vacance_loc_mois"]
+        profil_rotation = None
+    elif mode_vacance == "Fixe":
+        vacance_loc_mois = st.slider("Vacance locative (mois/an)", 0.0, 3.0, 0.5, 0.25)
+        profil_rotation = None
+    else:
+        type_rotation = st.selectbox("Profil de rotation", PROFILS_ROTATION["Type"],
+                                     index=list(PROFILS_ROTATION["Type"]).index(PROFIL_DEFAUT))
+        profil_type = ProfilRotation.du_type(type_rotation)
+        with st.expander("Cycle de vie du locataire"):
+            profil_rotation = ProfilRotation(
+                bail_mois=st.number_input("Durée du bail (mois)", 1, 120, int(profil_type.bail_mois)),
+                depart_echeance=st.slider("Départ à l'échéance (%)", 0.0, 100.0,
+                                          float(profil_type.depart_echeance), 5.0),
+                depart_en_cours=st.slider("Départ en cours de bail (%/an)", 0.0, 60.0,
+                                          float(profil_type.depart_en_cours), 1.0),
+                relocation_mois=st.slider("Délai moyen de relocation (mois)", 0.0, 6.0,
+                                          float(profil_type.relocation_mois), 0.1),
+                impayes_an=st.slider("Risque d'impayé (%/an)", 0.0, 15.0, float(profil_type.impayes_an), 0.5),
+                duree_impaye_mois=st.slider("Durée d'un impayé (mois)", 1.0, 24.0,
+                                            float(profil_type.duree_impaye_mois), 1.0),
+            )
+        vacance_loc_mois = esperance_rotation(profil_rotation, duree_credit)
+        st.caption(f"Vacance + impayés attendus : {vacance_loc_mois:.2f} mois/an sur {duree_credit} ans")
 
     st.markdown("### 📊 Fiscalité")
-    tmi = st.selectbox("Tranche Marginale d'Imposition", [0, 11, 30, 41, 45], index=2)
-    prelevement_sociaux = 17.2
+    revenus_foyer = st.number_input("Salaires imposables du foyer (€/an)", 0, 1_000_000, 40_000, step=1_000,
+                                    help="Avant abattement de 10% — hors revenus locatifs")
+    parts_fiscales = st.number_input("Nombre de parts (quotient familial)", 1.0, 10.0, 1.0, step=0.5)
+    imposition_commune = st.checkbox("Imposition commune (couple)", value=False)
+    tmi = float(taux_marginal(revenu_net_salaires(revenus_foyer), parts_fiscales))
+    st.caption(f"Tranche marginale du foyer : {tmi:.0f} %")
+    prelevement_sociaux = PRELEVEMENTS_SOCIAUX
     regime_fiscal = st.selectbox("Régime fiscal", [
         "Nu — Micro-foncier (30%)",
         "Nu — Réel (Déficit foncier)",
@@ -345,110 +479,45 @@ with st.sidebar:
         "Meublé LMNP — Réel Simplifié",
     ], index=4)
 
-
-# ─────────────────────────────────────────────────────────────────────
-# CORE CALCULATIONS
-# ─────────────────────────────────────────────────────────────────────
-
-frais_notaire = prix_achat * frais_notaire_pct / 100
-investissement_total = prix_achat + frais_notaire + travaux
-montant_emprunt = prix_achat + travaux - apport
-
-# Mensualité (amortissement constant taux fixe)
-taux_mensuel = taux_emprunt / 100 / 12
-nb_mois = duree_credit * 12
-if taux_mensuel > 0:
-    mensualite = montant_emprunt * taux_mensuel / (1 - (1 + taux_mensuel) ** (-nb_mois))
-else:
-    mensualite = montant_emprunt / nb_mois
-
-# Assurance emprunteur
-assurance_emprunt_mensuel = montant_emprunt * assurance_emprunt_pct / 100 / 12
-
-# Loyer net de vacance
-loyer_annuel_cc = loyer_mensuel_cc * 12
-loyer_effectif_an = loyer_mensuel_cc * (12 - vacance_loc_mois)
-charges_locataire_an = charges_copro_an * 0.65  # part récup. estimée
-loyer_nu_an = loyer_effectif_an - charges_locataire_an
-
-# Rendements
-rendement_brut = (loyer_annuel_cc / investissement_total) * 100
-charges_totales_an = taxe_fonciere + (charges_copro_an * 0.35) + assurance_pno + travaux * 0.02  # 2% entretien
-rendement_net_charges = ((loyer_effectif_an - charges_totales_an) / investissement_total) * 100
-
-# Amortissement table (year by year)
-capital_restant = montant_emprunt
-yearly_data = []
-for year in range(1, duree_credit + 1):
-    interets_an = 0
-    capital_rembourse_an = 0
-    for m in range(12):
-        interet_mois = capital_restant * taux_mensuel
-        capital_mois = mensualite - interet_mois
-        capital_restant -= capital_mois
-        interets_an += interet_mois
-        capital_rembourse_an += capital_mois
-
-    # Fiscal computation
-    charges_deductibles = interets_an + taxe_fonciere + assurance_pno + (charges_copro_an * 0.35)
-
-    if "Micro-foncier" in regime_fiscal:
-        base_imposable = loyer_nu_an * 0.70
-        impots = base_imposable * (tmi / 100 + prelevement_sociaux / 100) if base_imposable > 0 else 0
-    elif "Réel" in regime_fiscal and "Cosse" in regime_fiscal:
-        abattement_cosse = 0.50  # Zone B2 social
-        revenus_apres_cosse = loyer_nu_an * (1 - abattement_cosse)
-        base_imposable = max(0, revenus_apres_cosse - charges_deductibles)
-        impots = base_imposable * (tmi / 100 + prelevement_sociaux / 100)
-    elif "Réel" in regime_fiscal and "Déficit" in regime_fiscal:
-        base_imposable = loyer_nu_an - charges_deductibles
-        if base_imposable < 0:
-            deficit = abs(base_imposable)
-            imputation_rg = min(deficit, 10700)
-            impots = -imputation_rg * (tmi / 100)  # gain fiscal
-        else:
-            impots = base_imposable * (tmi / 100 + prelevement_sociaux / 100)
-    elif "Micro-BIC" in regime_fiscal:
-        base_imposable = loyer_effectif_an * 0.50
-        impots = base_imposable * (tmi / 100 + prelevement_sociaux / 100) if base_imposable > 0 else 0
-    elif "LMNP" in regime_fiscal and "Réel" in regime_fiscal:
-        amortissement = (prix_achat * 0.90) / 30  # 90% sur 30 ans
-        amort_meubles = 3000 / 7  # meubles sur 7 ans
-        total_amort = amortissement + (amort_meubles if year <= 7 else 0)
-        base_imposable = max(0, loyer_effectif_an - charges_deductibles - total_amort)
-        impots = base_imposable * (tmi / 100 + prelevement_sociaux / 100)
-    else:
-        impots = 0
-
-    # Cash-flow
-    total_mensualite = mensualite + assurance_emprunt_mensuel
-    depenses_an = total_mensualite * 12 + charges_totales_an + max(0, impots)
-    cashflow_an = loyer_effectif_an - depenses_an
-    if impots < 0:
-        cashflow_an -= impots  # gain fiscal positif
-
-    yearly_data.append({
-        "Année": year,
-        "Loyer Effectif": loyer_effectif_an,
-        "Mensualités Crédit": total_mensualite * 12,
-        "Intérêts": interets_an,
-        "Capital Remboursé": capital_rembourse_an,
-        "Capital Restant Dû": max(0, capital_restant),
-        "Charges": charges_totales_an,
-        "Impôts": max(0, impots),
-        "Gain Fiscal": abs(min(0, impots)),
-        "Cash-flow Annuel": cashflow_an,
-        "Cash-flow Mensuel": cashflow_an / 12,
-    })
-
-df = pd.DataFrame(yearly_data)
-
-# Net-net
-impots_an1 = df.iloc[0]["Impôts"] - df.iloc[0]["Gain Fiscal"]
-rendement_net_net = ((loyer_effectif_an - charges_totales_an - impots_an1) / investissement_total) * 100
-
-# Cash-flow mensuel moyen
-cashflow_mensuel = df.iloc[0]["Cash-flow Mensuel"]
+    # Zone A bis–C : par la commune si le zonage officiel est déposé, sinon au choix
+    zonage = zonage_officiel()
+    zone_abc = None
+    if zonage is not None:
+        recherche_commune = st.text_input("Commune (nom ou code INSEE)", "",
+                                          help=f"Zonage officiel : {len(zonage):,} communes")
+        trouvees = zonage.rechercher(recherche_commune) if recherche_commune.strip() else None
+        if trouvees is not None and len(trouvees) > 1:
+            choix_commune = st.selectbox("Homonymes", range(len(trouvees)),
+                                         format_func=lambda i: f"{trouvees['Commune'][i]} ({trouvees['Code INSEE'][i]})")
+            trouvees = trouvees.iloc[[choix_commune]].reset_index(drop=True)
+        if trouvees is not None and len(trouvees) and trouvees["Zone"][0] is not None:
+            zone_abc = trouvees["Zone"][0]
+            st.caption(f"{trouvees['Commune'][0]} ({trouvees['Code INSEE'][0]}) : zone {zone_abc}")
+        elif trouvees is not None:
+            st.caption("Commune introuvable dans le zonage — choisissez la zone")
+    if zone_abc is None:
+        zone_abc = st.selectbox("Zone (A bis à C)", ZONES, index=ZONES.index(ZONE_DEFAUT))
+    convention_cosse = st.selectbox("Convention Anah (Cosse)", CONVENTIONS, index=CONVENTIONS.index(CONVENTION_DEFAUT),
+                                    help="Régime « Réel + Cosse Ancien » : l'abattement dépend de la zone "
+                                         "et de la convention signée avec l'Anah")
+    st.caption(f"Abattement Cosse : {abattement_cosse(zone_abc, convention_cosse):.0f} % des loyers")
+
+    st.markdown("### 📈 Indexation (par an)")
+    indexation_loyer = st.slider("Loyers — IRL (%)", -2.0, 6.0, 1.5, 0.25)
+    indexation_charges = st.slider("Charges & assurances (%)", -2.0, 8.0, 2.0, 0.25)
+    indexation_taxe = st.slider("Taxe foncière (%)", -2.0, 10.0, 3.0, 0.25)
+    indexation_valeur = st.slider("Valeur du bien (%)", -5.0, 8.0, 1.0, 0.25)
+    inflation = st.slider("Inflation (vue en euros constants) (%)", 0.0, 8.0, 2.0, 0.25)
+
+    st.markdown("### 🏁 Revente")
+    frais_revente_pct = st.slider("Frais de revente (% du prix)", 0.0, 10.0, 5.0, 0.5)
+
+    st.markdown("### 🏘️ Biens candidats")
+    fichier_candidats = st.file_uploader(
+        "Liste de biens (CSV)", type="csv",
+        help="Colonnes prix_achat et loyer_mensuel_cc, puis au choix nom, type_bien, travaux, apport, "
+             "taux_emprunt… — les paramètres absents reprennent ceux de la sidebar",
+    )
 
 
 # ─────────────────────────────────────────────────────────────────────
@@ -463,10 +532,146 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Bandeau des indicateurs clés : dès le début du rerun, valeur interpolée sur
+# la surface de réponse précalculée ; remplacée par la valeur exacte une fois
+# le moteur passé.
+bandeau = st.empty()
+
+
+def bandeau_kpi(rendement, cashflow, endettement, interpole=False):
+    prefixe, sub = ("≈ ", "Interpolé — calcul exact en cours") if interpole else ("", "Calcul exact")
+    with bandeau.container():
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            metric_card("Net-Net (année 1)", f"{prefixe}{rendement:.2f} %", sub,
+                         "" if rendement > 3 else "negative")
+        with col2:
+            metric_card("Cash-flow / mois (année 1)", f"{prefixe}{cashflow:,.0f} €", sub,
+                         "" if cashflow >= 0 else "negative")
+        with col3:
+            metric_card("Endettement (non-compensation)", f"{prefixe}{endettement:.1f} %", sub,
+                         "" if endettement < 33 else "negative")
+
+
+point_surface = dict(taux_emprunt=taux_emprunt, loyer_mensuel_cc=loyer_mensuel_cc, prix_achat=prix_achat,
+                     vacance_loc_mois=vacance_loc_mois)
+fixes_surface = dict(
+    regime=code_regime(regime_fiscal), frais_notaire_pct=frais_notaire_pct, travaux=travaux, apport=apport,
+    duree_credit=duree_credit, assurance_emprunt_pct=assurance_emprunt_pct, charges_copro_an=charges_copro_an,
+    taxe_fonciere=taxe_fonciere, assurance_pno=assurance_pno, revenus_foyer=revenus_foyer,
+    parts_fiscales=parts_fiscales, imposition_commune=imposition_commune, salaire_net=salaire_net,
+    prelevement_sociaux=prelevement_sociaux, abattement_cosse=abattement_cosse(zone_abc, convention_cosse),
+    mobilier=mobilier,
+)
+surface_kpi = None if financement_composite else st.session_state.get("surface_kpi")
+if surface_kpi is not None and surface_kpi.valable(point_surface, fixes_surface):
+    approx = surface_kpi.interpoler(point_surface)
+    bandeau_kpi(approx["rendement_net_net"], approx["cashflow_mensuel"], approx["endettement_nc"], interpole=True)
+
+# ─────────────────────────────────────────────────────────────────────
+# CORE CALCULATIONS
+# ─────────────────────────────────────────────────────────────────────
+
+# Résultats lourds (Monte Carlo, grilles, tâches) : cache LRU borné de la session
+contexte = get_script_run_ctx()
+cache = st.session_state["cache"] = cache_session(contexte.session_id if contexte else "locale",
+                                                  BUDGET_CACHE_SESSION, DUREE_VIE_CACHE_S)
+
+# Grandeurs dérivées mémoïsées par session : seuls les nœuds en aval d'une
+# entrée modifiée sont recalculés (voir moteur/modele.py). Le mémo est gardé
+# dans le cache de la session, donc compté dans son budget.
+etat = cache.obtenir(("etat_modele",), modele.etat)
+etat.nouvelle_passe()
+etat.definir(
+    prix_achat=prix_achat, frais_notaire_pct=frais_notaire_pct, travaux=travaux, surface_m2=surface_m2,
+    apport=apport, taux_emprunt=taux_emprunt, duree_credit=duree_credit,
+    assurance_emprunt_pct=assurance_emprunt_pct,
+    financement_composite=financement_composite, lignes_editees=lignes_editees,
+    loyer_mensuel_cc=loyer_mensuel_cc, charges_copro_an=charges_copro_an, taxe_fonciere=taxe_fonciere,
+    assurance_pno=assurance_pno, vacance_loc_mois=vacance_loc_mois, mobilier=mobilier,
+    revenus_foyer=revenus_foyer, parts_fiscales=parts_fiscales, imposition_commune=imposition_commune,
+    prelevement_sociaux=prelevement_sociaux, regime_fiscal=regime_fiscal,
+    zone_abc=zone_abc, convention_cosse=convention_cosse,
+    indexation_loyer=indexation_loyer, indexation_charges=indexation_charges,
+    indexation_taxe=indexation_taxe, indexation_valeur=indexation_valeur, inflation=inflation,
+    frais_revente_pct=frais_revente_pct,
+)
+
+frais_notaire = etat["frais_notaire"]
+investissement_total = etat["investissement_total"]
+montant_emprunt = etat["montant_emprunt"]
+taux_mensuel = etat["taux_mensuel"]
+nb_mois = etat["nb_mois"]
+lignes_credit = etat["lignes_credit"]
+echeancier = etat["echeancier"]
+mensualite = etat["mensualite"]
+assurance_emprunt_mensuel = etat["assurance_emprunt_mensuel"]
+
+loyer_annuel_cc = etat["loyer_annuel_cc"]
+loyer_effectif_an = etat["loyer_effectif_an"]
+loyer_nu_an = etat["loyer_nu_an"]
+charges_totales_an = etat["charges_totales_an"]
+rendement_brut = etat["rendement_brut"]
+rendement_net_charges = etat["rendement_net_charges"]
+
+projection = etat["projection"]
+projection_credit = etat["projection_credit"]
+impots_nets_an1 = etat["impots_nets_an1"]
+rendement_net_net = etat["rendement_net_net"]
+cashflow_mensuel = etat["cashflow_mensuel"]
+
+
+bandeau_kpi(rendement_net_net, cashflow_mensuel,
+            (mensualite + assurance_emprunt_mensuel) / (salaire_net + loyer_mensuel_cc * PART_LOYER_BANQUE) * 100)
+
+# Surface de réponse pour les prochains mouvements de curseurs (prêt unique) :
+# recentrée dès que le point sort de la grille ou qu'un autre paramètre change.
+if not financement_composite and (surface_kpi is None or not surface_kpi.valable(point_surface, fixes_surface)):
+    st.session_state["surface_kpi"] = SurfaceReponse.construire(evaluer_indicateurs, {
+        "taux_emprunt": grille_autour(taux_emprunt, 0.5, 6.0, 1.0),
+        "loyer_mensuel_cc": grille_autour(loyer_mensuel_cc, 50, 10_000, loyer_mensuel_cc * 0.3),
+        "prix_achat": grille_autour(prix_achat, 10_000, 1_000_000, prix_achat * 0.3),
+        "vacance_loc_mois": grille_autour(vacance_loc_mois, 0.0, 12.0, 1.0),
+    }, fixes_surface)
+
+
+def impots_location(base_imposable, imputation_revenu_global=0.0):
+    # Supplément d'IR (barème progressif du foyer) + prélèvements sociaux
+    return impot_locatif(base_imposable, revenus_foyer, parts_fiscales, imposition_commune,
+                         imputation_revenu_global, prelevement_sociaux)
+
+
+def biens_candidats():
+    # Biens candidats évalués aux paramètres de la sidebar : fichier chargé, ou
+    # à défaut le bien courant et un bien typique de chaque type au même prix.
+    if fichier_candidats is not None:
+        cle_source = fichier_candidats.file_id
+
+        def lire():
+            return pd.read_csv(fichier_candidats)
+    else:
+        cle_source = ("exemples", prix_achat, loyer_mensuel_cc)
+
+        def lire():
+            return pd.DataFrame({
+                "nom": ["Votre bien", *TYPES_BIENS["Type"]],
+                "type_bien": [None, *TYPES_BIENS["Type"]],
+                "prix_achat": prix_achat,
+                "loyer_mensuel_cc": [loyer_mensuel_cc, *(prix_achat * TYPES_BIENS["Rdt Brut Typique (%)"] / 1200)],
+            })
+    defauts = {**{nom: valeur for nom, valeur in fixes_surface.items() if nom != "regime"},
+               "taux_emprunt": taux_emprunt, "vacance_loc_mois": vacance_loc_mois}
+    return cache.obtenir(
+        ("candidats", cle_source, fixes_surface["regime"], indexation_valeur, tuple(defauts.items())),
+        lambda: evaluer_candidats(lire(), fixes_surface["regime"], indexation_valeur, **defauts),
+    )
+
+
 # ─────────────────────────────────────────────────────────────────────
 # TABS
 # ─────────────────────────────────────────────────────────────────────
 
+# Onglets à suivi d'état : seul l'onglet ouvert est exécuté (voir la fin du fichier)
 tabs = st.tabs([
     "📊 Rendements & Cash-flow",
     "🎯 Rendement Entrepreneurial",
@@ -476,13 +681,13 @@ tabs = st.tabs([
     "🛡️ Gestion des Risques",
     "📈 Stratégies d'Investissement",
     "🔧 Outils DCF & Comparables",
-])
+], key="onglet", on_change="rerun")
 
 
 # ═══════════════════════════════════════════════════════════════
 # TAB 1 — RENDEMENTS & CASH-FLOW
 # ═══════════════════════════════════════════════════════════════
-with tabs[0]:
+def onglet_rendements():
     st.markdown("## Rendements Locatifs & Cash-flow")
     concept_box(
         "Les 3 niveaux de rendement (Chapitre A.1)",
@@ -518,19 +723,31 @@ with tabs[0]:
     )
 
     # Cash-flow evolution chart
+    vue_euros = st.radio("Affichage des montants", ["Euros courants (nominal)", "Euros constants (réel)"],
+                         horizontal=True, help=f"Euros constants : déflatés de l'inflation ({inflation:.2f} %/an)",
+                         key="vue_euros", persist_state="page")
+    vue_reelle = vue_euros.startswith("Euros constants")
+    deflateur = projection_credit["Déflateur"] if vue_reelle else 1.0
     col_chart1, col_chart2 = st.columns(2)
 
     with col_chart1:
         fig_cf = go.Figure()
-        colors = ["#48bb78" if v >= 0 else "#fc8181" for v in df["Cash-flow Annuel"]]
+        cashflow_affiche = projection_credit["Cash-flow Annuel"] * deflateur
+        colors = ["#48bb78" if v >= 0 else "#fc8181" for v in cashflow_affiche]
         fig_cf.add_trace(go.Bar(
-            x=df["Année"], y=df["Cash-flow Annuel"],
+            x=projection_credit["Année"], y=cashflow_affiche,
             marker_color=colors, name="Cash-flow",
             hovertemplate="Année %{x}<br>Cash-flow: %{y:,.0f} €<extra></extra>"
         ))
+        fig_cf.add_trace(go.Scatter(
+            x=projection_credit["Année"], y=projection_credit["Loyer Effectif"] * deflateur, name="Loyer Effectif",
+            line=dict(color="#63b3ed", width=2, dash="dot"),
+            hovertemplate="Année %{x}<br>Loyer: %{y:,.0f} €<extra></extra>"
+        ))
         fig_cf.update_layout(
             title="Évolution du Cash-flow Annuel",
-            yaxis_title="€",
+            yaxis_title="€ constants" if vue_reelle else "€",
+            showlegend=False,
             **PLOTLY_LAYOUT
         )
         fig_cf.add_hline(y=0, line_dash="dash", line_color="rgba(255,255,255,0.3)")
@@ -543,7 +760,7 @@ with tabs[0]:
                 loyer_effectif_an,
                 (mensualite + assurance_emprunt_mensuel) * 12,
                 charges_totales_an,
-                max(0, df.iloc[0]["Impôts"] - df.iloc[0]["Gain Fiscal"])
+                max(0, impots_nets_an1)
             ],
             marker=dict(colors=["#48bb78", "#fc8181", "#f6ad55", "#b794f4"]),
             hole=0.5,
@@ -557,12 +774,54 @@ with tabs[0]:
         )
         st.plotly_chart(fig_pie, use_container_width=True)
 
+    with st.expander("📋 Tableau annuel détaillé"):
+        st.dataframe(projection_credit.vers_dataframe().set_index("Année").style.format("{:,.0f}")
+                     .format({"Déflateur": "{:.3f}"}), use_container_width=True)
+
+    if lots_edites is not None:
+        # Building schedule broken down by lot (one array row per lot)
+        with st.expander(f"🏢 Détail par lot ({len(lots_edites)} lots)"):
+            detail_lots = echeancier_lots(lots_edites, projection_credit.n_annees, indexation_loyer,
+                                          indexation_charges)
+            contribution_an1 = detail_lots["Contribution"][:, 0]
+            st.dataframe(lots_edites.assign(**{
+                "Loyer perçu an 1 (€)": detail_lots["Loyer Effectif"][:, 0],
+                "Contribution an 1 (€)": contribution_an1,
+                "Part du loyer perçu (%)": detail_lots["Loyer Effectif"][:, 0]
+                                           / detail_lots["Loyer Effectif"][:, 0].sum() * 100,
+            }).style.format(precision=0).format({"Vacance (mois/an)": "{:.2f}", "Part du loyer perçu (%)": "{:.1f}"}),
+                use_container_width=True, hide_index=True)
+            fig_lots = go.Figure([
+                go.Bar(x=projection_credit["Année"], y=loyers_lot, name=nom_lot,
+                       hovertemplate=f"{nom_lot} : %{{y:,.0f}} €<extra></extra>")
+                for nom_lot, loyers_lot in zip(lots_edites["Lot"], detail_lots["Loyer Effectif"])
+            ])
+            fig_lots.update_layout(
+                title="Loyers perçus par lot (€ courants)",
+                barmode="stack", xaxis_title="Année", yaxis_title="€",
+                **PLOTLY_LAYOUT,
+            )
+            st.plotly_chart(fig_lots, use_container_width=True)
+
+    # Export comptable, produit au clic à partir d'une copie des entrées du modèle
+    from importlib.util import find_spec
+    from moteur.export import export_octets
+    from moteur.scenario import DEFAUTS
+    parametres_export = {**DEFAUTS, **etat.entrees, "nom": "Scénario", "salaire_net": salaire_net}
+    format_export = "xlsx" if find_spec("openpyxl") else "zip"
+    st.download_button(
+        "📥 Export comptable (échéancier mensuel, fiscalité par régime, indicateurs)",
+        data=lambda: export_octets(parametres_export, format_export),
+        file_name=f"investissement_locatif.{format_export}",
+        help="Classeur XLSX (ou archive de CSV si openpyxl n'est pas installé)",
+    )
+
     # Waterfall chart
     st.markdown("#### 🔍 Cascade du Cash-flow Mensuel (Année 1)")
     loyer_m = loyer_effectif_an / 12
     mensualite_tot = mensualite + assurance_emprunt_mensuel
     charges_m = charges_totales_an / 12
-    impots_m = max(0, df.iloc[0]["Impôts"] - df.iloc[0]["Gain Fiscal"]) / 12
+    impots_m = max(0, impots_nets_an1) / 12
 
     fig_wf = go.Figure(go.Waterfall(
         name="Cash-flow",
@@ -586,11 +845,48 @@ with tabs[0]:
     )
     st.plotly_chart(fig_wf, use_container_width=True)
 
+    # Exit-year sweep
+    st.markdown("#### 🏁 Quand revendre ? TRI selon l'année de sortie")
+    df_revente = etat["df_revente"]
+    annee_tri_max = int(df_revente["TRI (%)"].idxmax()) if df_revente["TRI (%)"].notna().any() else None
+
+    fig_sortie = go.Figure()
+    fig_sortie.add_trace(go.Bar(
+        x=df_revente.index, y=df_revente["TRI (%)"], name="TRI (%)",
+        marker_color=["#b794f4" if a == annee_tri_max else "#63b3ed" for a in df_revente.index],
+        hovertemplate="Sortie année %{x}<br>TRI: %{y:.1f} %<extra></extra>",
+    ))
+    fig_sortie.add_trace(go.Scatter(
+        x=df_revente.index, y=df_revente["Multiple"], name="Multiple du capital",
+        yaxis="y2", line=dict(color="#f6ad55", width=3),
+        hovertemplate="Sortie année %{x}<br>Multiple: %{y:.2f}x<extra></extra>",
+    ))
+    fig_sortie.update_layout(
+        title="TRI et multiple du capital investi selon l'année de revente",
+        xaxis_title="Année de revente", yaxis_title="TRI (%)",
+        yaxis2=dict(title="Multiple (x)", overlaying="y", side="right", showgrid=False),
+        **PLOTLY_LAYOUT,
+        legend=dict(x=0.7, y=0.95),
+    )
+    fig_sortie.add_vline(x=projection_credit.n_annees, line_dash="dot", line_color="rgba(255,255,255,0.3)",
+                         annotation_text="Fin du crédit")
+    st.plotly_chart(fig_sortie, use_container_width=True)
+
+    if annee_tri_max is not None:
+        ligne = df_revente.loc[annee_tri_max]
+        st.caption(f"TRI maximal en revendant l'année {annee_tri_max} : {ligne['TRI (%)']:.1f} % "
+                   f"(impôt de plus-value {ligne['Impôt Plus-value']:,.0f} €, "
+                   f"produit net {ligne['Produit Net']:,.0f} €). "
+                   f"Revalorisation du bien : {indexation_valeur:+.2f} %/an (sidebar).")
+    with st.expander("Détail par année de revente"):
+        st.dataframe(df_revente.style.format("{:,.0f}").format({"Multiple": "{:.2f}x", "TRI (%)": "{:.1f}"}),
+                     use_container_width=True)
+
 
 # ═══════════════════════════════════════════════════════════════
 # TAB 2 — RENDEMENT ENTREPRENEURIAL
 # ═══════════════════════════════════════════════════════════════
-with tabs[1]:
+def onglet_entrepreneurial():
     st.markdown("## Rendement Entrepreneurial (Chapitre B.2)")
     concept_box(
         "Rendement = Capital + Entrepreneurial (Piketty / Delagrandanne)",
@@ -606,10 +902,14 @@ with tabs[1]:
 
     with col1:
         st.markdown("#### Sources de rendement entrepreneurial")
-        gain_travaux = st.number_input("Gain travaux (plus-value créée - coût) (€)", 0, 100_000, 5_000, step=500)
-        gain_reconfig = st.number_input("Gain reconfiguration (ex: T1→T2) (€/an loyer sup.)", 0, 12_000, 1_200, step=100)
-        gain_fiscal_an = st.number_input("Gain fiscal annuel estimé (€)", 0, 20_000, 1_500, step=100)
-        gain_equipement = st.number_input("Gain équipements (€/an loyer sup.)", 0, 6_000, 600, step=50)
+        gain_travaux = st.number_input("Gain travaux (plus-value créée - coût) (€)", 0, 100_000, 5_000, step=500,
+                                       key="gain_travaux", persist_state="page")
+        gain_reconfig = st.number_input("Gain reconfiguration (ex: T1→T2) (€/an loyer sup.)", 0, 12_000, 1_200, step=100,
+                                        key="gain_reconfig", persist_state="page")
+        gain_fiscal_an = st.number_input("Gain fiscal annuel estimé (€)", 0, 20_000, 1_500, step=100,
+                                         key="gain_fiscal_an", persist_state="page")
+        gain_equipement = st.number_input("Gain équipements (€/an loyer sup.)", 0, 6_000, 600, step=50,
+                                          key="gain_equipement", persist_state="page")
 
     with col2:
         total_gain_an = gain_reconfig + gain_fiscal_an + gain_equipement
@@ -623,25 +923,80 @@ with tabs[1]:
         metric_card("Rendement Total Estimé", f"{rdt_total:.2f} %",
                      "Capital + Entrepreneurial", "" if rdt_total >= 8 else "negative")
 
-    # ROI equipment chart
+    # Equipment catalog: payback, NPV and IRR of every item, best set within a budget
     st.markdown("### ⏱️ Temps de Retour sur Équipements (Exemples vécus)")
-    equip_data = pd.DataFrame({
-        "Équipement": ["Cuisine équipée", "Lave-linge", "Parquet PVC", "Meuble sous-vasque",
-                        "Peinture neuve", "Double vitrage"],
-        "Coût (€)": [1000, 270, 600, 250, 800, 2500],
-        "Loyer sup. (€/mois)": [50, 30, 15, 10, 20, 15],
-    })
-    equip_data["Retour (mois)"] = equip_data["Coût (€)"] / equip_data["Loyer sup. (€/mois)"]
+    fichier_equipements = st.file_uploader(
+        "Catalogue d'équipements (CSV)", type="csv", key="fichier_equipements",
+        help="Colonnes « Équipement », « Coût (€) », « Loyer sup. (€/mois) », « Durée de vie (ans) », "
+             "« Amortissement (ans) »",
+    )
+    try:
+        catalogue = (normaliser_catalogue(pd.read_csv(fichier_equipements, sep=None, engine="python",
+                                                      encoding="utf-8-sig"))
+                     if fichier_equipements is not None else catalogue_disponible())
+    except (ValueError, pd.errors.ParserError) as exc:
+        st.error(f"Catalogue illisible : {exc}")
+        catalogue = CATALOGUE_EXEMPLE
+    with st.expander(f"📦 Catalogue ({len(catalogue)} équipements)"):
+        catalogue = normaliser_catalogue(st.data_editor(
+            catalogue, num_rows="dynamic", hide_index=True, key="catalogue_equipements",
+            column_config={
+                "Coût (€)": st.column_config.NumberColumn(min_value=0, step=10),
+                "Loyer sup. (€/mois)": st.column_config.NumberColumn(min_value=0, step=5),
+                "Durée de vie (ans)": st.column_config.NumberColumn(min_value=1, max_value=50, step=1),
+                "Amortissement (ans)": st.column_config.NumberColumn(min_value=1, max_value=50, step=1,
+                                                                     help="LMNP réel"),
+            },
+        ))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        budget_equipements = st.number_input("Budget équipements (€)", 0, 500_000, 3_000, step=250,
+                                             key="budget_equipements", persist_state="page")
+    with col2:
+        # Discount rate of the DCF tool (its default until it has been opened)
+        taux_equipements = st.session_state.get("taux_actualisation", 8.0)
+        st.caption(f"VAN actualisée à {taux_equipements:.1f} % (taux de l'onglet Outils DCF), après impôts "
+                   f"au régime « {regime_fiscal} » : TMI {tmi:.0f} % + prélèvements sociaux "
+                   f"{prelevement_sociaux:.1f} %, loyers indexés de {indexation_loyer:.1f} %/an.")
+
+    # Every item is evaluated once per scenario; a new budget only re-runs the selection
+    equip_data = cache.obtenir(
+        ("equipements", pd.util.hash_pandas_object(catalogue).sum(), taux_equipements, regime_fiscal, tmi,
+         prelevement_sociaux, indexation_loyer, etat["abattement_cosse"]),
+        lambda: evaluer_equipements(catalogue, taux_equipements, code_regime(regime_fiscal),
+                                    tmi + prelevement_sociaux, indexation_loyer=indexation_loyer,
+                                    abattement_cosse=etat["abattement_cosse"]),
+    )
+    selection_equip = meilleure_selection(equip_data, budget_equipements)
+    equip_data = equip_data.assign(Retenu=selection_equip.retenus).sort_values("VAN (€)", ascending=False)
+    retenus = equip_data[equip_data["Retenu"]]
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metric_card("Budget engagé", f"{retenus['Coût (€)'].sum():,.0f} €",
+                     f"{len(retenus)} équipements sur {len(equip_data)}", "neutral")
+    with col2:
+        metric_card("VAN de la sélection", f"{selection_equip.valeur:+,.0f} €",
+                     "Optimum sous le budget" if selection_equip.optimale else "Meilleure sélection trouvée")
+    with col3:
+        metric_card("Loyer supplémentaire", f"+{retenus['Loyer sup. (€/mois)'].sum():,.0f} €/mois",
+                     f"Retour moyen {retenus['Coût (€)'].sum() / max(retenus['Loyer sup. (€/mois)'].sum(), 1):.0f} "
+                     "mois avant impôts", "neutral")
 
+    affiches = equip_data.head(30)  # meilleures VAN d'abord
     fig_equip = go.Figure(go.Bar(
-        x=equip_data["Équipement"],
-        y=equip_data["Retour (mois)"],
-        marker_color=["#48bb78" if v < 24 else "#f6ad55" for v in equip_data["Retour (mois)"]],
-        text=[f'{v:.0f} mois' for v in equip_data["Retour (mois)"]],
+        x=affiches["Équipement"],
+        y=affiches["Retour net d'impôt (mois)"],
+        marker_color=["#48bb78" if retenu else "#f6ad55" for retenu in affiches["Retenu"]],
+        text=[f'{v:.0f} mois' if np.isfinite(v) else "—" for v in affiches["Retour net d'impôt (mois)"]],
         textposition="outside",
+        customdata=np.column_stack([affiches["Retour (mois)"], affiches["VAN (€)"], affiches["TRI (%)"]]),
+        hovertemplate="%{x}<br>Retour %{y:.0f} mois après impôts (%{customdata[0]:.0f} avant)"
+                      "<br>VAN %{customdata[1]:+,.0f} € — TRI %{customdata[2]:.1f} %<extra></extra>",
     ))
     fig_equip.update_layout(
-        title="Temps de retour sur investissement par équipement",
+        title="Temps de retour après impôts par équipement (en vert : sélection sous le budget)",
         yaxis_title="Mois",
         **PLOTLY_LAYOUT,
     )
@@ -649,6 +1004,11 @@ with tabs[1]:
                          annotation_text="Seuil 2 ans", annotation_position="top right")
     st.plotly_chart(fig_equip, use_container_width=True)
 
+    with st.expander("📋 Classement complet (par VAN)"):
+        st.dataframe(equip_data.set_index("Équipement").style.format(precision=0).format(
+            {"Retour (mois)": "{:.1f}", "Retour net d'impôt (mois)": "{:.1f}", "TRI (%)": "{:.1f}",
+             "VAN / € investi": "{:.2f}"}, na_rep="—"), use_container_width=True)
+
     strategy_box("Les 4 styles gagnants de rendement entrepreneurial", """
     <b>1. Travaux dans grandes agglos</b> — Acheter décoté, rénover, LMNP → rendement brut 8-10%<br>
     <b>2. Fort rendement zone rurale</b> — Immeubles de rapport, 12-15% brut, gestion active<br>
@@ -660,7 +1020,9 @@ with tabs[1]:
 # ═══════════════════════════════════════════════════════════════
 # TAB 3 — FINANCEMENT & LEVIER
 # ═══════════════════════════════════════════════════════════════
-with tabs[2]:
+def onglet_financement():
+    from moteur.taches import tache_courante
+
     st.markdown("## Financement & Effet de Levier (Chapitres A.3, C.3)")
 
     concept_box(
@@ -683,6 +1045,22 @@ with tabs[2]:
 
     st.markdown("---")
 
+    if financement_composite and len(lignes_credit) > 1:
+        st.markdown("### 🧩 Échéancier du Financement Composite")
+        fig_lignes = go.Figure()
+        mois_echeancier = np.arange(1, echeancier["par_ligne"].shape[1] + 1)
+        for nom, versements in zip(lignes_editees["Ligne"], echeancier["par_ligne"]):
+            fig_lignes.add_trace(go.Scatter(
+                x=mois_echeancier, y=versements, name=str(nom), stackgroup="lignes",
+                hovertemplate="Mois %{x}<br>%{y:,.0f} €<extra></extra>",
+            ))
+        fig_lignes.update_layout(
+            title=f"Mensualités par ligne — {montant_emprunt:,.0f} € empruntés",
+            xaxis_title="Mois", yaxis_title="€ / mois",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_lignes, use_container_width=True)
+
     # Durée optimale du crédit
     st.markdown("### 📏 Impact de la Durée du Crédit sur le Cash-flow")
     warning_box("Oubliez les méthodes de papa ! (Chapitre C.3)",
@@ -721,7 +1099,6 @@ with tabs[2]:
 
     # Taux d'endettement — 2 méthodes
     st.markdown("### 🏦 Deux méthodes de calcul du taux d'endettement")
-    salaire_net = st.number_input("Salaire net mensuel (€)", 500, 50_000, 2_500, step=100)
 
     col1, col2 = st.columns(2)
     loyer_70 = loyer_mensuel_cc * 0.70  # banques retiennent 70%
@@ -752,19 +1129,249 @@ with tabs[2]:
         metric_card("Coût réel — Résidence Principale", f"{taux_emprunt:.2f} %", "Taux nominal")
     with col2:
         metric_card("Coût réel — Investissement Locatif", f"{taux_fictif:.2f} %",
-                     f"Après déduction fiscale (TMI {tmi}% + PS {prelevement_sociaux}%)")
+                     f"Après déduction fiscale (TMI {tmi:.0f}% + PS {prelevement_sociaux}%)")
+
+    # Variable-rate loan over many index paths
+    st.markdown("### 📉 Prêt à Taux Variable Capé — Scénarios de Taux")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        indice_initial = st.slider("Indice initial (Euribor 12 mois, %)", -0.5, 5.0, 2.5, 0.1,
+                                   key="indice_initial", persist_state="page")
+        marge_variable = st.slider("Marge bancaire (%)", 0.0, 3.0, 1.2, 0.05,
+                                   key="marge_variable", persist_state="page")
+    with col2:
+        cap_variable = st.slider("Cap ± autour du taux initial (pts)", 0.5, 3.0, 1.0, 0.5,
+                                 key="cap_variable", persist_state="page")
+        volatilite_indice = st.slider("Volatilité annuelle de l'indice (pts)", 0.0, 2.0, 0.6, 0.1,
+                                      key="volatilite_indice", persist_state="page")
+    with col3:
+        nb_chemins = st.select_slider("Nombre de chemins de taux", [1_000, 2_000, 5_000, 10_000, 50_000, 100_000, 200_000],
+                                      value=10_000, help="Au-delà de 10 000 : calcul en arrière-plan, annulable",
+                                      key="nb_chemins", persist_state="page")
+        serie_historique = st.file_uploader("Série historique d'indice (CSV, % annuel)", type="csv",
+                                            help="Une valeur par ligne (dernière colonne) — toutes les fenêtres glissantes sont évaluées")
+
+    taux_initial_variable = indice_initial + marge_variable
+    plancher_variable = taux_initial_variable - cap_variable
+    plafond_variable = taux_initial_variable + cap_variable
+
+    def afficher_taux_variable(mensualites_var, complet=True):
+        cf_var = loyer_effectif_an / 12 - mensualites_var - charges_totales_an / 12
+        p5, p50, p95 = np.percentile(mensualites_var, [5, 50, 95], axis=0)
+        annees_var = np.arange(1, mensualites_var.shape[1] + 1)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            metric_card("Mensualité initiale", f"{mensualites_var[0, 0]:,.0f} €",
+                        f"Taux initial {taux_initial_variable:.2f} % (fixe : {mensualite + assurance_emprunt_mensuel:,.0f} €)",
+                        "neutral")
+        with col2:
+            pire = np.percentile(mensualites_var.max(axis=1), 95)
+            metric_card("Mensualité max. (P95)", f"{pire:,.0f} €",
+                        f"Plafond du cap : {plafond_variable:.2f} %", "negative" if pire > mensualites_var[0, 0] else "")
+        with col3:
+            proba_cf_negatif = (cf_var.min(axis=1) < 0).mean() * 100
+            metric_card("Chemins avec cash-flow négatif", f"{proba_cf_negatif:.0f} %",
+                        f"Au moins une année — {len(mensualites_var):,} chemins évalués"
+                        + ("" if complet else " (résultat partiel)"),
+                        "negative" if proba_cf_negatif > 0 else "")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            fig_var = go.Figure()
+            fig_var.add_trace(go.Scatter(x=annees_var, y=p95, line=dict(width=0), showlegend=False, hoverinfo="skip"))
+            fig_var.add_trace(go.Scatter(x=annees_var, y=p5, fill="tonexty", fillcolor="rgba(99,179,237,0.2)",
+                                         line=dict(width=0), name="P5 – P95"))
+            fig_var.add_trace(go.Scatter(x=annees_var, y=p50, line=dict(color="#63b3ed", width=3), name="Médiane"))
+            fig_var.add_hline(y=mensualite + assurance_emprunt_mensuel, line_dash="dash", line_color="#48bb78",
+                              annotation_text=f"Taux fixe {taux_emprunt:.2f} %")
+            fig_var.update_layout(
+                title="Distribution de la mensualité par année",
+                xaxis_title="Année", yaxis_title="€ / mois",
+                **PLOTLY_LAYOUT,
+            )
+            st.plotly_chart(fig_var, use_container_width=True)
+        with col2:
+            fig_cf_var = go.Figure(go.Histogram(
+                x=cf_var.mean(axis=1), nbinsx=40, marker_color="#b794f4",
+                hovertemplate="Cash-flow moyen %{x:,.0f} €<br>%{y} chemins<extra></extra>",
+            ))
+            fig_cf_var.add_vline(x=0, line_dash="dash", line_color="rgba(255,255,255,0.3)")
+            fig_cf_var.update_layout(
+                title="Cash-flow mensuel moyen (avant impôts) sur la durée du crédit",
+                xaxis_title="€ / mois", yaxis_title="Chemins",
+                **PLOTLY_LAYOUT,
+            )
+            st.plotly_chart(fig_cf_var, use_container_width=True)
+
+    def mensualites_bloc(graine, n_chemins, n_annees, indice, volatilite, montant, n_mois, marge, plancher,
+                         plafond, assurance):
+        chemins_bloc = simuler_chemins_indice(n_chemins, n_annees, indice, volatilite=volatilite, graine=graine)
+        return echeancier_variable(montant, n_mois, chemins_bloc, marge, plancher=plancher,
+                                   plafond=plafond)["mensualite"] + assurance
+
+    parametres_variable = (duree_credit, indice_initial, volatilite_indice, montant_emprunt, nb_mois,
+                           marge_variable, plancher_variable, plafond_variable, assurance_emprunt_mensuel)
+    if serie_historique is None and nb_chemins > TAILLE_BLOC_CHEMINS:
+        # Simulation étendue : blocs de chemins calculés en arrière-plan, affichés au fil de l'eau
+        graines_blocs = range(42, 42 + nb_chemins // TAILLE_BLOC_CHEMINS)
+
+        def bloc_variable(graine):
+            return mensualites_bloc(graine, TAILLE_BLOC_CHEMINS, *parametres_variable)
+
+        tache_variable = tache_courante(cache, "taux_variable",
+                                        (nb_chemins, *parametres_variable), bloc_variable, graines_blocs)
+        suivi_periodique = not tache_variable.terminee
+
+        @st.fragment(run_every=0.5 if suivi_periodique else None)
+        def suivi_taux_variable():
+            tache = tache_variable
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                if tache.erreur is not None:
+                    st.error(f"Simulation interrompue : {tache.erreur}")
+                elif tache.annulee:
+                    st.warning(f"Simulation annulée — {tache.progression:.0%} des chemins évalués")
+                else:
+                    st.progress(tache.progression, text=f"Simulation en arrière-plan : {tache.progression:.0%}")
+            with col2:
+                if not tache.terminee:
+                    if st.button("⏹️ Annuler", key="annuler_taux_variable"):
+                        tache.annuler()
+                elif tache.annulee and st.button("🔄 Relancer", key="relancer_taux_variable"):
+                    tache_courante(cache, "taux_variable", tache.cle, bloc_variable,
+                                   graines_blocs, relancer=True)
+                    st.rerun()
+
+            partiels = tache.partiels()
+            if partiels:
+                afficher_taux_variable(np.concatenate(partiels), complet=len(partiels) == tache.total)
+            if suivi_periodique and tache.terminee:
+                st.rerun()  # fin du suivi périodique
+
+        suivi_taux_variable()
+    elif serie_historique is None:
+        # Gardé en cache de session tant que les paramètres du prêt variable ne changent pas
+        afficher_taux_variable(cache.obtenir(("mensualites_variables", nb_chemins, *parametres_variable),
+                                             lambda: mensualites_bloc(42, nb_chemins, *parametres_variable)))
+    else:
+        serie = pd.read_csv(serie_historique).iloc[:, -1].to_numpy(dtype=float)
+        try:
+            chemins = chemins_historiques(serie, duree_credit)
+            chemins = chemins - chemins[:, :1] + indice_initial  # recalés sur l'indice actuel
+        except ValueError as exc:
+            st.error(str(exc))
+            chemins = np.full((1, duree_credit), indice_initial)
+        variable = echeancier_variable(
+            montant_emprunt, nb_mois, chemins, marge_variable,
+            plancher=plancher_variable, plafond=plafond_variable,
+        )
+        afficher_taux_variable(variable["mensualite"] + assurance_emprunt_mensuel)
+
+    # Early repayment / renegotiation grid, on one amortizing line (past its deferral)
+    st.markdown("### 🔁 Remboursement Anticipé & Renégociation")
+    composite = financement_composite and lignes_editees is not None and len(lignes_editees) > 0
+    noms_lignes = [str(nom) for nom in lignes_editees["Ligne"]] if composite else ["Prêt à taux fixe"]
+    renegociables = [k for k, ligne in enumerate(lignes_credit) if ligne.nature == "amortissable"
+                     and ligne.duree_mois - min(ligne.differe_mois, ligne.duree_mois - 1) > 12]
+    if not renegociables:
+        st.warning("Aucune ligne amortissable à renégocier : la grille ne modélise ni les tranches in fine "
+                   "ni les prêts à paliers.")
+        return
+    k = renegociables[0]
+    if len(renegociables) > 1:
+        k = st.selectbox("Ligne renégociée", renegociables, format_func=lambda i: noms_lignes[i],
+                         key="ligne_renegociee", persist_state="page")
+    ligne = lignes_credit[k]
+    differe = min(ligne.differe_mois, ligne.duree_mois - 1)
+    capital_amorti = ligne.montant * (1 + ligne.taux / 1200) ** differe if ligne.differe_total else ligne.montant
+    duree_amortie = ligne.duree_mois - differe
+    if composite:
+        st.caption(f"« {noms_lignes[k]} » : {capital_amorti:,.0f} € amortis à {ligne.taux:.2f} % sur "
+                   f"{duree_amortie} mois après {differe} mois de différé — les autres lignes restent inchangées.")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        montant_anticipe = st.slider("Montant remboursé (€)", 0, int(max(montant_emprunt, 1_000)), 0,
+                                     step=1_000, help="Coupe de la carte « gain net »",
+                                     key="montant_anticipe", persist_state="page")
+    with col2:
+        nouveau_taux_choisi = st.slider("Nouveau taux (%)", 0.5, 6.0, float(max(0.5, taux_emprunt - 0.5)), 0.1,
+                                        help="Coupe de la carte « mois d'équilibre »",
+                                        key="nouveau_taux_choisi", persist_state="page")
+    with col3:
+        frais_renegociation = st.number_input("Frais de rachat (dossier + garantie) (€)", 0, 20_000, 1_500, step=100,
+                                              key="frais_renegociation", persist_state="page")
+
+    mois_grille = np.arange(12, ligne.duree_mois, 12)
+    mois_grille = mois_grille[mois_grille > differe]  # opérations après le différé
+    montants_grille = np.linspace(0, capital_amorti, 21)
+    taux_grille_reneg = np.round(np.arange(0.5, 6.01, 0.1), 2)
+    grille = cache.obtenir(
+        ("renegociation", capital_amorti, ligne.taux, duree_amortie, differe, montant_anticipe, nouveau_taux_choisi,
+         frais_renegociation),
+        lambda: grille_remboursement_anticipe(
+            capital_amorti, ligne.taux, duree_amortie, mois_grille - differe,
+            np.append(montants_grille, montant_anticipe), np.append(taux_grille_reneg, nouveau_taux_choisi),
+            frais_renegociation,
+        ),
+    )
+    # Dernière colonne de montants / taux = valeur choisie au curseur
+    gain_net_carte = grille["gain_net"][:, -1, :-1]
+    equilibre_carte = grille["mois_equilibre"][:, :-1, -1]
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_reneg = go.Figure(go.Heatmap(
+            x=taux_grille_reneg, y=mois_grille // 12, z=gain_net_carte,
+            colorscale="RdYlGn", zmid=0, colorbar=dict(title="€"),
+            hovertemplate="Année %{y} · nouveau taux %{x:.1f} %<br>Gain net: %{z:,.0f} €<extra></extra>",
+        ))
+        fig_reneg.add_vline(x=ligne.taux, line_dash="dash", line_color="#000000")
+        fig_reneg.update_layout(
+            title=f"Gain net (intérêts économisés - IRA - frais) — {montant_anticipe:,.0f} € remboursés",
+            xaxis_title="Nouveau taux (%)", yaxis_title="Année de l'opération",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_reneg, use_container_width=True)
+    with col2:
+        fig_equilibre = go.Figure(go.Heatmap(
+            x=montants_grille, y=mois_grille // 12, z=equilibre_carte,
+            colorscale="Viridis_r", colorbar=dict(title="Mois"),
+            hovertemplate="Année %{y} · %{x:,.0f} € remboursés<br>Équilibre: %{z:.0f} mois<extra></extra>",
+        ))
+        fig_equilibre.update_layout(
+            title=f"Mois d'équilibre (apport + frais récupérés) — taux {nouveau_taux_choisi:.1f} %",
+            xaxis_title="Montant remboursé (€)", yaxis_title="Année de l'opération",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_equilibre, use_container_width=True)
+
+    cellule = {cle: valeurs[0, -1, -1] for cle, valeurs in grille.items()}
+    annee_operation = mois_grille[0] // 12
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metric_card(f"Intérêts économisés (an {annee_operation})", f"{cellule['interets_economises']:,.0f} €",
+                    f"IRA {cellule['ira']:,.0f} € · frais {cellule['frais']:,.0f} €", "neutral")
+    with col2:
+        css = "" if cellule["variation_mensualite"] >= 0 else "negative"
+        metric_card("Variation du cash-flow", f"{cellule['variation_mensualite']:+,.0f} €/mois",
+                    "Baisse de la mensualité après l'opération", css)
+    with col3:
+        equilibre_txt = "Jamais" if np.isnan(cellule["mois_equilibre"]) else f"{cellule['mois_equilibre']:.0f} mois"
+        metric_card("Point d'équilibre", equilibre_txt, f"Opération réalisée à la fin de l'année {annee_operation}")
 
 
 # ═══════════════════════════════════════════════════════════════
 # TAB 4 — FISCALITÉ
 # ═══════════════════════════════════════════════════════════════
-with tabs[3]:
+def onglet_fiscalite():
     st.markdown("## Optimisation Fiscale (Chapitre D.5)")
 
     concept_box(
         "3 voies pour adoucir la fiscalité",
         "<b>1.</b> Déficit foncier (travaux déductibles, plafond 10 700 €/an sur revenu global)<br>"
-        "<b>2.</b> Loi Cosse Ancien (abattement 15-85% selon zone et type, cumulable avec déficit foncier)<br>"
+        f"<b>2.</b> Loi Cosse Ancien (abattement 15-85% selon zone et type, cumulable avec déficit foncier) — "
+        f"ici zone {zone_abc}, convention {convention_cosse.lower()} : <b>{etat['abattement_cosse']:.0f} %</b><br>"
         "<b>3.</b> LMNP Réel Simplifié (amortissement comptable du bien → fiscalité quasi nulle)"
     )
 
@@ -772,13 +1379,7 @@ with tabs[3]:
 
     # Compare all regimes
     st.markdown("### 📊 Comparaison des régimes fiscaux (Année 1)")
-    regimes = {
-        "Micro-foncier": loyer_nu_an * 0.70 * (tmi / 100 + prelevement_sociaux / 100),
-        "Réel (Déf. Foncier)": max(0, (loyer_nu_an - (df.iloc[0]["Intérêts"] + taxe_fonciere + assurance_pno + charges_copro_an * 0.35))) * (tmi / 100 + prelevement_sociaux / 100),
-        "Réel + Cosse B2 Social": max(0, loyer_nu_an * 0.50 - (df.iloc[0]["Intérêts"] + taxe_fonciere + assurance_pno + charges_copro_an * 0.35)) * (tmi / 100 + prelevement_sociaux / 100),
-        "Micro-BIC (Meublé)": loyer_effectif_an * 0.50 * (tmi / 100 + prelevement_sociaux / 100),
-        "LMNP Réel": max(0, loyer_effectif_an - (df.iloc[0]["Intérêts"] + taxe_fonciere + assurance_pno + charges_copro_an * 0.35 + prix_achat * 0.90 / 30 + 3000 / 7)) * (tmi / 100 + prelevement_sociaux / 100),
-    }
+    regimes = etat["regimes"]
 
     fig_fisc = go.Figure(go.Bar(
         x=list(regimes.keys()),
@@ -820,16 +1421,18 @@ with tabs[3]:
     st.markdown("### 🔧 Simulateur Déficit Foncier")
     col1, col2 = st.columns(2)
     with col1:
-        montant_travaux_df = st.number_input("Montant des travaux déductibles (€)", 0, 100_000, 10_000, step=1_000)
-        revenus_fonciers_existants = st.number_input("Revenus fonciers préexistants (€/an)", 0, 50_000, 3_000, step=500)
+        montant_travaux_df = st.number_input("Montant des travaux déductibles (€)", 0, 100_000, 10_000, step=1_000,
+                                             key="montant_travaux_df", persist_state="page")
+        revenus_fonciers_existants = st.number_input("Revenus fonciers préexistants (€/an)", 0, 50_000, 3_000, step=500,
+                                                     key="revenus_fonciers_existants", persist_state="page")
     with col2:
         deficit = montant_travaux_df - loyer_nu_an - revenus_fonciers_existants
         if deficit > 0:
             imputation_foncier = min(loyer_nu_an + revenus_fonciers_existants, montant_travaux_df)
-            gain_foncier = imputation_foncier * (tmi / 100 + prelevement_sociaux / 100)
-            imputation_rg = min(deficit, 10_700)
-            gain_rg = imputation_rg * tmi / 100
-            report = max(0, deficit - 10_700)
+            gain_foncier = float(impots_location(imputation_foncier))
+            imputation_rg = min(deficit, PLAFOND_DEFICIT_FONCIER)
+            gain_rg = -float(impots_location(0, imputation_rg))
+            report = max(0, deficit - PLAFOND_DEFICIT_FONCIER)
             metric_card("Déficit Foncier Créé", f"{deficit:,.0f} €", "")
             metric_card("Gain Fiscal Total (Année N)", f"{gain_foncier + gain_rg:,.0f} €",
                          f"Sur fonciers: {gain_foncier:,.0f}€ + Sur revenu global: {gain_rg:,.0f}€")
@@ -843,7 +1446,7 @@ with tabs[3]:
 # ═══════════════════════════════════════════════════════════════
 # TAB 5 — TAUX DE SÉRÉNITÉ
 # ═══════════════════════════════════════════════════════════════
-with tabs[4]:
+def onglet_serenite():
     st.markdown("## Taux de Sérénité (Chapitre B.2)")
 
     concept_box(
@@ -855,32 +1458,17 @@ with tabs[4]:
 
     # Interactive serenity chart
     x_rdt = np.linspace(3, 18, 200)
-    # Serenity: starts high, linear drop, then accelerates
-    serenite = np.piecewise(x_rdt,
-        [x_rdt < 5, (x_rdt >= 5) & (x_rdt <= 10), x_rdt > 10],
-        [lambda x: 90 - (x - 3) * 2,
-         lambda x: 86 - (x - 5) * 6,
-         lambda x: 56 - (x - 10) * 8 - (x - 10) ** 1.5 * 2]
-    )
-    serenite = np.clip(serenite, 5, 95)
-
-    # Energy: starts low, linear, then exponential
-    energie = np.piecewise(x_rdt,
-        [x_rdt < 5, (x_rdt >= 5) & (x_rdt <= 10), x_rdt > 10],
-        [lambda x: 10 + (x - 3) * 3,
-         lambda x: 16 + (x - 5) * 8,
-         lambda x: 56 + (x - 10) * 12 + (x - 10) ** 2 * 3]
-    )
-    energie = np.clip(energie, 5, 100)
+    serenite_courbe = serenite(x_rdt)
+    energie_courbe = energie(x_rdt)
 
     fig_serenite = go.Figure()
     fig_serenite.add_trace(go.Scatter(
-        x=x_rdt, y=serenite, name="Taux de Sérénité",
+        x=x_rdt, y=serenite_courbe, name="Taux de Sérénité",
         line=dict(color="#48bb78", width=3),
         fill="tozeroy", fillcolor="rgba(72,187,120,0.1)"
     ))
     fig_serenite.add_trace(go.Scatter(
-        x=x_rdt, y=energie, name="Énergie à Déployer",
+        x=x_rdt, y=energie_courbe, name="Énergie à Déployer",
         line=dict(color="#fc8181", width=3),
         fill="tozeroy", fillcolor="rgba(252,129,129,0.1)"
     ))
@@ -910,12 +1498,7 @@ with tabs[4]:
 
     # Serenity by property type
     st.markdown("### 🏘️ Taux de sérénité par type de bien")
-    types = pd.DataFrame({
-        "Type": ["Maison T4+", "T3", "T2 centre-ville", "T1/Studio", "Colocation", "Immeuble rapport", "Meublé tourisme"],
-        "Rdt Brut Typique (%)": [5, 5.5, 7, 8, 10, 12, 14],
-        "Sérénité": [85, 75, 70, 55, 45, 35, 25],
-        "Turnover": ["Très faible", "Faible", "Moyen", "Élevé", "Élevé", "Variable", "Très élevé"],
-    })
+    types = TYPES_BIENS
     fig_types = go.Figure()
     fig_types.add_trace(go.Scatter(
         x=types["Rdt Brut Typique (%)"], y=types["Sérénité"],
@@ -933,11 +1516,59 @@ with tabs[4]:
     )
     st.plotly_chart(fig_types, use_container_width=True)
 
+    # Frontière de Pareto des biens candidats
+    st.markdown("### 🎯 Biens candidats : rendement net-net vs sérénité")
+    try:
+        candidats = biens_candidats()
+    except (ValueError, pd.errors.ParserError) as exc:
+        st.error(f"Liste de biens illisible : {exc}")
+        return
+    if fichier_candidats is None:
+        st.caption("Exemple : votre bien et un bien typique de chaque type au même prix — chargez votre liste "
+                   "dans la sidebar (« Biens candidats »).")
+    efficaces = candidats[candidats["Pareto"]].sort_values("Rendement Net-Net (%)")
+    concept_box(
+        "Les choix efficaces",
+        f"Sur <b>{len(candidats):,}</b> biens, <b>{len(efficaces)}</b> ne sont battus par aucun autre à la fois "
+        "en rendement net-net et en sérénité : c'est parmi eux qu'il faut choisir, selon l'énergie que vous "
+        "êtes prêt à déployer."
+    )
+
+    survol = ("%{text}<br>Net-Net : %{x:.2f} %<br>Sérénité : %{y:.0f} %<br>"
+              "Cash-flow : %{customdata:+,.0f} €/mois<extra></extra>")
+    fig_pareto = go.Figure()
+    domines = candidats[~candidats["Pareto"]]
+    fig_pareto.add_trace(go.Scattergl(
+        x=domines["Rendement Net-Net (%)"], y=domines["Sérénité"], mode="markers", name="Dominés",
+        text=domines["Bien"], customdata=domines["Cash-flow Mensuel"], hovertemplate=survol,
+        marker=dict(color="#a0aec0", size=6, opacity=0.5),
+    ))
+    fig_pareto.add_trace(go.Scatter(
+        x=efficaces["Rendement Net-Net (%)"], y=efficaces["Sérénité"], mode="lines+markers", name="Frontière",
+        text=efficaces["Bien"], customdata=efficaces["Cash-flow Mensuel"], hovertemplate=survol,
+        line=dict(color="#b794f4", width=2, shape="vh"), marker=dict(color="#b794f4", size=10),
+    ))
+    fig_pareto.update_layout(
+        title="Frontière de Pareto : rendement net-net vs sérénité",
+        xaxis_title="Rendement Net-Net (%)",
+        yaxis_title="Taux de Sérénité (%)",
+        **PLOTLY_LAYOUT,
+    )
+    st.plotly_chart(fig_pareto, use_container_width=True)
+    st.dataframe(
+        efficaces.drop(columns="Pareto").set_index("Bien").style.format(
+            {"Prix": "{:,.0f} €", "Loyer CC": "{:,.0f} €", "Rendement Brut (%)": "{:.2f}",
+             "Rendement Net-Net (%)": "{:.2f}", "Cash-flow Mensuel": "{:+,.0f} €", "Mensualité": "{:,.0f} €",
+             "Endettement NC (%)": "{:.1f}", "Endettement Comp. (%)": "{:.1f}", "Sérénité": "{:.0f}",
+             "Énergie": "{:.0f}"}),
+        use_container_width=True,
+    )
+
 
 # ═══════════════════════════════════════════════════════════════
 # TAB 6 — GESTION DES RISQUES
 # ═══════════════════════════════════════════════════════════════
-with tabs[5]:
+def onglet_risques():
     st.markdown("## Gestion des Risques (Chapitre B.3)")
 
     warning_box(
@@ -950,22 +1581,22 @@ with tabs[5]:
     st.markdown("### 🔬 Stress Test de votre investissement")
     col1, col2 = st.columns(2)
     with col1:
-        stress_vacance = st.slider("Vacance locative stress (mois/an)", 0.0, 6.0, 2.0, 0.5)
-        stress_loyer = st.slider("Baisse des loyers (%)", 0, 30, 10, 5)
-        stress_charges = st.slider("Hausse des charges (%)", 0, 50, 20, 5)
-        stress_impots = st.slider("Hausse fiscalité (%)", 0, 50, 0, 5)
+        stress_vacance = st.slider("Vacance locative stress (mois/an)", 0.0, 6.0, 2.0, 0.5,
+                                   key="stress_vacance", persist_state="page")
+        stress_loyer = st.slider("Baisse des loyers (%)", 0, 30, 10, 5, key="stress_loyer", persist_state="page")
+        stress_charges = st.slider("Hausse des charges (%)", 0, 50, 20, 5, key="stress_charges", persist_state="page")
+        stress_impots = st.slider("Hausse fiscalité (%)", 0, 50, 0, 5, key="stress_impots", persist_state="page")
 
     with col2:
-        loyer_stress = loyer_mensuel_cc * (1 - stress_loyer / 100) * (12 - stress_vacance)
-        charges_stress = charges_totales_an * (1 + stress_charges / 100)
-        impots_stress = max(0, df.iloc[0]["Impôts"]) * (1 + stress_impots / 100)
-        cf_stress = (loyer_stress - (mensualite + assurance_emprunt_mensuel) * 12 - charges_stress - impots_stress) / 12
+        etat.definir(stress_vacance=stress_vacance, stress_loyer=stress_loyer,
+                     stress_charges=stress_charges, stress_impots=stress_impots)
+        cf_stress = etat["cf_stress"]
 
         css = "" if cf_stress >= 0 else "negative"
         metric_card("Cash-flow Stressé", f"{cf_stress:+,.0f} €/mois",
                      "Après application de tous les stress", css)
 
-        rdt_stress = (loyer_stress / investissement_total) * 100
+        rdt_stress = etat["rdt_stress"]
         metric_card("Rendement Stressé", f"{rdt_stress:.2f} %", "Rendement brut après stress",
                      "" if rdt_stress > taux_emprunt else "negative")
 
@@ -975,6 +1606,100 @@ with tabs[5]:
             metric_card("Réserve nécessaire (2 ans)", f"{reserve_2ans:,.0f} €",
                          "Épargne de précaution recommandée", "negative")
 
+    # Tenant turnover — Markov chain over many paths, fed to the cash-flow projection
+    st.markdown("### 🔄 Rotation des Locataires — Vacance et Impayés Simulés")
+    col1, col2 = st.columns(2)
+    with col1:
+        if profil_rotation is None:
+            type_simule = st.selectbox("Profil de rotation", PROFILS_ROTATION["Type"],
+                                       index=list(PROFILS_ROTATION["Type"]).index(PROFIL_DEFAUT),
+                                       key="type_rotation", persist_state="page",
+                                       help="Pour l'appliquer au bien, choisissez « Rotation des locataires » "
+                                            "dans la sidebar")
+            profil_simule = ProfilRotation.du_type(type_simule)
+        else:
+            profil_simule = profil_rotation
+            st.caption("Profil et cycle de vie du locataire : ceux de la sidebar")
+    with col2:
+        nb_chemins_rotation = st.select_slider("Nombre de chemins", [1_000, 5_000, 10_000, 20_000, 50_000],
+                                               value=10_000, key="nb_chemins_rotation", persist_state="page")
+
+    def cashflows_rotation(chemins):
+        # Projection du bien sur chaque chemin : loyer plein × part perçue chaque année
+        return projection_annuelle(
+            duree_credit, code_regime(regime_fiscal), loyer_annuel_cc, charges_copro_an, taxe_fonciere,
+            assurance_pno, travaux * 0.02, prix_achat, etat["mensualites_an"], etat["interets_par_an"],
+            etat["capital_par_an"], etat["capital_restant_an"], assurance_emprunt_mensuel * 12,
+            revenus_foyer, parts_fiscales, imposition_commune, indexation_loyer, indexation_charges,
+            indexation_taxe, indexation_valeur, inflation, abattement_cosse=etat["abattement_cosse"],
+            taux_ps=prelevement_sociaux, occupation=chemins["mois_payes"] / 12, mobilier=mobilier,
+            dtype=np.float32,
+        )["Cash-flow Mensuel"]
+
+    def simulation_rotation():
+        chemins = simuler_rotation(profil_simule, nb_chemins_rotation, duree_credit, graine=42)
+        return {"perdus": (chemins["mois_vacants"] + chemins["mois_impayes"]).mean(axis=1),
+                "impayes": chemins["mois_impayes"].mean(axis=1),
+                "cashflow": cashflows_rotation(chemins)}
+
+    rotation = cache.obtenir(
+        ("rotation", profil_simule, nb_chemins_rotation, *fixes_surface.values(), loyer_mensuel_cc, prix_achat,
+         etat["mensualites_an"].tobytes(), etat["interets_par_an"].tobytes(), indexation_loyer,
+         indexation_charges, indexation_taxe),
+        simulation_rotation,
+    )
+    perdus, cf_chemins = rotation["perdus"], rotation["cashflow"]
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metric_card("Mois non perçus / an", f"{perdus.mean():.2f} mois",
+                     f"P95 : {np.percentile(perdus, 95):.2f} — dont impayés {rotation['impayes'].mean():.2f}",
+                     "neutral")
+    with col2:
+        cf_moyen = cf_chemins.mean(axis=1)
+        metric_card("Cash-flow mensuel moyen (P5)", f"{np.percentile(cf_moyen, 5):+,.0f} €",
+                     f"Médiane {np.median(cf_moyen):+,.0f} € sur {duree_credit} ans",
+                     "" if np.percentile(cf_moyen, 5) >= 0 else "negative")
+    with col3:
+        pire_annee = cf_chemins.min(axis=1)
+        metric_card("Pire année (P5)", f"{np.percentile(pire_annee, 5):+,.0f} €/mois",
+                     f"{len(cf_chemins):,} chemins simulés", "" if np.percentile(pire_annee, 5) >= 0 else "negative")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        # Tous les types à la fois, profils indicatifs : boîtes des mois non perçus par an
+        def comparaison_types():
+            chemins = simuler_rotation([ProfilRotation.du_type(t) for t in PROFILS_ROTATION["Type"]],
+                                       5_000, duree_credit, graine=7)
+            return np.percentile((chemins["mois_vacants"] + chemins["mois_impayes"]).mean(axis=2),
+                                 [5, 25, 50, 75, 95], axis=1)
+
+        q5, q25, q50, q75, q95 = cache.obtenir(("rotation_types", duree_credit), comparaison_types)
+        fig_rotation = go.Figure(go.Box(
+            x=PROFILS_ROTATION["Type"], q1=q25, median=q50, q3=q75, lowerfence=q5, upperfence=q95,
+            marker_color="#63b3ed", name="P5 – P95",
+        ))
+        fig_rotation.add_hline(y=vacance_loc_mois, line_dash="dash", line_color="#f6ad55",
+                               annotation_text=f"Hypothèse retenue : {vacance_loc_mois:.2f} mois/an")
+        fig_rotation.update_layout(
+            title="Mois non perçus par an selon le type de bien",
+            yaxis_title="Mois / an (vacance + impayés)",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_rotation, use_container_width=True)
+    with col2:
+        fig_cf_rotation = go.Figure(go.Histogram(
+            x=cf_moyen, nbinsx=40, marker_color="#b794f4",
+            hovertemplate="Cash-flow moyen %{x:,.0f} €<br>%{y} chemins<extra></extra>",
+        ))
+        fig_cf_rotation.add_vline(x=0, line_dash="dash", line_color="rgba(255,255,255,0.3)")
+        fig_cf_rotation.update_layout(
+            title="Cash-flow mensuel moyen (après impôts) par chemin",
+            xaxis_title="€ / mois", yaxis_title="Chemins",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_cf_rotation, use_container_width=True)
+
     # Plan B concept
     st.markdown("### 📋 Check-list Plan B")
     strategy_box("Toujours avoir un Plan B (Chapitre B.3)", """
@@ -986,44 +1711,102 @@ with tabs[5]:
     <b>✓ Gros travaux</b> → Budget supplémentaire de 15-20% prévu
     """)
 
-    # Seasonality
+    # Seasonality — from the loaded price-index series, or the indicative profile
     st.markdown("### 📅 Saisonnalité du Marché Immobilier (Chapitre A.3)")
-    mois = ["Jan", "Fév", "Mar", "Avr", "Mai", "Jun", "Jul", "Aoû", "Sep", "Oct", "Nov", "Déc"]
-    variation = [-0.2, -0.2, -0.2, 1.8, 1.8, 1.8, -0.2, -0.2, -0.2, -1.4, -1.4, -1.4]
-    colors_sais = ["#48bb78" if v < 0 else "#fc8181" for v in variation]
+    fichier_indice = st.file_uploader(
+        "Indice mensuel des prix (CSV)", type="csv", key="fichier_indice",
+        help="Colonne « mois » (AAAA-MM) puis une colonne par série (France, Lyon…), "
+             "ou colonnes « serie », « mois », « indice »",
+    )
+    series = {}
+    try:
+        if os.path.isdir(DOSSIER_INDICES):
+            series.update({nom: (DOSSIER_INDICES, serie) for nom, serie in indices_disponibles(DOSSIER_INDICES).items()})
+        if fichier_indice is not None:
+            series.update({f"{nom} (fichier chargé)": (fichier_indice.file_id, bornee(serie))
+                           for nom, serie in lire_indices(fichier_indice).items()})
+    except (ValueError, pd.errors.ParserError) as exc:
+        st.error(f"Indice illisible : {exc}")
+
+    analyse_indice = None
+    if series:
+        nom_serie = st.selectbox("Série de prix", list(series), key="serie_indice", persist_state="page")
+        source, serie = series[nom_serie]
+        analyse_indice = analyse(cache, source, nom_serie, serie)
+        variation = analyse_indice.saisonnalite()
+        st.caption(f"{nom_serie} : {len(serie)} mois, de {serie.index[0]} à {serie.index[-1]} — écart moyen de "
+                   "chaque mois à la tendance (moyenne mobile centrée 2×12).")
+        if np.isnan(variation).all():
+            st.info(f"{nom_serie} : au moins 13 mois sont nécessaires pour estimer la saisonnalité — "
+                    "profil indicatif affiché.")
+            variation = PROFIL_INDICATIF
+    else:
+        variation = PROFIL_INDICATIF
+        st.caption("Profil indicatif : aucune série de prix chargée (dossier "
+                   f"`{DOSSIER_INDICES}` ou fichier ci-dessus).")
+
+    mois_bas, mois_haut = int(np.nanargmin(variation)), int(np.nanargmax(variation))
+    ecart_saison = float(np.nanmax(variation) - np.nanmin(variation))
+    colors_sais = ["#a0aec0" if np.isnan(v) else "#48bb78" if v < 0 else "#fc8181" for v in variation]
 
     fig_sais = go.Figure(go.Bar(
-        x=mois, y=variation, marker_color=colors_sais,
-        text=[f"{v:+.1f}%" for v in variation], textposition="outside",
+        x=MOIS, y=variation, marker_color=colors_sais,
+        text=["—" if np.isnan(v) else f"{v:+.1f}%" for v in variation], textposition="outside",
     ))
     fig_sais.update_layout(
         title="Variation des prix selon la saison d'achat (vs moyenne annuelle)",
         yaxis_title="Variation (%)",
         **PLOTLY_LAYOUT,
     )
-    fig_sais.add_annotation(x="Nov", y=-1.8, text="🏆 Meilleur moment<br>pour acheter",
+    fig_sais.add_annotation(x=MOIS[mois_bas], y=variation[mois_bas] - 0.4, text="🏆 Meilleur moment<br>pour acheter",
                              showarrow=False, font=dict(color="#48bb78", size=11))
-    fig_sais.add_annotation(x="Mai", y=2.2, text="⚠️ Pire moment<br>pour acheter",
+    fig_sais.add_annotation(x=MOIS[mois_haut], y=variation[mois_haut] + 0.4, text="⚠️ Pire moment<br>pour acheter",
                              showarrow=False, font=dict(color="#fc8181", size=11))
     st.plotly_chart(fig_sais, use_container_width=True)
 
+    if analyse_indice is not None:
+        tableau_indice = analyse_indice.tableau()
+        fig_indice = go.Figure()
+        fig_indice.add_trace(go.Scatter(x=tableau_indice.index, y=tableau_indice["Indice"], name="Indice",
+                                        line=dict(color="#a0aec0", width=1)))
+        fig_indice.add_trace(go.Scatter(x=tableau_indice.index, y=tableau_indice["Tendance"], name="Tendance 2×12",
+                                        line=dict(color="#63b3ed", width=3)))
+        fig_indice.add_trace(go.Scatter(x=tableau_indice.index, y=tableau_indice["Glissement annuel (%)"],
+                                        name="Glissement annuel (%)", yaxis="y2",
+                                        line=dict(color="#f6ad55", width=2, dash="dot")))
+        fig_indice.update_layout(
+            title=f"{nom_serie} : indice, tendance et glissement annuel",
+            yaxis_title="Indice",
+            yaxis2=dict(title="%", overlaying="y", side="right", showgrid=False),
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_indice, use_container_width=True)
+
     col1, col2 = st.columns(2)
     with col1:
-        economies_saisonnieres = prix_achat * 0.032  # 3.2% spread
+        economies_saisonnieres = prix_achat * ecart_saison / 100
         metric_card("Économie potentielle (saisonnalité)",
                      f"{economies_saisonnieres:,.0f} €",
-                     f"Acheter en Q4 vs Printemps (3.2% de {prix_achat:,.0f}€)")
+                     f"Acheter en {MOIS[mois_bas]} plutôt qu'en {MOIS[mois_haut]} "
+                     f"({ecart_saison:.1f}% de {prix_achat:,.0f}€)")
     with col2:
-        eco_majoree = economies_saisonnieres * 1.20  # +20% frais
-        metric_card("Économie réelle (frais inclus)",
-                     f"{eco_majoree:,.0f} €",
-                     "Avec 20% de surcoûts (notaire, intérêts...)")
+        if analyse_indice is not None:
+            derniers = analyse_indice.tableau().dropna(subset=["Glissement annuel (%)"]).iloc[-1:]
+            glissement = float(derniers["Glissement annuel (%)"].iloc[0]) if len(derniers) else float("nan")
+            metric_card("Glissement annuel (dernier mois)", f"{glissement:+.1f} %",
+                         f"Tendance annualisée sur 12 mois : {analyse_indice.pente[-1]:+.1f} %",
+                         "" if glissement >= 0 else "negative")
+        else:
+            eco_majoree = economies_saisonnieres * 1.20  # +20% frais
+            metric_card("Économie réelle (frais inclus)",
+                         f"{eco_majoree:,.0f} €",
+                         "Avec 20% de surcoûts (notaire, intérêts...)")
 
 
 # ═══════════════════════════════════════════════════════════════
 # TAB 7 — STRATÉGIES D'INVESTISSEMENT
 # ═══════════════════════════════════════════════════════════════
-with tabs[6]:
+def onglet_strategies():
     st.markdown("## Stratégies d'Investissement (Chapitre E.2)")
 
     st.markdown("### 🗺️ Choix de la zone d'investissement")
@@ -1032,27 +1815,27 @@ with tabs[6]:
                 "Zone rurale → baisse. Avec des taux bas et des prix stables en zone B2, "
                 "le <b>différentiel rendement-taux</b> n'a jamais été aussi favorable !")
 
-    # Zone comparison
-    zones = pd.DataFrame({
-        "Zone": ["A/ABis (Paris)", "B1 (Métropoles)", "B2 (Villes moyennes)", "C (Rural)"],
-        "Rendement Brut Typique": [3, 5, 7.5, 12],
-        "Risque Vacance": [5, 15, 25, 45],
-        "Prix m² Moyen": [10000, 3500, 1800, 800],
-        "Sérénité": [80, 70, 65, 40],
-        "Cash-flow Possible": ["Très difficile", "Difficile", "Oui avec optimisation", "Oui, très positif"],
-    })
+    # Zone comparison — profils indicatifs, abattements Cosse et zone du bien
+    zones = PROFILS_ZONES.assign(**{f"Cosse {convention.lower()} (%)": ligne
+                                    for convention, ligne in zip(CONVENTIONS, ABATTEMENTS_COSSE)})
+    if zonage is not None:
+        zones["Communes"] = zonage.effectifs().to_numpy()
+    courante = zones["Zone"] == zone_abc
+    opacites = np.where(courante, 1.0, 0.45)
 
     fig_zones = go.Figure()
     fig_zones.add_trace(go.Bar(
         name="Rendement Brut (%)", x=zones["Zone"], y=zones["Rendement Brut Typique"],
-        marker_color="#48bb78", text=[f"{v}%" for v in zones["Rendement Brut Typique"]],
+        marker=dict(color="#48bb78", opacity=opacites), text=[f"{v}%" for v in zones["Rendement Brut Typique"]],
         textposition="outside",
     ))
     fig_zones.add_trace(go.Bar(
         name="Risque Vacance (%)", x=zones["Zone"], y=zones["Risque Vacance"],
-        marker_color="#fc8181", text=[f"{v}%" for v in zones["Risque Vacance"]],
+        marker=dict(color="#fc8181", opacity=opacites), text=[f"{v}%" for v in zones["Risque Vacance"]],
         textposition="outside",
     ))
+    fig_zones.add_annotation(x=zone_abc, y=float(zones.loc[courante, "Risque Vacance"].max()) + 6,
+                             text="📍 Votre bien", showarrow=False, font=dict(color="#63b3ed", size=11))
     fig_zones.update_layout(
         title="Rendement vs Risque par zone géographique",
         barmode="group",
@@ -1060,6 +1843,9 @@ with tabs[6]:
         **PLOTLY_LAYOUT,
     )
     st.plotly_chart(fig_zones, use_container_width=True)
+    st.dataframe(zones.style.apply(lambda ligne: ["background-color: rgba(99,179,237,0.15)" if courante[ligne.name]
+                                                  else "" for _ in ligne], axis=1),
+                 use_container_width=True, hide_index=True)
 
     strategy_box("Zone B2 = Sweet Spot (Chapitre C.1)",
                  "Meilleur compromis : prix raisonnables → rendements menant au cash-flow positif "
@@ -1093,6 +1879,148 @@ with tabs[6]:
     })
     st.dataframe(strategies, use_container_width=True, hide_index=True)
 
+    # Seasonal furnished rental — nights simulated day by day, rolled up into the annual projection
+    st.markdown("### 🏖️ Meublé de Tourisme — Simulation Nuit par Nuit")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        prix_nuit = st.number_input("Prix de la nuit (€, saison moyenne)", 20, 1_000, 80, step=5,
+                                    key="prix_nuit", persist_state="page")
+        majoration_weekend = st.slider("Majoration vendredi / samedi (%)", 0, 50, 15, 5,
+                                       key="majoration_weekend", persist_state="page")
+        sejour_moyen = st.slider("Séjour moyen (nuits)", 1.0, 14.0, 4.0, 0.5, key="sejour_moyen",
+                                 persist_state="page")
+    with col2:
+        menage_par_sejour = st.number_input("Ménage et linge par séjour (€)", 0, 300, 40, step=5,
+                                            key="menage_par_sejour", persist_state="page")
+        energie_nuit = st.number_input("Énergie et consommables par nuit (€)", 0, 100, 6, step=1,
+                                       key="energie_nuit", persist_state="page")
+        commission = st.slider("Commission plateforme / conciergerie (%)", 0, 30, 15, 1, key="commission",
+                               persist_state="page")
+    with col3:
+        regime_saisonnier = st.radio("Régime fiscal", ["Micro-BIC classé (abattement 50 %)",
+                                                       "Micro-BIC non classé (abattement 30 %)", "LMNP Réel"],
+                                     key="regime_saisonnier", persist_state="page")
+        volatilite_demande = st.slider("Volatilité de la demande (%/an)", 0, 40, 15, 5, key="volatilite_demande",
+                                       persist_state="page", help="Écart type du choc annuel d'occupation")
+        nb_scenarios_saison = st.select_slider("Nombre de scénarios", [200, 1_000, 5_000], value=1_000,
+                                               key="nb_scenarios_saison", persist_state="page")
+        annee_saison = st.number_input("Première année d'exploitation", 2000, 2100, pd.Timestamp.today().year,
+                                       key="annee_saison", persist_state="page",
+                                       help="Fixe le calendrier : vendredis et samedis de chaque année")
+
+    with st.expander("📅 Calendrier : prix et occupation par mois"):
+        profil_saison = st.data_editor(
+            PROFIL_SAISONNIER, hide_index=True, disabled=["Mois"], key="profil_saison",
+            column_config={
+                "Prix (×)": st.column_config.NumberColumn(min_value=0.1, max_value=5.0, step=0.05,
+                                                          help="Prix de la nuit relatif à la saison moyenne"),
+                "Occupation (%)": st.column_config.NumberColumn(min_value=0, max_value=100, step=5),
+            },
+        ).fillna({"Prix (×)": 1.0, "Occupation (%)": 0})
+
+    parametres_saison = Saisonnier(prix_nuit, majoration_weekend, sejour_moyen, menage_par_sejour, commission,
+                                   energie_nuit, volatilite_demande)
+    # Stress levels of the Risk tab (its defaults until it has been opened)
+    stress = {nom: st.session_state.get(nom, defaut) for nom, defaut in
+              (("stress_vacance", 2.0), ("stress_loyer", 10), ("stress_charges", 20))}
+
+    # Every input of the projection, all repeated in the cache key
+    entrees = (duree_credit, charges_copro_an, taxe_fonciere, assurance_pno, travaux, prix_achat,
+               assurance_emprunt_mensuel, revenus_foyer, parts_fiscales, imposition_commune, indexation_loyer,
+               indexation_charges, indexation_taxe, indexation_valeur, inflation, prelevement_sociaux, mobilier)
+    echeancier = [etat[nom] for nom in ("mensualites_an", "interets_par_an", "capital_par_an", "capital_restant_an")]
+
+    def simulation_saisonniere():
+        resultats = {}
+        for nom, hausse in (("base", 0), ("stress", stress["stress_charges"])):
+            choc = {"baisse_prix": stress["stress_loyer"], "baisse_occupation": stress["stress_vacance"] / 12 * 100,
+                    "hausse_charges": hausse} if nom == "stress" else {}
+            nuits = simuler_saisonnier(parametres_saison, profil_saison, duree_credit, nb_scenarios_saison,
+                                       annee_saison, indexation_loyer, graine=49, **choc)
+            # Nothing is recharged to a holiday guest: the owner bears all the copro charges
+            charges_copro = charges_copro_an * (1 + hausse / 100)
+            projection = projection_annuelle(
+                duree_credit, code_regime(regime_saisonnier), 0.0, charges_copro,
+                taxe_fonciere * (1 + hausse / 100), assurance_pno * (1 + hausse / 100), travaux * 0.02, prix_achat,
+                *echeancier, assurance_emprunt_mensuel * 12, revenus_foyer, parts_fiscales, imposition_commune,
+                indexation_loyer, indexation_charges, indexation_taxe, indexation_valeur, inflation,
+                taux_ps=prelevement_sociaux, mobilier=mobilier, recettes=nuits["recettes"],
+                charges_exploitation=nuits["charges_exploitation"] + charges_copro * PART_CHARGES_RECUPERABLES
+                * facteurs_indexation(indexation_charges, duree_credit),
+                abattement_micro_bic=30.0 if "non classé" in regime_saisonnier else 50.0, dtype=np.float32,
+            )
+            resultats[nom] = {"nuits": nuits["nuits"], "recettes_jour": nuits["recettes_jour"],
+                              "tableau": {nom_col: projection[nom_col].mean(axis=0) for nom_col in projection.keys()},
+                              "cashflow": projection["Cash-flow Mensuel"].mean(axis=1)}
+        return resultats
+
+    saison = cache.obtenir(
+        ("saisonnier", parametres_saison, regime_saisonnier, nb_scenarios_saison, annee_saison,
+         pd.util.hash_pandas_object(profil_saison).sum(), tuple(stress.values()), *entrees,
+         *(tableau.tobytes() for tableau in echeancier)),
+        simulation_saisonniere,
+    )
+    base, stresse = saison["base"], saison["stress"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        nuits_an1 = base["nuits"][:, 0]
+        metric_card("Nuits louées (année 1)", f"{nuits_an1.mean():.0f} nuits",
+                     f"Occupation {nuits_an1.mean() / 365:.0%} — P5 {np.percentile(nuits_an1, 5):.0f} nuits",
+                     "neutral")
+    with col2:
+        recettes_an1 = base["tableau"]["Loyer Effectif"][0]
+        metric_card("Recettes (année 1)", f"{recettes_an1:,.0f} €",
+                     f"Soit {recettes_an1 / 12:,.0f} €/mois contre {loyer_effectif_an / 12:,.0f} € à l'année",
+                     "" if recettes_an1 >= loyer_effectif_an else "negative")
+    with col3:
+        cf_saison = base["cashflow"]
+        metric_card("Cash-flow mensuel moyen (P5)", f"{np.percentile(cf_saison, 5):+,.0f} €",
+                     f"Médiane {np.median(cf_saison):+,.0f} € — location à l'année {cashflow_mensuel:+,.0f} €",
+                     "" if np.percentile(cf_saison, 5) >= 0 else "negative")
+    with col4:
+        cf_saison_stress = stresse["cashflow"]
+        metric_card("Cash-flow stressé (médiane)", f"{np.median(cf_saison_stress):+,.0f} €/mois",
+                     f"Prix −{stress['stress_loyer']} %, occupation −{stress['stress_vacance'] / 12:.0%}, "
+                     f"charges +{stress['stress_charges']} %",
+                     "" if np.median(cf_saison_stress) >= 0 else "negative")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_jours = go.Figure(go.Scatter(
+            x=pd.date_range(f"{annee_saison}-01-01", periods=365, freq="D"), y=base["recettes_jour"],
+            mode="lines", line=dict(color="#48bb78", width=1.5), fill="tozeroy",
+            hovertemplate="%{x|%d %b} : %{y:,.0f} € en moyenne<extra></extra>",
+        ))
+        fig_jours.update_layout(
+            title="Recette moyenne de chaque nuit (année 1)",
+            yaxis_title="€ / nuit",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_jours, use_container_width=True)
+    with col2:
+        fig_cf_saison = go.Figure()
+        for nom, valeurs, couleur in (("Hypothèses", cf_saison, "#63b3ed"),
+                                      ("Stress test", cf_saison_stress, "#fc8181")):
+            fig_cf_saison.add_trace(go.Histogram(
+                x=valeurs, nbinsx=40, name=nom, marker_color=couleur, opacity=0.7,
+                hovertemplate="Cash-flow moyen %{x:,.0f} €<br>%{y} scénarios<extra></extra>",
+            ))
+        fig_cf_saison.add_vline(x=cashflow_mensuel, line_dash="dash", line_color="#f6ad55",
+                                annotation_text="Location à l'année")
+        fig_cf_saison.update_layout(
+            title="Cash-flow mensuel moyen (après impôts) par scénario",
+            xaxis_title="€ / mois", yaxis_title="Scénarios", barmode="overlay",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_cf_saison, use_container_width=True)
+
+    with st.expander("📋 Tableau annuel détaillé (moyenne des scénarios)"):
+        st.dataframe(pd.DataFrame(base["tableau"]).astype({"Année": int}).set_index("Année")
+                     .style.format("{:,.0f}").format({"Déflateur": "{:.3f}"}), use_container_width=True)
+    st.caption("Micro-BIC : 50 % d'abattement jusqu'à 77 700 € de recettes pour un meublé classé, "
+               "30 % jusqu'à 15 000 € sinon ; au-delà, LMNP réel.")
+
     # Proximity advantage
     st.markdown("### 🏠 L'avantage de la proximité")
     strategy_box("Investir près de chez soi = avantage ÉNORME (Chapitre C.1)", """
@@ -1102,11 +2030,69 @@ with tabs[6]:
     <b>→ Gestion</b> : mise en location directe, meilleur contrôle des locataires
     """)
 
+    # Portfolio optimizer
+    st.markdown("### 🧮 Constituer un portefeuille parmi les biens candidats")
+    try:
+        candidats = biens_candidats()
+    except (ValueError, pd.errors.ParserError) as exc:
+        st.error(f"Liste de biens illisible : {exc}")
+        return
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        epargne = st.number_input("Épargne disponible (€)", 0, 5_000_000, 50_000, step=5_000,
+                                  help="Apports et frais de notaire de tous les biens retenus",
+                                  key="epargne", persist_state="page")
+        objectif = st.radio("Maximiser", ["Cash-flow mensuel", "Patrimoine net à 10 ans"],
+                            key="objectif_portefeuille", persist_state="page")
+    with col2:
+        methode = st.radio("Calcul de l'endettement", ["Non-compensation", "Compensation"],
+                           key="methode_endettement", persist_state="page")
+        taux_max = st.slider("Endettement maximal (%)", 20.0, 50.0, TAUX_ENDETTEMENT_MAX, 0.5,
+                             key="taux_endettement_max", persist_state="page")
+    with col3:
+        plancher = st.slider("Plancher de sérénité (0 = aucun)", 0, 95, 0, 5,
+                             key="plancher_serenite", persist_state="page")
+
+    selection, detail, totaux = optimiser_portefeuille(
+        candidats, epargne, salaire_net, methode.lower().replace("-", "_"), taux_max, plancher or None,
+        "cashflow" if objectif.startswith("Cash-flow") else "patrimoine",
+    )
+    retenus = detail[detail["Retenu"]]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        metric_card("Biens retenus", f"{len(retenus)} / {len(detail)}",
+                    "Optimum prouvé" if selection.optimale else "Meilleure sélection trouvée", "neutral")
+    with col2:
+        cashflow_total = retenus["Cash-flow Mensuel"].sum()
+        metric_card("Cash-flow total", f"{cashflow_total:+,.0f} €/mois",
+                    f"Patrimoine net à 10 ans : {retenus['Patrimoine Net 10 ans'].sum():,.0f} €",
+                    "" if cashflow_total >= 0 else "negative")
+    with col3:
+        metric_card("Mise de fonds", f"{totaux['Mise de fonds']:,.0f} €", f"Sur {epargne:,.0f} € d'épargne",
+                    "neutral")
+    with col4:
+        metric_card(f"Endettement ({methode.lower()})", f"{totaux['Endettement (%)']:.1f} %",
+                    f"Plafond : {taux_max:.1f} %", "" if totaux["Endettement (%)"] <= taux_max else "negative")
+    if not selection.optimale:
+        st.warning(f"Recherche arrêtée après {selection.noeuds:,} nœuds : sélection non prouvée optimale.")
+
+    st.dataframe(
+        detail.sort_values(["Retenu", OBJECTIFS["cashflow" if objectif.startswith("Cash-flow") else "patrimoine"]],
+                           ascending=False)
+        [["Bien", "Type", "Retenu", "Explication", "Cash-flow Mensuel", "Patrimoine Net 10 ans", "Mise de Fonds",
+          "Sérénité"]].set_index("Bien").style.format(
+            {"Cash-flow Mensuel": "{:+,.0f} €", "Patrimoine Net 10 ans": "{:,.0f} €", "Mise de Fonds": "{:,.0f} €",
+             "Sérénité": "{:.0f}"}),
+        use_container_width=True,
+    )
+
 
 # ═══════════════════════════════════════════════════════════════
 # TAB 8 — OUTILS DCF & COMPARABLES
 # ═══════════════════════════════════════════════════════════════
-with tabs[7]:
+def onglet_outils():
+    from moteur import dcf
+
     st.markdown("## Outils d'Analyse (Chapitres A.3, D.1, D.3)")
 
     st.markdown("### 📐 Valorisation DCF (Discount Cash-Flow)")
@@ -1119,9 +2105,11 @@ with tabs[7]:
     with col1:
         st.markdown("#### Valoriser une différence récurrente")
         flux_annuel = st.number_input("Flux annuel récurrent (€)", -5_000, 50_000, 500, step=50,
-                                       help="Ex: différence de taxe foncière, loyer d'un garage...")
+                                       help="Ex: différence de taxe foncière, loyer d'un garage...",
+                                       key="flux_annuel", persist_state="page")
         taux_actualisation = st.slider("Taux d'actualisation (%)", 3.0, 15.0, 8.0, 0.5,
-                                        help="≈ rendement que vous visez")
+                                        help="≈ rendement que vous visez",
+                                        key="taux_actualisation", persist_state="page")
 
     with col2:
         valeur_dcf = flux_annuel / (taux_actualisation / 100)
@@ -1132,15 +2120,80 @@ with tabs[7]:
         st.markdown(f"- Différence taxe foncière 500€/an → vaut **{500/(taux_actualisation/100):,.0f}€**")
         st.markdown(f"- Garage louable 60€/mois → vaut **{720/(taux_actualisation/100):,.0f}€**")
 
+    st.markdown("#### 📆 DCF à horizon fini (croissance + valeur terminale)")
+    col1, col2 = st.columns(2)
+    with col1:
+        source_flux = st.radio("Flux à actualiser", ["Cash-flows projetés du bien", "Flux personnalisé"],
+                               horizontal=True, key="source_flux", persist_state="page")
+        horizon_dcf = st.slider("Horizon (ans)", 1, HORIZON_REVENTE, min(duree_credit, HORIZON_REVENTE),
+                                key="horizon_dcf", persist_state="page")
+        croissance_dcf = st.slider("Croissance annuelle des flux (%)", -5.0, 10.0, 0.0, 0.25,
+                                   help="Appliquée en plus de la série de flux",
+                                   key="croissance_dcf", persist_state="page")
+    with col2:
+        mode_terminal = st.selectbox("Valeur terminale", [
+            "Croissance perpétuelle (Gordon)", "Revente du bien (produit net)", "Aucune",
+        ], index=1 if source_flux == "Cash-flows projetés du bien" else 0, key="mode_terminal", persist_state="page")
+        croissance_terminale = st.slider("Croissance perpétuelle (%)", -2.0, 5.0, 1.0, 0.25,
+                                         disabled=mode_terminal != "Croissance perpétuelle (Gordon)",
+                                         key="croissance_terminale", persist_state="page")
+
+    if source_flux == "Cash-flows projetés du bien":
+        flux_dcf = projection["Cash-flow Annuel"][:horizon_dcf]
+    else:
+        flux_dcf = np.full(horizon_dcf, float(flux_annuel))
+    options_terminal = {}
+    if mode_terminal == "Croissance perpétuelle (Gordon)":
+        options_terminal["croissance_terminale"] = croissance_terminale
+    elif mode_terminal == "Revente du bien (produit net)":
+        options_terminal["valeur_terminale"] = etat["df_revente"].loc[horizon_dcf, "Produit Net"]
+
+    taux_grille = np.arange(3.0, 15.01, 0.25)
+    croissances_grille = np.arange(-2.0, 4.01, 0.5)
+    surface = dcf.surface_dcf(flux_dcf, taux_grille, croissances_grille, **options_terminal)
+    valeur_horizon = float(dcf.valeur_dcf(flux_dcf, taux_actualisation, croissance_dcf, **options_terminal))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        metric_card("Valeur DCF (horizon fini)", f"{valeur_horizon:,.0f} €",
+                    f"{horizon_dcf} ans actualisés à {taux_actualisation}% · croissance {croissance_dcf:+.2f}%/an",
+                    "neutral" if valeur_horizon >= 0 else "negative")
+        fig_dcf = go.Figure(go.Scatter(
+            x=taux_grille, y=dcf.valeur_dcf(flux_dcf, taux_grille, croissance_dcf, **options_terminal),
+            line=dict(color="#63b3ed", width=3),
+            hovertemplate="Taux %{x:.2f} %<br>Valeur: %{y:,.0f} €<extra></extra>",
+        ))
+        fig_dcf.add_vline(x=taux_actualisation, line_dash="dash", line_color="#b794f4")
+        fig_dcf.update_layout(
+            title="Valeur selon le taux d'actualisation",
+            xaxis_title="Taux d'actualisation (%)", yaxis_title="€",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_dcf, use_container_width=True)
+    with col2:
+        fig_surface = go.Figure(go.Heatmap(
+            x=croissances_grille, y=taux_grille, z=surface,
+            colorscale="Viridis", colorbar=dict(title="€"),
+            hovertemplate="Croissance %{x:+.1f} %<br>Taux %{y:.2f} %<br>Valeur: %{z:,.0f} €<extra></extra>",
+        ))
+        fig_surface.update_layout(
+            title="Surface de valorisation",
+            xaxis_title="Croissance annuelle (%)", yaxis_title="Taux d'actualisation (%)",
+            **PLOTLY_LAYOUT,
+        )
+        st.plotly_chart(fig_surface, use_container_width=True)
+
     st.markdown("---")
 
     # Comparables method
     st.markdown("### 🔍 Méthode des Comparables (Prix au m²)")
     col1, col2 = st.columns(2)
     with col1:
-        prix_m2_marche = st.number_input("Prix moyen au m² (quartier) (€)", 100, 20_000, 2_000, step=50)
-        prix_m2_bien = prix_achat / surface_m2 if surface_m2 > 0 else 0
-        decote_pct = ((prix_m2_marche - prix_m2_bien) / prix_m2_marche) * 100 if prix_m2_marche > 0 else 0
+        prix_m2_marche = st.number_input("Prix moyen au m² (quartier) (€)", 100, 20_000, 2_000, step=50,
+                                         key="prix_m2_marche", persist_state="page")
+        etat.definir(prix_m2_marche=prix_m2_marche)
+        prix_m2_bien = etat["prix_m2_bien"]
+        decote_pct = etat["decote_pct"]
 
     with col2:
         metric_card("Prix au m² du bien", f"{prix_m2_bien:,.0f} €/m²",
@@ -1160,8 +2213,9 @@ with tabs[7]:
 
     col1, col2 = st.columns(2)
     with col1:
-        prix_affiche = st.number_input("Prix affiché (€)", 10_000, 2_000_000, 120_000, step=5_000)
-        rabais_vise = st.slider("Rabais visé (%)", 0, 30, 10)
+        prix_affiche = st.number_input("Prix affiché (€)", 10_000, 2_000_000, 120_000, step=5_000,
+                                       key="prix_affiche", persist_state="page")
+        rabais_vise = st.slider("Rabais visé (%)", 0, 30, 10, key="rabais_vise", persist_state="page")
 
     with col2:
         prix_negocie = prix_affiche * (1 - rabais_vise / 100)
@@ -1222,11 +2276,34 @@ with tabs[7]:
     st.plotly_chart(fig_etage, use_container_width=True)
 
 
+for onglet, contenu in zip(tabs, [onglet_rendements, onglet_entrepreneurial, onglet_financement, onglet_fiscalite,
+                                 onglet_serenite, onglet_risques, onglet_strategies, onglet_outils]):
+    if onglet.open:
+        with onglet:
+            contenu()
+
+
 # ─────────────────────────────────────────────────────────────────────
 # FOOTER
 # ─────────────────────────────────────────────────────────────────────
 
 st.markdown("---")
+with st.expander("🔗 Graphe de calcul — nœuds recalculés à ce rerun"):
+    st.caption(f"Entrées modifiées : {', '.join(etat.entrees_modifiees) or 'aucune'} — "
+               f"{len(etat.recalcules)} nœud(s) recalculé(s) sur {len(modele.noeuds)} : "
+               f"{', '.join(etat.recalcules) or 'aucun'}")
+    st.graphviz_chart(modele.dot(surlignes=etat.recalcules))
+
+purger_global(BUDGET_CACHE_GLOBAL)
+if JETON_ADMIN and hmac.compare_digest(st.query_params.get("admin", "").encode(), JETON_ADMIN.encode()):
+    with st.expander("🛠️ Administration — mémoire des sessions", expanded=True):
+        sessions = etat_caches()
+        st.caption(f"{len(sessions)} session(s) — {sessions['Mémoire (Mo)'].sum() if len(sessions) else 0:,.1f} Mo "
+                   f"en cache sur un budget global de {BUDGET_CACHE_GLOBAL / 1e6:,.0f} Mo "
+                   f"(session : {BUDGET_CACHE_SESSION / 1e6:,.0f} Mo, durée de vie : {DUREE_VIE_CACHE_S / 60:.0f} min)")
+        st.dataframe(sessions.style.format({"Mémoire (Mo)": "{:.1f}", "Budget (Mo)": "{:.0f}",
+                                            "Taux de succès (%)": "{:.0f}", "Inactive depuis (s)": "{:.0f}"}),
+                     use_container_width=True, hide_index=True)
 st.markdown("""
 <div style="text-align:center; color:#718096; padding: 1rem 0; font-size: 0.85rem;">
     Les calculs sont des approximations à but pédagogique — consultez un professionnel pour vos investissements.
@@ -0,0 +1,30 @@
+"""Financement composite : échéancier d'une ligne et solde au terme."""
+
+import numpy as np
+import pytest
+
+from moteur.credit import LigneCredit, capital_apres, echeancier_composite, mensualite_constante
+
+
+def test_ligne_amortissable_seule():
+    echeancier = echeancier_composite([LigneCredit(200_000, 3.5, 240)])
+    mensualite = mensualite_constante(200_000, 3.5, 240)
+    mois = np.arange(1, 240)
+
+    assert echeancier["mensualite"] == pytest.approx(np.full(240, mensualite))
+    assert echeancier["capital_restant"][:-1] == pytest.approx(capital_apres(200_000, 3.5, mensualite, mois))
+    assert echeancier["interets"].sum() == pytest.approx(mensualite * 240 - 200_000)
+
+
+@pytest.mark.parametrize("ligne", [
+    LigneCredit(50_000, 4.0, 180, nature="in_fine"),
+    LigneCredit(120_000, 3.2, 240, differe_mois=24, differe_total=True),
+    LigneCredit(80_000, 2.9, 300, nature="paliers", differe_mois=12, differe_total=True,
+                paliers=((60, 1.0), (60, 1.2), (60, 1.4))),
+])
+def test_capital_solde_au_terme(ligne):
+    # Le solde final est forcé à zéro : le capital amorti doit aussi égaler le montant emprunté
+    echeancier = echeancier_composite([ligne])
+
+    assert echeancier["capital_restant"][-1] == 0
+    assert echeancier["capital_rembourse"].sum() == pytest.approx(ligne.montant)
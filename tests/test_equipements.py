@@ -0,0 +1,20 @@
+"""Catalogue d'équipements relu d'un CSV à la française."""
+
+import pandas as pd
+import pytest
+
+from moteur.equipements import normaliser_catalogue
+
+
+def test_decimales_a_la_francaise(tmp_path):
+    chemin = tmp_path / "catalogue.csv"
+    chemin.write_text("Équipement;Coût (€);Loyer sup. (€/mois)\nLave-linge;270,5;30\nCuisine;1 000;50\n",
+                      encoding="utf-8")
+    catalogue = normaliser_catalogue(pd.read_csv(chemin, sep=None, engine="python"))
+
+    assert catalogue["Coût (€)"].tolist() == [270.5, 1000.0]
+
+
+def test_cellule_illisible_nommee():
+    with pytest.raises(ValueError, match="ligne 2"):
+        normaliser_catalogue(pd.DataFrame({"Coût (€)": ["270,5", "mille"], "Loyer sup. (€/mois)": [30, 50]}))
@@ -0,0 +1,33 @@
+"""Sac à dos du portefeuille : le branch-and-bound retrouve l'optimum exhaustif."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from moteur.portefeuille import selectionner
+
+
+def _exhaustif(valeurs, mises, poids_dette, epargne, capacite_dette):
+    meilleure = 0.0
+    for choix in itertools.product((False, True), repeat=len(valeurs)):
+        choix = np.array(choix)
+        if mises[choix].sum() <= epargne and poids_dette[choix].sum() <= capacite_dette:
+            meilleure = max(meilleure, valeurs[choix].sum())
+    return meilleure
+
+
+@pytest.mark.parametrize("graine", range(5))
+def test_egal_a_la_recherche_exhaustive(graine):
+    rng = np.random.default_rng(graine)
+    valeurs = rng.normal(10_000, 8_000, 12)  # quelques valeurs négatives
+    mises = rng.uniform(5_000, 40_000, 12)
+    poids_dette = rng.normal(300, 500, 12)  # poids de signe quelconque
+    epargne, capacite_dette = mises.sum() * 0.4, 1_000.0
+    selection = selectionner(valeurs, mises, poids_dette, epargne, capacite_dette)
+
+    assert selection.optimale
+    assert selection.valeur == pytest.approx(_exhaustif(valeurs, mises, poids_dette, epargne, capacite_dette))
+    assert valeurs[selection.retenus].sum() == pytest.approx(selection.valeur)
+    assert mises[selection.retenus].sum() <= epargne
+    assert poids_dette[selection.retenus].sum() <= capacite_dette
@@ -0,0 +1,36 @@
+"""Scénarios hors de l'app : cellules vides et types relus d'un CSV."""
+
+from moteur.export import main
+from moteur.scenario import DEFAUTS, charger_scenario, etat_scenario, lire_scenarios
+
+
+def test_cellules_vides_aux_defauts(tmp_path):
+    # La cellule vide relit toute la colonne duree_credit en flottants
+    entree = tmp_path / "scenarios.csv"
+    entree.write_text("nom,prix_achat,duree_credit,imposition_commune\n"
+                      "a,120000,,\n"
+                      "b,150000,25,True\n", encoding="utf-8")
+    a, b = lire_scenarios(entree)
+
+    assert a["duree_credit"] == DEFAUTS["duree_credit"]
+    assert a["imposition_commune"] is DEFAUTS["imposition_commune"]
+    assert b["duree_credit"] == 25 and isinstance(b["duree_credit"], int)
+    assert b["imposition_commune"] is True
+    assert etat_scenario(b)["mensualites_an"].shape[-1] == 25
+
+
+def test_export_csv_a_cellules_vides(tmp_path):
+    entree = tmp_path / "scenarios.csv"
+    entree.write_text("nom,prix_achat,duree_credit\na,120000,\nb,150000,25\n", encoding="utf-8")
+    main([str(entree), str(tmp_path / "sortie")])
+
+    assert (tmp_path / "sortie" / "indicateurs.csv").read_text(encoding="utf-8").count("\n") == 3
+
+
+def test_json_a_duree_flottante(tmp_path):
+    chemin = tmp_path / "t2.json"
+    chemin.write_text('{"duree_credit": 20.0, "imposition_commune": "oui"}', encoding="utf-8")
+    parametres = charger_scenario(chemin)
+
+    assert parametres["duree_credit"] == 20 and isinstance(parametres["duree_credit"], int)
+    assert parametres["imposition_commune"] is True